@@ -31,12 +31,13 @@ class ProductSearchTool:
 
     def _search(self, query: str) -> List[Dict[str, Any]]:
         """
-        Run a text search via the domain ProductService and map results into a
-        lightweight dict that the LLM can reason over.
+        Run a hybrid (full-text + semantic) search via the domain
+        ProductService and map results into a lightweight dict that the LLM
+        can reason over.
         """
         db = self.db_session_factory()
         try:
-            products = self.product_service.search_products(
+            products = self.product_service.hybrid_search_products(
                 db,
                 query=query,
                 limit=self.default_limit,
@@ -5,18 +5,22 @@ from sqlalchemy.orm import Session
 
 from app.core.security import get_current_admin
 from app.db.session import get_db
-from app.dependencies import get_admin_service
+from app.dependencies import get_admin_service, get_search_service
 from app.models.order import OrderStatus
 from app.models.product import ProductStatus
 from app.models.user import User, UserRole, UserStatus
 from app.schemas.admin import (
+    AdminCacheStatsResponse,
     AdminOrderListResponse,
+    AdminProductFacetBackfillResponse,
     AdminProductListItem,
     AdminProductListResponse,
     AdminProductModerationUpdate,
+    AdminSearchHistoryPruneResponse,
     AdminUserListResponse,
 )
 from app.services.admin_service import AdminService
+from app.services.search_service import SearchService
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
@@ -124,3 +128,34 @@ def admin_list_orders(
         page=page,
         page_size=page_size,
     )
+
+
+# 5. Apply search history retention
+@router.post("/search-history/prune", response_model=AdminSearchHistoryPruneResponse)
+def admin_prune_search_history(
+    db: Session = Depends(get_db),
+    admin_user: User = Depends(get_current_admin),
+    search_service: SearchService = Depends(get_search_service),
+):
+    deleted = search_service.prune_search_history(db)
+    return AdminSearchHistoryPruneResponse(deleted=deleted)
+
+
+# 6. Search and suggest cache metrics
+@router.get("/cache-stats", response_model=AdminCacheStatsResponse)
+def admin_cache_stats(
+    admin_user: User = Depends(get_current_admin),
+    admin_service: AdminService = Depends(get_admin_service),
+):
+    return AdminCacheStatsResponse(**admin_service.get_cache_stats())
+
+
+# 7. Backfill size/color facet rows for existing products
+@router.post("/products/facets/backfill", response_model=AdminProductFacetBackfillResponse)
+def admin_backfill_product_facets(
+    db: Session = Depends(get_db),
+    admin_user: User = Depends(get_current_admin),
+    admin_service: AdminService = Depends(get_admin_service),
+):
+    updated = admin_service.backfill_product_facets(db)
+    return AdminProductFacetBackfillResponse(updated=updated)
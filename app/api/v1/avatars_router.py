@@ -1,6 +1,9 @@
-from fastapi import APIRouter, Depends
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, Response
 from sqlalchemy.orm import Session
 
+from app.core.etag import etag_matches, not_modified
 from app.db.session import get_db
 from app.dependencies import get_avatar_preset_service
 from app.schemas.avatar import AvatarPresetListResponse
@@ -11,8 +14,12 @@ router = APIRouter(prefix="/avatars", tags=["avatars"])
 
 @router.get("/presets", response_model=AvatarPresetListResponse)
 def list_avatar_presets(
+    if_none_match: Optional[str] = Header(None),
     db: Session = Depends(get_db),
     avatar_preset_service: AvatarPresetService = Depends(get_avatar_preset_service),
-) -> AvatarPresetListResponse:
-    presets = avatar_preset_service.list_active_presets(db)
-    return AvatarPresetListResponse(items=presets)
+):
+    etag = avatar_preset_service.get_active_presets_etag(db)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    body = avatar_preset_service.get_active_presets_json(db)
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
@@ -5,7 +5,7 @@ from app.core.security import get_current_user
 from app.db.session import get_db
 from app.dependencies import get_cart_service
 from app.models.user import User
-from app.schemas.cart import CartItemCreate, CartItemUpdate, CartSchema
+from app.schemas.cart import CartBatchRequest, CartItemCreate, CartItemUpdate, CartSchema
 from app.services.cart_service import CartService
 
 router = APIRouter(prefix="/cart", tags=["cart"])
@@ -30,6 +30,16 @@ def add_cart_item(
     return cart_service.add_item_to_cart(db, current_user.id, body)
 
 
+@router.patch("/items:batch", response_model=CartSchema)
+def update_cart_items_batch(
+    body: CartBatchRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    cart_service: CartService = Depends(get_cart_service),
+) -> CartSchema:
+    return cart_service.apply_cart_operations(db, current_user.id, body.operations)
+
+
 @router.patch("/items/{item_id}", response_model=CartSchema)
 def update_cart_item(
     item_id: int,
@@ -1,12 +1,19 @@
 from decimal import Decimal
 from typing import Optional
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Header, Request, Response
 from sqlalchemy.orm import Session
 
+from app.core.etag import etag_matches, make_etag, not_modified
 from app.db.session import get_db
 from app.dependencies import get_product_service
-from app.schemas.product import ProductDetail, ProductListResponse
+from app.schemas.product import (
+    ProductBatchRequest,
+    ProductBatchResponse,
+    ProductDetail,
+    ProductFacetsResponse,
+    ProductListResponse,
+)
 from app.services.product_service import ProductService
 
 router = APIRouter(prefix="/products", tags=["products"])
@@ -14,6 +21,8 @@ router = APIRouter(prefix="/products", tags=["products"])
 
 @router.get("", response_model=ProductListResponse)
 def list_products(
+    request: Request,
+    response: Response,
     category: Optional[str] = None,
     price_min: Optional[Decimal] = None,
     price_max: Optional[Decimal] = None,
@@ -23,10 +32,14 @@ def list_products(
     sort: Optional[str] = None,
     page: int = 1,
     page_size: int = 20,
+    cursor: Optional[str] = None,
+    query: Optional[str] = None,
+    q: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None),
     db: Session = Depends(get_db),
     product_service: ProductService = Depends(get_product_service),
-) -> ProductListResponse:
-    return product_service.list_products(
+):
+    listing = product_service.list_products(
         db,
         category=category,
         price_min=price_min,
@@ -37,13 +50,68 @@ def list_products(
         sort=sort,
         page=page,
         page_size=page_size,
+        cursor=cursor,
+        query=query,
+        q=q,
+    )
+    # The cards carry every rendered field, so hashing them (with the query)
+    # yields a strong validator without serializing the response.
+    etag = make_etag(
+        "products",
+        str(request.query_params),
+        listing.total,
+        listing.next_cursor,
+        [tuple(item) for item in listing.items],
+    )
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+    return listing
+
+
+@router.post("/batch", response_model=ProductBatchResponse)
+def get_products_batch(
+    payload: ProductBatchRequest,
+    db: Session = Depends(get_db),
+    product_service: ProductService = Depends(get_product_service),
+):
+    return product_service.get_product_cards(db, ids=payload.ids)
+
+
+@router.get("/facets", response_model=ProductFacetsResponse)
+def get_product_facets(
+    category: Optional[str] = None,
+    price_min: Optional[Decimal] = None,
+    price_max: Optional[Decimal] = None,
+    size: Optional[str] = None,
+    color: Optional[str] = None,
+    gender: Optional[str] = None,
+    db: Session = Depends(get_db),
+    product_service: ProductService = Depends(get_product_service),
+) -> ProductFacetsResponse:
+    return product_service.get_facets(
+        db,
+        category=category,
+        price_min=price_min,
+        price_max=price_max,
+        size=size,
+        color=color,
+        gender=gender,
     )
 
 
 @router.get("/{product_id}", response_model=ProductDetail)
 def get_product_detail(
     product_id: int,
+    if_none_match: Optional[str] = Header(None),
     db: Session = Depends(get_db),
     product_service: ProductService = Depends(get_product_service),
-) -> ProductDetail:
-    return product_service.get_product_detail(db, product_id=product_id)
+) -> Response:
+    detail = product_service.get_cached_product_detail(db, product_id=product_id)
+    if etag_matches(if_none_match, detail.etag):
+        return not_modified(detail.etag)
+    return Response(
+        content=detail.body,
+        media_type="application/json",
+        headers={"ETag": detail.etag},
+    )
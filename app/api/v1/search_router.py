@@ -8,6 +8,7 @@ from app.db.session import get_db
 from app.dependencies import get_search_service
 from app.models.user import User
 from app.schemas.search import (
+    SearchHistoryCreate,
     SearchHistoryListResponse,
     SearchSuggestResponse,
 )
@@ -29,6 +30,20 @@ def get_search_history(
     return SearchHistoryListResponse(items=items)
 
 
+@router.post("/history", status_code=status.HTTP_202_ACCEPTED)
+def record_search_history(
+    payload: SearchHistoryCreate,
+    current_user: Optional[User] = Depends(get_optional_user),
+    search_service: SearchService = Depends(get_search_service),
+):
+    search_service.record_search(
+        user_id=current_user.id if current_user else None,
+        keyword=payload.keyword,
+        destination=payload.destination,
+    )
+    return Response(status_code=status.HTTP_202_ACCEPTED)
+
+
 @router.delete("/history/{item_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_search_history_item(
     item_id: int,
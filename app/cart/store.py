@@ -0,0 +1,449 @@
+import itertools
+import json
+import math
+import threading
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, ContextManager, Dict, List, Optional, Protocol, Tuple
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - only the memory store is available
+    redis = None
+
+from app.core.config import settings
+from app.models.cart import variant_hash
+
+
+@dataclass
+class CartLine:
+    id: int
+    product_id: int
+    quantity: int
+    variant_data: Optional[Dict[str, Any]] = None
+    variant_hash: str = ""
+
+    def __post_init__(self) -> None:
+        if not self.variant_hash:
+            self.variant_hash = variant_hash(self.variant_data)
+
+
+class CartStore(Protocol):
+    """
+    Fast storage for cart lines in front of the cart tables. Every mutation
+    marks its cart dirty; CartWriteBack copies dirty carts to SQL.
+    """
+
+    def get_cart_id(self, user_id: int) -> Optional[int]:
+        ...
+
+    def load_cart(self, user_id: int, cart_id: int, lines: List[CartLine]) -> None:
+        ...
+
+    def lines(self, cart_id: int) -> List[CartLine]:
+        ...
+
+    def add(
+        self,
+        cart_id: int,
+        *,
+        product_id: int,
+        quantity: int,
+        variant_data: Optional[Dict[str, Any]],
+    ) -> int:
+        ...
+
+    def set_quantity(self, cart_id: int, line_id: int, quantity: int) -> bool:
+        ...
+
+    def remove(self, cart_id: int, line_id: int) -> bool:
+        ...
+
+    def seed_line_ids(self, floor: int) -> None:
+        ...
+
+    def take_dirty(self, limit: int) -> List[int]:
+        ...
+
+    def mark_dirty(self, cart_id: int) -> None:
+        ...
+
+    def discard_dirty(self, cart_id: int) -> None:
+        ...
+
+    def evict(self, user_id: int, cart_id: int) -> None:
+        ...
+
+    def has_cart(self, cart_id: int) -> bool:
+        ...
+
+    def evict_idle(self) -> int:
+        """Evicts clean carts idle past the store's timeout; returns the count."""
+        ...
+
+    def lock(self, cart_id: int) -> ContextManager[Any]:
+        """Serializes write-back passes with checkout for one cart."""
+        ...
+
+
+_UNLOCKED = threading.Lock()
+
+
+class MemoryCartStore:
+    """
+    Process-local CartStore for single-worker deployments and tests. Carts
+    not changed for `idle_timeout` seconds are dropped by evict_idle once
+    they have been written back.
+    """
+
+    def __init__(self, *, idle_timeout: float = 3600.0):
+        self.idle_timeout = idle_timeout
+        self._lock = threading.Lock()
+        self._carts: Dict[int, int] = {}
+        self._owners: Dict[int, int] = {}
+        self._lines: Dict[int, Dict[int, CartLine]] = {}
+        self._touched: Dict[int, float] = {}
+        self._dirty: Dict[int, None] = {}
+        self._cart_locks: Dict[int, threading.Lock] = {}
+        self._line_ids = itertools.count(1)
+        self._seeded = False
+
+    def get_cart_id(self, user_id: int) -> Optional[int]:
+        return self._carts.get(user_id)
+
+    def load_cart(self, user_id: int, cart_id: int, lines: List[CartLine]) -> None:
+        with self._lock:
+            if user_id in self._carts:
+                return
+            self._lines[cart_id] = {line.id: line for line in lines}
+            self._carts[user_id] = cart_id
+            self._owners[cart_id] = user_id
+            self._touched[cart_id] = time.monotonic()
+
+    def lines(self, cart_id: int) -> List[CartLine]:
+        with self._lock:
+            lines = self._lines.get(cart_id, {})
+            return [
+                CartLine(**vars(lines[line_id])) for line_id in sorted(lines)
+            ]
+
+    def add(
+        self,
+        cart_id: int,
+        *,
+        product_id: int,
+        quantity: int,
+        variant_data: Optional[Dict[str, Any]],
+    ) -> int:
+        fingerprint = variant_hash(variant_data)
+        with self._lock:
+            lines = self._lines.setdefault(cart_id, {})
+            line = next(
+                (
+                    line
+                    for line in lines.values()
+                    if line.product_id == product_id and line.variant_hash == fingerprint
+                ),
+                None,
+            )
+            if line is None:
+                line = CartLine(
+                    id=next(self._line_ids),
+                    product_id=product_id,
+                    quantity=0,
+                    variant_data=variant_data,
+                    variant_hash=fingerprint,
+                )
+                lines[line.id] = line
+            line.quantity += quantity
+            self._touch(cart_id)
+            return line.id
+
+    def set_quantity(self, cart_id: int, line_id: int, quantity: int) -> bool:
+        with self._lock:
+            line = self._lines.get(cart_id, {}).get(line_id)
+            if line is None:
+                return False
+            line.quantity = quantity
+            self._touch(cart_id)
+            return True
+
+    def remove(self, cart_id: int, line_id: int) -> bool:
+        with self._lock:
+            if self._lines.get(cart_id, {}).pop(line_id, None) is None:
+                return False
+            self._touch(cart_id)
+            return True
+
+    def seed_line_ids(self, floor: int) -> None:
+        with self._lock:
+            if not self._seeded:
+                self._line_ids = itertools.count(floor + 1)
+                self._seeded = True
+
+    def take_dirty(self, limit: int) -> List[int]:
+        with self._lock:
+            taken = list(itertools.islice(self._dirty, limit))
+            for cart_id in taken:
+                del self._dirty[cart_id]
+            return taken
+
+    def mark_dirty(self, cart_id: int) -> None:
+        with self._lock:
+            self._dirty[cart_id] = None
+
+    def discard_dirty(self, cart_id: int) -> None:
+        with self._lock:
+            self._dirty.pop(cart_id, None)
+
+    def evict(self, user_id: int, cart_id: int) -> None:
+        with self._lock:
+            self._carts.pop(user_id, None)
+            self._drop(cart_id)
+
+    def has_cart(self, cart_id: int) -> bool:
+        with self._lock:
+            return cart_id in self._lines
+
+    def evict_idle(self) -> int:
+        cutoff = time.monotonic() - self.idle_timeout
+        with self._lock:
+            idle = [
+                cart_id
+                for cart_id, touched in self._touched.items()
+                if touched <= cutoff
+                and cart_id not in self._dirty
+                # Held by a write-back pass or a checkout.
+                and not self._cart_locks.get(cart_id, _UNLOCKED).locked()
+            ]
+            for cart_id in idle:
+                self._carts.pop(self._owners.get(cart_id), None)
+                self._drop(cart_id)
+            return len(idle)
+
+    def lock(self, cart_id: int) -> threading.Lock:
+        with self._lock:
+            return self._cart_locks.setdefault(cart_id, threading.Lock())
+
+    def _touch(self, cart_id: int) -> None:
+        # Callers hold self._lock.
+        self._dirty[cart_id] = None
+        self._touched[cart_id] = time.monotonic()
+
+    def _drop(self, cart_id: int) -> None:
+        # Callers hold self._lock.
+        self._owners.pop(cart_id, None)
+        self._lines.pop(cart_id, None)
+        self._touched.pop(cart_id, None)
+        self._dirty.pop(cart_id, None)
+        self._cart_locks.pop(cart_id, None)
+
+
+class RedisCartStore:
+    """
+    CartStore on a Redis-protocol server, shared by every app process.
+
+    Per cart, a hash maps line id -> line JSON, a second one line id ->
+    quantity (so quantity changes are single HINCRBY/HSET commands) and a
+    third (product_id, variant_hash) -> line id, which HSETNX makes the
+    atomic merge point for concurrent adds. `client` is anything with the
+    redis-py command methods used here. A cart's keys expire `idle_timeout`
+    seconds after its last change (every mutation refreshes them), so
+    abandoned carts leave the store; checkout deletes them at once. Cart
+    locks expire after `lock_timeout` seconds so a crashed holder cannot
+    block a cart forever.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        *,
+        prefix: str = "cart",
+        lock_timeout: float = 30.0,
+        idle_timeout: float = 3600.0,
+    ):
+        self.client = client
+        self.prefix = prefix
+        self.lock_timeout = lock_timeout
+        self.idle_timeout = idle_timeout
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs: Any) -> "RedisCartStore":
+        if redis is None:
+            raise RuntimeError("CART_STORE=redis requires the redis package")
+        return cls(redis.Redis.from_url(url, decode_responses=True), **kwargs)
+
+    def get_cart_id(self, user_id: int) -> Optional[int]:
+        cart_id = self.client.get(self._user_key(user_id))
+        return int(cart_id) if cart_id is not None else None
+
+    def load_cart(self, user_id: int, cart_id: int, lines: List[CartLine]) -> None:
+        lines_key, qty_key, index_key = self._cart_keys(cart_id)
+        for line in lines:
+            self.client.hsetnx(index_key, self._index_field(line), line.id)
+            self.client.hsetnx(lines_key, line.id, self._encode(line))
+            self.client.hsetnx(qty_key, line.id, line.quantity)
+        self.client.set(self._owner_key(cart_id), user_id, nx=True)
+        self.client.set(self._user_key(user_id), cart_id, nx=True)
+        self._expire(user_id, cart_id)
+
+    def lines(self, cart_id: int) -> List[CartLine]:
+        lines_key, qty_key, _ = self._cart_keys(cart_id)
+        quantities = self.client.hgetall(qty_key)
+        lines = []
+        for line_id, payload in self.client.hgetall(lines_key).items():
+            quantity = quantities.get(line_id)
+            if quantity is None:
+                continue
+            data = json.loads(payload)
+            lines.append(
+                CartLine(
+                    id=int(line_id),
+                    product_id=data["product_id"],
+                    quantity=int(quantity),
+                    variant_data=data["variant_data"],
+                    variant_hash=data["variant_hash"],
+                )
+            )
+        lines.sort(key=lambda line: line.id)
+        return lines
+
+    def add(
+        self,
+        cart_id: int,
+        *,
+        product_id: int,
+        quantity: int,
+        variant_data: Optional[Dict[str, Any]],
+    ) -> int:
+        lines_key, qty_key, index_key = self._cart_keys(cart_id)
+        line = CartLine(
+            id=0,
+            product_id=product_id,
+            quantity=quantity,
+            variant_data=variant_data,
+            variant_hash=variant_hash(variant_data),
+        )
+        field = self._index_field(line)
+        line_id = self.client.hget(index_key, field)
+        if line_id is None:
+            line.id = int(self.client.incr(self._key("line_id")))
+            if self.client.hsetnx(index_key, field, line.id):
+                self.client.hset(lines_key, line.id, self._encode(line))
+                line_id = line.id
+            else:
+                # A concurrent add created the line first.
+                line_id = self.client.hget(index_key, field)
+        self.client.hincrby(qty_key, line_id, quantity)
+        self._touch(cart_id)
+        return int(line_id)
+
+    def set_quantity(self, cart_id: int, line_id: int, quantity: int) -> bool:
+        lines_key, qty_key, _ = self._cart_keys(cart_id)
+        if not self.client.hexists(lines_key, line_id):
+            return False
+        self.client.hset(qty_key, line_id, quantity)
+        self._touch(cart_id)
+        return True
+
+    def remove(self, cart_id: int, line_id: int) -> bool:
+        lines_key, qty_key, index_key = self._cart_keys(cart_id)
+        payload = self.client.hget(lines_key, line_id)
+        if payload is None:
+            return False
+        data = json.loads(payload)
+        self.client.hdel(index_key, f"{data['product_id']}:{data['variant_hash']}")
+        self.client.hdel(lines_key, line_id)
+        self.client.hdel(qty_key, line_id)
+        self._touch(cart_id)
+        return True
+
+    def seed_line_ids(self, floor: int) -> None:
+        self.client.set(self._key("line_id"), floor, nx=True)
+
+    def take_dirty(self, limit: int) -> List[int]:
+        return [int(cart_id) for cart_id in self.client.spop(self._key("dirty"), limit) or ()]
+
+    def mark_dirty(self, cart_id: int) -> None:
+        self.client.sadd(self._key("dirty"), cart_id)
+
+    def discard_dirty(self, cart_id: int) -> None:
+        self.client.srem(self._key("dirty"), cart_id)
+
+    def evict(self, user_id: int, cart_id: int) -> None:
+        self.client.delete(
+            self._user_key(user_id), self._owner_key(cart_id), *self._cart_keys(cart_id)
+        )
+        self.discard_dirty(cart_id)
+
+    def has_cart(self, cart_id: int) -> bool:
+        return bool(self.client.exists(self._owner_key(cart_id)))
+
+    def evict_idle(self) -> int:
+        # Idle carts expire on their own.
+        return 0
+
+    def lock(self, cart_id: int) -> Any:
+        return self.client.lock(self._key(cart_id, "lock"), timeout=self.lock_timeout)
+
+    def _touch(self, cart_id: int) -> None:
+        self.mark_dirty(cart_id)
+        user_id = self.client.get(self._owner_key(cart_id))
+        self._expire(user_id, cart_id)
+
+    def _expire(self, user_id: Any, cart_id: int) -> None:
+        seconds = math.ceil(self.idle_timeout)
+        keys = [self._owner_key(cart_id), *self._cart_keys(cart_id)]
+        if user_id is not None:
+            keys.append(self._user_key(user_id))
+        for key in keys:
+            self.client.expire(key, seconds)
+
+    def _key(self, *parts: Any) -> str:
+        return ":".join([self.prefix, *map(str, parts)])
+
+    def _user_key(self, user_id: int) -> str:
+        return self._key("user", user_id)
+
+    def _owner_key(self, cart_id: int) -> str:
+        return self._key(cart_id, "user")
+
+    def _cart_keys(self, cart_id: int) -> Tuple[str, str, str]:
+        return (
+            self._key(cart_id, "lines"),
+            self._key(cart_id, "qty"),
+            self._key(cart_id, "index"),
+        )
+
+    @staticmethod
+    def _index_field(line: CartLine) -> str:
+        return f"{line.product_id}:{line.variant_hash}"
+
+    @staticmethod
+    def _encode(line: CartLine) -> str:
+        return json.dumps(
+            {
+                "product_id": line.product_id,
+                "variant_data": line.variant_data,
+                "variant_hash": line.variant_hash,
+            }
+        )
+
+
+@lru_cache
+def get_cart_store() -> CartStore:
+    """The store selected by settings.CART_STORE (memory or redis)."""
+    if settings.CART_STORE == "memory":
+        if settings.WEB_CONCURRENCY > 1:
+            # Each process would hand out the same cart item ids.
+            raise ValueError(
+                "CART_STORE=memory is process-local; use CART_STORE=redis "
+                f"with WEB_CONCURRENCY={settings.WEB_CONCURRENCY}"
+            )
+        return MemoryCartStore(idle_timeout=settings.CART_STORE_IDLE_TIMEOUT)
+    if settings.CART_STORE == "redis":
+        return RedisCartStore.from_url(
+            settings.CART_STORE_URL, idle_timeout=settings.CART_STORE_IDLE_TIMEOUT
+        )
+    raise ValueError(f"Unknown CART_STORE {settings.CART_STORE!r}")
@@ -0,0 +1,101 @@
+import logging
+import threading
+from functools import lru_cache
+from typing import Callable, Optional
+
+from sqlalchemy.orm import Session
+
+from app.cart.store import CartStore, get_cart_store
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.repositories.cart_repository import CartRepository
+
+logger = logging.getLogger(__name__)
+
+
+class CartWriteBack:
+    """
+    Copies carts changed in a CartStore to the cart tables from a background
+    thread, every `interval` seconds. Many changes to one cart between two
+    passes cost a single write. Each pass then lets the store drop carts
+    that are written back and idle.
+    """
+
+    def __init__(
+        self,
+        store: CartStore,
+        session_factory: Callable[[], Session] = SessionLocal,
+        *,
+        interval: float = 1.0,
+        batch_size: int = 100,
+    ):
+        self.store = store
+        self.session_factory = session_factory
+        self.interval = interval
+        self.batch_size = batch_size
+        self.repo = CartRepository()
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        with self._lock:
+            if self._stop.is_set():
+                return
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+
+    def flush(self) -> int:
+        """Write every dirty cart on the calling thread; returns the count."""
+        written = 0
+        failed = []
+        while True:
+            cart_ids = self.store.take_dirty(self.batch_size)
+            if not cart_ids:
+                break
+            db = self.session_factory()
+            try:
+                for cart_id in cart_ids:
+                    if self._write(db, cart_id):
+                        written += 1
+                    else:
+                        failed.append(cart_id)
+            finally:
+                db.close()
+        # Failed carts are retried on the next pass.
+        for cart_id in failed:
+            self.store.mark_dirty(cart_id)
+        self.store.evict_idle()
+        return written
+
+    def close(self) -> None:
+        """Stop the worker and write what is left; used on app shutdown."""
+        self._stop.set()
+        with self._lock:
+            thread = self._thread
+        if thread is not None:
+            thread.join()
+        self.flush()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.flush()
+
+    def _write(self, db: Session, cart_id: int) -> bool:
+        try:
+            with self.store.lock(cart_id):
+                # Checkout evicts under the same lock; its lines are not rewritten.
+                if self.store.has_cart(cart_id):
+                    self.repo.sync_cart_items(db, cart_id, self.store.lines(cart_id))
+                    db.commit()
+            return True
+        except Exception:
+            db.rollback()
+            logger.exception("Cart %d write-back failed", cart_id)
+            return False
+
+
+@lru_cache
+def get_cart_write_back() -> CartWriteBack:
+    return CartWriteBack(get_cart_store(), interval=settings.CART_WRITE_BACK_INTERVAL)
@@ -0,0 +1,260 @@
+import itertools
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, NamedTuple, Optional, Tuple
+
+
+class LRUCache:
+    """
+    Small thread-safe in-process LRU cache with an optional TTL per entry.
+    Shared across requests, so values should be immutable (schemas, bytes).
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class FrequencySketch:
+    """
+    Count-min sketch of recent access frequency with 4-bit saturating
+    counters. Every `sample_size` increments all counters are halved, so
+    popularity ages out and the sketch follows shifts in traffic.
+    """
+
+    _SEEDS = (0x9E3779B1, 0x85EBCA77, 0xC2B2AE3D, 0x27D4EB2F)
+
+    def __init__(self, width: int):
+        self.width = 1 << max(4, (width - 1).bit_length())
+        self.sample_size = 10 * self.width
+        self._mask = self.width - 1
+        self._rows = [array("B", bytes(self.width)) for _ in self._SEEDS]
+        self._additions = 0
+
+    def _slots(self, key: Hashable):
+        hashed = hash(key) & 0xFFFFFFFFFFFFFFFF
+        for row, seed in zip(self._rows, self._SEEDS):
+            mixed = (hashed ^ seed) * 0xFF51AFD7ED558CCD
+            yield row, (mixed ^ (mixed >> 33)) & self._mask
+
+    def increment(self, key: Hashable) -> None:
+        for row, slot in self._slots(key):
+            if row[slot] < 15:
+                row[slot] += 1
+        self._additions += 1
+        if self._additions >= self.sample_size:
+            self._additions //= 2
+            for row in self._rows:
+                for slot in range(self.width):
+                    row[slot] >>= 1
+
+    def estimate(self, key: Hashable) -> int:
+        return min(row[slot] for row, slot in self._slots(key))
+
+    def clear(self) -> None:
+        for row in self._rows:
+            for slot in range(self.width):
+                row[slot] = 0
+        self._additions = 0
+
+
+class TinyLFUCache:
+    """
+    Thread-safe cache with TinyLFU admission over an LRU with TTL.
+
+    Every lookup is recorded in a FrequencySketch. When the cache is full a
+    new entry only displaces the least recently used one if it has been
+    requested more often, so a burst of one-off queries cannot flush the
+    popular head. Hit, miss, eviction and rejection counts are kept for
+    stats().
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._sketch = FrequencySketch(maxsize)
+        self._lock = threading.Lock()
+        self._reset_stats()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            self._sketch.increment(key)
+            entry = self._data.get(key)
+            if entry is not None and entry[1] is not None and entry[1] <= time.monotonic():
+                del self._data[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._data.move_to_end(key)
+            return entry[0]
+
+    def set(self, key: Hashable, value: Any) -> bool:
+        """Store the value; False when admission keeps it out."""
+        now = time.monotonic()
+        expires_at = now + self.ttl if self.ttl is not None else None
+        with self._lock:
+            if key not in self._data and len(self._data) >= self.maxsize:
+                victim = next(iter(self._data))
+                victim_expires_at = self._data[victim][1]
+                expired = victim_expires_at is not None and victim_expires_at <= now
+                if not expired and self._sketch.estimate(key) <= self._sketch.estimate(victim):
+                    self.rejections += 1
+                    return False
+                del self._data[victim]
+                self.evictions += 1
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            return True
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._sketch.clear()
+            self._reset_stats()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "rejections": self.rejections,
+            }
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def _reset_stats(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.rejections = 0
+
+
+class VersionStamp:
+    """Monotonic counter folded into cache keys; bump() retires every key."""
+
+    def __init__(self):
+        self._counter = itertools.count(1)
+        self.value = 0
+
+    def bump(self) -> int:
+        self.value = next(self._counter)
+        return self.value
+
+
+class CachedDetail(NamedTuple):
+    etag: str
+    body: bytes
+
+
+class ProductDetailCache:
+    """
+    Serialized ProductDetail JSON keyed by product id. The backend only needs
+    get/set/delete/clear, so the in-process LRU can be swapped for a shared
+    store (e.g. a Redis adapter) without touching callers. Writers call
+    invalidate() after committing any change that shows up in the detail.
+
+    Readers take a generation() token before loading the product and pass it
+    to set(); a set whose product was invalidated in between is dropped, so a
+    slow reader cannot cache bytes older than the last write. The tokens are
+    per process, like invalidate() on the default LRU backend.
+    """
+
+    def __init__(self, backend: Any):
+        self.backend = backend
+        self._lock = threading.Lock()
+        self._epoch = 0
+        self._generations: Dict[int, int] = {}
+
+    @staticmethod
+    def _key(product_id: int) -> str:
+        return f"product-detail:{product_id}"
+
+    def get(self, product_id: int) -> Optional[CachedDetail]:
+        return self.backend.get(self._key(product_id))
+
+    def generation(self, product_id: int) -> Tuple[int, int]:
+        with self._lock:
+            return self._epoch, self._generations.get(product_id, 0)
+
+    def set(self, product_id: int, detail: CachedDetail, *, generation: Tuple[int, int]) -> bool:
+        with self._lock:
+            if generation != (self._epoch, self._generations.get(product_id, 0)):
+                return False
+            self.backend.set(self._key(product_id), detail)
+            return True
+
+    def invalidate(self, product_id: int) -> None:
+        with self._lock:
+            self._generations[product_id] = self._generations.get(product_id, 0) + 1
+            self.backend.delete(self._key(product_id))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._epoch += 1
+            self._generations.clear()
+            self.backend.clear()
+
+
+# TTL bounds how long a missed invalidate() (or a change made outside this
+# process) can keep serving an old payload.
+product_detail_cache = ProductDetailCache(LRUCache(maxsize=2048, ttl=300))
+
+# Ranked product ids per normalized search; keys carry catalog_version, which
+# product writes bump, so results never outlive the catalog they came from.
+catalog_version = VersionStamp()
+search_result_cache = TinyLFUCache(maxsize=2048, ttl=300)
+
+# Facet counts per filter combination, keyed with catalog_version as well;
+# the TTL only bounds writes made by other processes.
+facet_cache = LRUCache(maxsize=512, ttl=60)
+
+# Suggestion lists per normalized prefix, keyed by the suggest index version.
+suggest_cache = TinyLFUCache(maxsize=4096, ttl=300)
@@ -1,4 +1,5 @@
 from functools import lru_cache
+from typing import Optional
 
 from pydantic_settings import BaseSettings
 
@@ -15,6 +16,24 @@ class Settings(BaseSettings):
     PAYPAL_CLIENT_ID: str = "PAYPAL_CLIENT_ID"
     PAYPAL_CLIENT_SECRET: str = "PAYPAL_CLIENT_SECRET"
     PAYPAL_BASE_URL: str = "https://api.sandbox.paypal.com"
+    # Full-text product search backend: auto (by dialect), mysql, fts5, bm25
+    SEARCH_BACKEND: str = "auto"
+    # Search history retention: newest entries kept per user (and for the
+    # anonymous bucket), plus an optional maximum age in days.
+    SEARCH_HISTORY_KEEP_PER_USER: int = 100
+    SEARCH_HISTORY_MAX_AGE_DAYS: Optional[int] = None
+    # Cart storage: sql (tables only), memory or redis. The non-SQL stores
+    # take cart writes and copy them to the tables every
+    # CART_WRITE_BACK_INTERVAL seconds and at checkout. Carts untouched for
+    # CART_STORE_IDLE_TIMEOUT seconds are dropped from the store (their
+    # lines are already in the tables) and reloaded on next use.
+    CART_STORE: str = "sql"
+    CART_STORE_URL: str = "redis://localhost:6379/0"
+    CART_WRITE_BACK_INTERVAL: float = 1.0
+    CART_STORE_IDLE_TIMEOUT: float = 3600.0
+    # App worker processes; uvicorn and gunicorn read the same variable for
+    # their default worker count. CART_STORE=memory needs exactly one.
+    WEB_CONCURRENCY: int = 1
 
     class Config:
         env_file = ".env"
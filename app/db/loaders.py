@@ -0,0 +1,92 @@
+from typing import Any, Callable, Dict, Iterable, List, Type
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.util import identity_key
+
+_LOADERS_KEY = "loaders"
+
+BatchFn = Callable[[List[Any]], Dict[Any, Any]]
+
+
+class Loader:
+    """
+    Memoizing batch loader in the spirit of DataLoader.
+
+    `load_many` fetches all keys it has not seen yet with one `batch_fn`
+    call; `load` is the one-key case, so repeated single lookups within a
+    request cost one fetch. Every answer, misses included, is remembered
+    until the session's transaction ends.
+    """
+
+    def __init__(self, batch_fn: BatchFn):
+        self.batch_fn = batch_fn
+        self.batches = 0
+        self._cache: Dict[Any, Any] = {}
+
+    def load(self, key: Any) -> Any:
+        return self.load_many([key]).get(key)
+
+    def load_many(self, keys: Iterable[Any]) -> Dict[Any, Any]:
+        """Found values by key, in `keys` order; unknown keys are absent."""
+        keys = list(dict.fromkeys(keys))
+        batch = [key for key in keys if key not in self._cache]
+        if batch:
+            self.batches += 1
+            found = self.batch_fn(batch)
+            for key in batch:
+                self._cache[key] = found.get(key)
+        return {key: self._cache[key] for key in keys if self._cache[key] is not None}
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+
+def get_loader(db: Session, name: str, batch_fn: BatchFn) -> Loader:
+    """
+    The session's loader called `name`, created with `batch_fn` on first
+    use. A session lives for one request (see get_db), so this is the
+    request-scoped loader.
+    """
+    loaders = db.info.setdefault(_LOADERS_KEY, {})
+    loader = loaders.get(name)
+    if loader is None:
+        loader = loaders[name] = Loader(batch_fn)
+    return loader
+
+
+def fetch_by_ids(db: Session, model: Type[Any], ids: Iterable[int]) -> Dict[int, Any]:
+    """
+    Instances of `model` by primary key in at most one round trip. Rows
+    already loaded (and not expired) in the identity map are reused; the
+    rest come from a single IN query.
+    """
+    found: Dict[int, Any] = {}
+    missing: List[int] = []
+    for item_id in dict.fromkeys(ids):
+        instance = db.identity_map.get(identity_key(model, item_id))
+        if instance is not None and not inspect(instance).expired:
+            found[item_id] = instance
+        else:
+            missing.append(item_id)
+    if missing:
+        for instance in db.query(model).filter(model.id.in_(missing)):
+            found[instance.id] = instance
+    return found
+
+
+def clear_loaders(db: Session) -> None:
+    db.info.pop(_LOADERS_KEY, None)
+
+
+# Memoized answers are only valid inside the transaction that read them:
+# a flush or commit may add, delete or expire rows.
+@event.listens_for(Session, "after_flush")
+def _clear_after_flush(session: Session, flush_context: Any) -> None:
+    clear_loaders(session)
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _clear_after_transaction(session: Session) -> None:
+    clear_loaders(session)
@@ -8,12 +8,15 @@ from app.ai.seller_chain import SellerChain
 from app.ai.avatar_chain import AvatarChain
 from app.ai.tools.product_search_tool import ProductSearchTool
 from app.ai.tools.seller_tools import SellerTools
+from app.cart.store import get_cart_store
+from app.cart.write_back import get_cart_write_back
 from app.db.session import SessionLocal
 from app.core.image_client import ImageClient
 from app.repositories.ai_conversation_repository import AiConversationRepository
 from app.repositories.ai_avatar_request_repository import AiAvatarRequestRepository
 from app.repositories.avatar_preset_repository import AvatarPresetRepository
 from app.repositories.cart_repository import CartRepository
+from app.repositories.cart_store_repository import StoreCartRepository
 from app.repositories.order_repository import OrderRepository
 from app.repositories.payment_repository import PaymentRepository
 from app.repositories.paypal_event_repository import PayPalEventRepository
@@ -140,7 +143,9 @@ def get_ai_avatar_service(
 
 
 def get_cart_repository() -> CartRepository:
-    return CartRepository()
+    if settings.CART_STORE == "sql":
+        return CartRepository()
+    return StoreCartRepository(get_cart_store(), get_cart_write_back())
 
 
 def get_order_repository() -> OrderRepository:
@@ -18,6 +18,8 @@ class AvatarPreset(Base):
     description = Column(Text, nullable=True)
     status = Column(Enum(AvatarPresetStatus), nullable=False, default=AvatarPresetStatus.ACTIVE)
     parameters = Column(JSON, nullable=False)
+    # Bumped on every update; the list ETag is built from (id, version).
+    version = Column(Integer, nullable=False, default=1, server_default="1")
     created_at = Column(DateTime, server_default=func.now(), nullable=False)
     updated_at = Column(
         DateTime,
@@ -1,9 +1,30 @@
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, JSON, func
+import hashlib
+import json
+from typing import Any, Dict, Optional
+
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, JSON, String, func
 from sqlalchemy.orm import relationship
 
 from app.db.base_class import Base
 
 
+def variant_hash(variant_data: Optional[Dict[str, Any]]) -> str:
+    """
+    Canonical fingerprint of a line's variant selection: SHA-1 of the JSON
+    with sorted keys, so equal selections hash equally whatever their key
+    order. No selection and an empty one share a fingerprint.
+    """
+    canonical = json.dumps(
+        variant_data or {}, sort_keys=True, separators=(",", ":"), default=str
+    )
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+
+
+def variant_hash_default(context) -> str:
+    """Column default: fingerprint of the row's inserted variant_data."""
+    return variant_hash(context.get_current_parameters().get("variant_data"))
+
+
 class Cart(Base):
     __tablename__ = "carts"
 
@@ -27,12 +48,23 @@ class Cart(Base):
 
 class CartItem(Base):
     __tablename__ = "cart_items"
+    __table_args__ = (
+        # One line per product variant; adding to the cart upserts on it.
+        Index(
+            "ix_cart_items_cart_id_product_id_variant_hash",
+            "cart_id",
+            "product_id",
+            "variant_hash",
+            unique=True,
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     cart_id = Column(Integer, ForeignKey("carts.id"), nullable=False, index=True)
     product_id = Column(Integer, ForeignKey("products.id"), nullable=False, index=True)
     quantity = Column(Integer, nullable=False, default=1)
     variant_data = Column(JSON, nullable=True)
+    variant_hash = Column(String(40), nullable=False, default=variant_hash_default)
 
     cart = relationship("Cart", back_populates="items")
     product = relationship("Product")
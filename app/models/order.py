@@ -14,6 +14,7 @@ from sqlalchemy import (
 from sqlalchemy.orm import relationship
 
 from app.db.base_class import Base
+from app.models.cart import variant_hash_default
 
 
 class OrderStatus(str, enum.Enum):
@@ -56,6 +57,7 @@ class OrderItem(Base):
     quantity = Column(Integer, nullable=False)
     unit_price = Column(Numeric(10, 2), nullable=False)
     variant_data = Column(JSON, nullable=True)
+    variant_hash = Column(String(40), nullable=False, default=variant_hash_default)
 
     order = relationship("Order", back_populates="items")
     product = relationship("Product")
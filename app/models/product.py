@@ -1,21 +1,25 @@
 import enum
 
 from sqlalchemy import (
+    DDL,
     Boolean,
     Column,
     DateTime,
     Enum,
     ForeignKey,
+    Index,
     Integer,
     JSON,
     Numeric,
     String,
     Text,
+    event,
     func,
 )
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
 
 from app.db.base_class import Base
+from app.models.product_facet import FACET_VALUE_MAX_LENGTH, ProductColor, ProductSize
 
 
 class ProductStatus(str, enum.Enum):
@@ -26,6 +30,30 @@ class ProductStatus(str, enum.Enum):
 
 class Product(Base):
     __tablename__ = "products"
+    __table_args__ = (
+        # Catalog listing: status filter (+ category/gender) ordered by one
+        # of the supported sorts, always tie-broken by id.
+        Index("ix_products_status_created_at", "status", "created_at", "id"),
+        Index("ix_products_status_price", "status", "price", "id"),
+        Index("ix_products_status_id", "status", "id"),
+        Index("ix_products_status_category_created_at", "status", "category", "created_at", "id"),
+        Index("ix_products_status_category_price", "status", "category", "price", "id"),
+        Index("ix_products_status_gender_created_at", "status", "gender", "created_at", "id"),
+        Index("ix_products_status_gender_price", "status", "gender", "price", "id"),
+        # Admin review lists, newest first.
+        Index("ix_products_created_at", "created_at"),
+        Index("ix_products_seller_created_at", "seller_id", "created_at"),
+        Index("ix_products_flagged_created_at", "is_flagged", "created_at"),
+        Index("ix_products_hidden_created_at", "is_hidden", "created_at"),
+        # Full-text search (see app/search/fulltext.py); SQLite uses FTS5 below.
+        Index(
+            "ft_products_name_description_category",
+            "name",
+            "description",
+            "category",
+            mysql_prefix="FULLTEXT",
+        ).ddl_if(dialect="mysql"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     seller_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
@@ -64,3 +92,72 @@ class Product(Base):
         back_populates="product",
         cascade="all, delete-orphan",
     )
+
+    # Normalized copies of size_options/color_options so facet filters can
+    # use an index instead of scanning JSON. Kept in sync by the validators.
+    sizes = relationship(
+        "ProductSize",
+        back_populates="product",
+        cascade="all, delete-orphan",
+    )
+    colors = relationship(
+        "ProductColor",
+        back_populates="product",
+        cascade="all, delete-orphan",
+    )
+
+    @validates("size_options")
+    def _sync_sizes(self, key, value):
+        self.sizes = _facet_rows(ProductSize, self.sizes, value)
+        return value
+
+    @validates("color_options")
+    def _sync_colors(self, key, value):
+        self.colors = _facet_rows(ProductColor, self.colors, value)
+        return value
+
+    def sync_facets(self) -> None:
+        """Rebuild sizes/colors from the option lists as they stand."""
+        self.sizes = _facet_rows(ProductSize, self.sizes, self.size_options)
+        self.colors = _facet_rows(ProductColor, self.colors, self.color_options)
+
+
+def _facet_rows(model, rows, values):
+    current = {row.value: row for row in rows}
+    return [current.get(option) or model(value=option) for option in _distinct_options(values)]
+
+
+def _distinct_options(values):
+    # Options written before the schemas capped their length are cut to fit.
+    return list(
+        dict.fromkeys(str(value)[:FACET_VALUE_MAX_LENGTH] for value in values or [])
+    )
+
+
+# SQLite full-text search: an external-content FTS5 table mirrored by triggers.
+_FTS5_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5("
+    "name, description, category, content='products', content_rowid='id')",
+    "CREATE TRIGGER IF NOT EXISTS products_fts_ai AFTER INSERT ON products BEGIN "
+    "INSERT INTO products_fts(rowid, name, description, category) "
+    "VALUES (new.id, new.name, new.description, new.category); END",
+    "CREATE TRIGGER IF NOT EXISTS products_fts_ad AFTER DELETE ON products BEGIN "
+    "INSERT INTO products_fts(products_fts, rowid, name, description, category) "
+    "VALUES ('delete', old.id, old.name, old.description, old.category); END",
+    "CREATE TRIGGER IF NOT EXISTS products_fts_au AFTER UPDATE ON products BEGIN "
+    "INSERT INTO products_fts(products_fts, rowid, name, description, category) "
+    "VALUES ('delete', old.id, old.name, old.description, old.category); "
+    "INSERT INTO products_fts(rowid, name, description, category) "
+    "VALUES (new.id, new.name, new.description, new.category); END",
+)
+for _statement in _FTS5_DDL:
+    event.listen(
+        Product.__table__,
+        "after_create",
+        DDL(_statement).execute_if(dialect="sqlite"),
+    )
+event.listen(
+    Product.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS products_fts").execute_if(dialect="sqlite"),
+)
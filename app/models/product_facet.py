@@ -0,0 +1,34 @@
+from sqlalchemy import Column, ForeignKey, Index, Integer, String
+from sqlalchemy.orm import relationship
+
+from app.db.base_class import Base
+
+# Longest size/color value a facet row holds; longer options are rejected
+# by the product schemas.
+FACET_VALUE_MAX_LENGTH = 50
+
+
+class ProductSize(Base):
+    __tablename__ = "product_sizes"
+    __table_args__ = (
+        Index("ix_product_sizes_value_product_id", "value", "product_id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    product_id = Column(Integer, ForeignKey("products.id"), nullable=False, index=True)
+    value = Column(String(FACET_VALUE_MAX_LENGTH), nullable=False)
+
+    product = relationship("Product", back_populates="sizes")
+
+
+class ProductColor(Base):
+    __tablename__ = "product_colors"
+    __table_args__ = (
+        Index("ix_product_colors_value_product_id", "value", "product_id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    product_id = Column(Integer, ForeignKey("products.id"), nullable=False, index=True)
+    value = Column(String(FACET_VALUE_MAX_LENGTH), nullable=False)
+
+    product = relationship("Product", back_populates="colors")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, func
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Index, Integer, String, func
 from sqlalchemy.orm import relationship
 
 from app.db.base_class import Base
@@ -6,6 +6,11 @@ from app.db.base_class import Base
 
 class SearchKeyword(Base):
     __tablename__ = "search_keywords"
+    __table_args__ = (
+        # Per-user history reads and retention both walk a user's entries
+        # newest first.
+        Index("ix_search_keywords_user_id_created_at", "user_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)
@@ -14,3 +19,23 @@ class SearchKeyword(Base):
     created_at = Column(DateTime, server_default=func.now(), nullable=False)
 
     user = relationship("User", backref="search_keywords")
+
+
+class SearchKeywordStat(Base):
+    """
+    Popularity rollup of search_keywords, one row per normalized keyword.
+
+    `score` uses forward decay: every search adds a weight that grows
+    exponentially with its timestamp, so ordering by the stored score equals
+    ordering by the time-decayed popularity without rewriting old rows. The
+    weights themselves outgrow any float within years, so `score` holds the
+    base-2 logarithm of their sum.
+    """
+
+    __tablename__ = "search_keyword_stats"
+
+    id = Column(Integer, primary_key=True, index=True)
+    keyword = Column(String(255), nullable=False, unique=True)
+    search_count = Column(Integer, nullable=False, default=0)
+    last_seen = Column(DateTime, nullable=False)
+    score = Column(Float(53), nullable=False, default=0.0, index=True)
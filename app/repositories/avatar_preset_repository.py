@@ -1,7 +1,8 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 from sqlalchemy.orm import Session
 
+from app.db.loaders import Loader, fetch_by_ids, get_loader
 from app.models.avatar_preset import AvatarPreset, AvatarPresetStatus
 from app.schemas.avatar import AvatarPresetCreate, AvatarPresetUpdate
 
@@ -15,6 +16,16 @@ class AvatarPresetRepository:
             .all()
         )
 
+    def list_active_versions(self, db: Session) -> List[Tuple[int, int]]:
+        """(id, version) of active presets, in list_active order."""
+        rows = (
+            db.query(AvatarPreset.id, AvatarPreset.version)
+            .filter(AvatarPreset.status == AvatarPresetStatus.ACTIVE)
+            .order_by(AvatarPreset.created_at.desc())
+            .all()
+        )
+        return [(row.id, row.version) for row in rows]
+
     def create(self, db: Session, data: AvatarPresetCreate) -> AvatarPreset:
         preset = AvatarPreset(
             name=data.name,
@@ -36,10 +47,16 @@ class AvatarPresetRepository:
             if field == "parameters" and value is not None:
                 value = value.model_dump()
             setattr(preset, field, value)
+        preset.version = AvatarPreset.version + 1
         db.add(preset)
         db.commit()
         db.refresh(preset)
         return preset
 
     def get_by_id(self, db: Session, preset_id: int) -> Optional[AvatarPreset]:
-        return db.query(AvatarPreset).filter(AvatarPreset.id == preset_id).first()
+        return self._loader(db).load(preset_id)
+
+    def _loader(self, db: Session) -> Loader:
+        return get_loader(
+            db, "avatar_presets", lambda ids: fetch_by_ids(db, AvatarPreset, ids)
+        )
@@ -1,52 +1,233 @@
-from typing import Optional
+from contextlib import nullcontext
+from typing import Any, ContextManager, Dict, List, Optional
 
+from sqlalchemy import func, select
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Row
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from app.models.cart import Cart, CartItem
+from app.cart.store import CartLine
+from app.models.cart import Cart, CartItem, variant_hash
+from app.models.product import Product
+from app.models.product_image import ProductImage
 from app.schemas.cart import CartItemCreate
 
 
+def _main_image_url():
+    """First image of the row's product by insertion order, as a scalar subquery."""
+    return (
+        select(ProductImage.url)
+        .where(ProductImage.product_id == Product.id)
+        .order_by(ProductImage.id)
+        .limit(1)
+        .correlate(Product)
+        .scalar_subquery()
+    )
+
+
 class CartRepository:
-    def get_or_create_cart(self, db: Session, user_id: int) -> Cart:
-        cart = self.get_cart(db, user_id)
-        if cart is None:
-            cart = Cart(user_id=user_id)
-            db.add(cart)
-            db.commit()
-            db.refresh(cart)
-        return cart
+    """
+    Cart reads and writes. The write methods only stage changes in the
+    session; the caller commits the whole operation once. flush_cart, which
+    writes an outside copy of the cart back before checkout, commits itself.
+    """
 
     def get_cart(self, db: Session, user_id: int) -> Optional[Cart]:
         return db.query(Cart).filter(Cart.user_id == user_id).first()
 
-    def add_item(self, db: Session, cart: Cart, data: CartItemCreate) -> CartItem:
-        item = CartItem(
-            cart_id=cart.id,
-            product_id=data.product_id,
-            quantity=data.quantity,
-            variant_data=data.variant_data,
+    def get_or_create_cart_id(self, db: Session, user_id: int) -> int:
+        """The user's cart id, inserting the cart (uncommitted) if needed."""
+        cart_id = db.query(Cart.id).filter(Cart.user_id == user_id).scalar()
+        if cart_id is not None:
+            return cart_id
+        cart = Cart(user_id=user_id)
+        try:
+            with db.begin_nested():
+                db.add(cart)
+        except IntegrityError:
+            # A concurrent request created the cart first.
+            return db.query(Cart.id).filter(Cart.user_id == user_id).scalar()
+        return cart.id
+
+    def get_cart_rows(self, db: Session, user_id: int) -> List[Row]:
+        """
+        The user's cart, one row per item (a single row with null item
+        columns for an empty cart, none if there is no cart), joined with the
+        product fields the cart view shows. The main image is resolved with a
+        correlated subquery, so the whole view is one statement.
+        """
+        return (
+            db.query(
+                Cart.id.label("cart_id"),
+                CartItem.id.label("item_id"),
+                CartItem.product_id,
+                CartItem.quantity,
+                CartItem.variant_data,
+                Product.name,
+                Product.price,
+                Product.stock,
+                Product.status,
+                _main_image_url().label("main_image_url"),
+            )
+            .select_from(Cart)
+            .outerjoin(CartItem, CartItem.cart_id == Cart.id)
+            .outerjoin(Product, Product.id == CartItem.product_id)
+            .filter(Cart.user_id == user_id)
+            .order_by(CartItem.id)
+            .all()
+        )
+
+    def find_item(
+        self,
+        db: Session,
+        *,
+        cart_id: int,
+        product_id: int,
+        variant_data: Optional[Dict[str, Any]],
+    ) -> Optional[CartItem]:
+        return (
+            db.query(CartItem)
+            .filter(
+                CartItem.cart_id == cart_id,
+                CartItem.product_id == product_id,
+                CartItem.variant_hash == variant_hash(variant_data),
+            )
+            .first()
+        )
+
+    def add_quantity(
+        self, db: Session, *, cart_id: int, data: CartItemCreate
+    ) -> None:
+        """
+        Add to the quantity of the line for this product variant, inserting
+        the line if there is none, as one upsert on the unique
+        (cart_id, product_id, variant_hash) index, so concurrent adds of the
+        same variant merge instead of racing.
+        """
+        values = {
+            "cart_id": cart_id,
+            "product_id": data.product_id,
+            "quantity": data.quantity,
+            "variant_data": data.variant_data,
+            "variant_hash": variant_hash(data.variant_data),
+        }
+        dialect = db.get_bind().dialect.name
+        if dialect == "mysql":
+            statement = mysql_insert(CartItem).values(**values)
+            statement = statement.on_duplicate_key_update(
+                quantity=CartItem.quantity + statement.inserted.quantity
+            )
+        elif dialect == "sqlite":
+            statement = sqlite_insert(CartItem).values(**values)
+            statement = statement.on_conflict_do_update(
+                index_elements=["cart_id", "product_id", "variant_hash"],
+                set_={"quantity": CartItem.quantity + statement.excluded.quantity},
+            )
+        else:
+            item = self.find_item(
+                db,
+                cart_id=cart_id,
+                product_id=data.product_id,
+                variant_data=data.variant_data,
+            )
+            if item is None:
+                db.add(CartItem(**values))
+            else:
+                item.quantity += data.quantity
+            db.flush()
+            return
+        db.execute(statement)
+
+    def get_user_item(self, db: Session, *, user_id: int, item_id: int) -> Optional[CartItem]:
+        """The cart item, only if it belongs to the user's cart."""
+        return (
+            db.query(CartItem)
+            .join(Cart, Cart.id == CartItem.cart_id)
+            .filter(CartItem.id == item_id, Cart.user_id == user_id)
+            .first()
+        )
+
+    def get_user_items(
+        self, db: Session, *, user_id: int, item_ids: List[int]
+    ) -> Dict[int, CartItem]:
+        """The listed cart items that belong to the user's cart, by id."""
+        items = (
+            db.query(CartItem)
+            .join(Cart, Cart.id == CartItem.cart_id)
+            .filter(CartItem.id.in_(item_ids), Cart.user_id == user_id)
+        )
+        return {item.id: item for item in items}
+
+    # Line writes are issued as statements right away, like the add upsert,
+    # so the operations of one unit of work apply in order; loaded CartItem
+    # objects are only used for their id.
+    def set_quantity(self, db: Session, item: CartItem, quantity: int) -> None:
+        db.query(CartItem).filter(CartItem.id == item.id).update(
+            {CartItem.quantity: quantity}, synchronize_session=False
         )
-        db.add(item)
-        db.commit()
-        db.refresh(item)
-        db.refresh(cart)
-        return item
-
-    def get_item_by_id(self, db: Session, item_id: int) -> Optional[CartItem]:
-        return db.query(CartItem).filter(CartItem.id == item_id).first()
-
-    def update_item_quantity(self, db: Session, item: CartItem, quantity: int) -> CartItem:
-        item.quantity = quantity
-        db.add(item)
-        db.commit()
-        db.refresh(item)
-        if item.cart is not None:
-            db.refresh(item.cart)
-        return item
 
     def remove_item(self, db: Session, item: CartItem) -> None:
-        cart = item.cart
-        db.delete(item)
-        db.commit()
-        if cart is not None:
-            db.refresh(cart)
+        db.query(CartItem).filter(CartItem.id == item.id).delete(
+            synchronize_session=False
+        )
+
+    def lock_cart(self, db: Session, user_id: int) -> ContextManager[Any]:
+        """Held across checkout; nothing else writes the cart tables here."""
+        return nullcontext()
+
+    def flush_cart(self, db: Session, user_id: int) -> None:
+        """Make the cart tables current for the user and commit; a no-op here."""
+
+    def evict_cart(self, db: Session, user_id: int) -> None:
+        """Forget any copy of the user's cart held outside the tables."""
+
+    def list_items(self, db: Session, cart_id: int) -> List[CartItem]:
+        return (
+            db.query(CartItem)
+            .filter(CartItem.cart_id == cart_id)
+            .order_by(CartItem.id)
+            .all()
+        )
+
+    def max_item_id(self, db: Session) -> int:
+        return db.query(func.max(CartItem.id)).scalar() or 0
+
+    def get_product_rows(self, db: Session, product_ids: List[int]) -> Dict[int, Row]:
+        """The product fields of the cart view (see get_cart_rows), by id."""
+        rows = db.query(
+            Product.id,
+            Product.name,
+            Product.price,
+            Product.stock,
+            Product.status,
+            _main_image_url().label("main_image_url"),
+        ).filter(Product.id.in_(product_ids))
+        return {row.id: row for row in rows}
+
+    def sync_cart_items(self, db: Session, cart_id: int, lines: List[CartLine]) -> None:
+        """Stage the changes that make the cart's rows match `lines` (ids included)."""
+        existing = {item.id: item for item in self.list_items(db, cart_id)}
+        wanted = {line.id for line in lines}
+        stale = [item for item_id, item in existing.items() if item_id not in wanted]
+        for item in stale:
+            db.delete(item)
+        if stale:
+            # Deletes go first: a replaced line may reuse the variant key.
+            db.flush()
+        for line in lines:
+            item = existing.get(line.id)
+            if item is None:
+                db.add(
+                    CartItem(
+                        id=line.id,
+                        cart_id=cart_id,
+                        product_id=line.product_id,
+                        quantity=line.quantity,
+                        variant_data=line.variant_data,
+                        variant_hash=line.variant_hash,
+                    )
+                )
+            elif item.quantity != line.quantity:
+                item.quantity = line.quantity
@@ -0,0 +1,153 @@
+from collections import namedtuple
+from contextlib import nullcontext
+from typing import Any, ContextManager, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.cart.store import CartLine, CartStore
+from app.cart.write_back import CartWriteBack
+from app.models.cart import Cart, CartItem
+from app.repositories.cart_repository import CartRepository
+from app.schemas.cart import CartItemCreate
+
+# Same fields as the rows of CartRepository.get_cart_rows.
+CartViewRow = namedtuple(
+    "CartViewRow",
+    "cart_id item_id product_id quantity variant_data name price stock status main_image_url",
+)
+
+
+class StoreCartRepository(CartRepository):
+    """
+    CartRepository whose line writes go to a CartStore instead of the cart
+    tables. A cart is copied into the store on first use; CartWriteBack
+    copies changes back, and flush_cart does so synchronously (checkout
+    reads the tables, under lock_cart so no write-back pass interleaves).
+    Carts themselves are still created in SQL.
+    """
+
+    def __init__(self, store: CartStore, write_back: CartWriteBack):
+        self.store = store
+        self.write_back = write_back
+
+    def get_or_create_cart_id(self, db: Session, user_id: int) -> int:
+        cart_id = self._cart_id(db, user_id)
+        if cart_id is None:
+            cart_id = super().get_or_create_cart_id(db, user_id)
+            self.store.seed_line_ids(self.max_item_id(db))
+            self.store.load_cart(user_id, cart_id, [])
+        return cart_id
+
+    def get_cart_rows(self, db: Session, user_id: int) -> List[CartViewRow]:
+        cart_id = self._cart_id(db, user_id)
+        if cart_id is None:
+            return []
+        lines = self.store.lines(cart_id)
+        if not lines:
+            return [CartViewRow(cart_id, *([None] * 9))]
+        products = self.get_product_rows(db, [line.product_id for line in lines])
+        rows = []
+        for line in lines:
+            product = products.get(line.product_id)
+            rows.append(
+                CartViewRow(
+                    cart_id=cart_id,
+                    item_id=line.id,
+                    product_id=line.product_id,
+                    quantity=line.quantity,
+                    variant_data=line.variant_data,
+                    name=product.name if product else None,
+                    price=product.price if product else None,
+                    stock=product.stock if product else None,
+                    status=product.status if product else None,
+                    main_image_url=product.main_image_url if product else None,
+                )
+            )
+        return rows
+
+    def add_quantity(self, db: Session, *, cart_id: int, data: CartItemCreate) -> None:
+        self.store.add(
+            cart_id,
+            product_id=data.product_id,
+            quantity=data.quantity,
+            variant_data=data.variant_data,
+        )
+        self.write_back.start()
+
+    def get_user_item(self, db: Session, *, user_id: int, item_id: int) -> Optional[CartItem]:
+        return self.get_user_items(db, user_id=user_id, item_ids=[item_id]).get(item_id)
+
+    def get_user_items(
+        self, db: Session, *, user_id: int, item_ids: List[int]
+    ) -> Dict[int, CartItem]:
+        """Detached CartItems built from the stored lines; not session objects."""
+        cart_id = self._cart_id(db, user_id)
+        if cart_id is None:
+            return {}
+        wanted = set(item_ids)
+        return {
+            line.id: CartItem(
+                id=line.id,
+                cart_id=cart_id,
+                product_id=line.product_id,
+                quantity=line.quantity,
+                variant_data=line.variant_data,
+                variant_hash=line.variant_hash,
+            )
+            for line in self.store.lines(cart_id)
+            if line.id in wanted
+        }
+
+    def set_quantity(self, db: Session, item: CartItem, quantity: int) -> None:
+        self.store.set_quantity(item.cart_id, item.id, quantity)
+        self.write_back.start()
+
+    def remove_item(self, db: Session, item: CartItem) -> None:
+        self.store.remove(item.cart_id, item.id)
+        self.write_back.start()
+
+    def lock_cart(self, db: Session, user_id: int) -> ContextManager[Any]:
+        cart_id = self._cart_id(db, user_id)
+        return self.store.lock(cart_id) if cart_id is not None else nullcontext()
+
+    def flush_cart(self, db: Session, user_id: int) -> None:
+        cart_id = self.store.get_cart_id(user_id)
+        if cart_id is None:
+            return
+        self.store.discard_dirty(cart_id)
+        try:
+            self.sync_cart_items(db, cart_id, self.store.lines(cart_id))
+            db.commit()
+        except Exception:
+            self.store.mark_dirty(cart_id)
+            raise
+
+    def evict_cart(self, db: Session, user_id: int) -> None:
+        cart_id = self.store.get_cart_id(user_id)
+        if cart_id is not None:
+            self.store.evict(user_id, cart_id)
+
+    def _cart_id(self, db: Session, user_id: int) -> Optional[int]:
+        """The user's cart id, copying an existing SQL cart into the store."""
+        cart_id = self.store.get_cart_id(user_id)
+        if cart_id is not None:
+            return cart_id
+        cart_id = db.query(Cart.id).filter(Cart.user_id == user_id).scalar()
+        if cart_id is None:
+            return None
+        self.store.seed_line_ids(self.max_item_id(db))
+        self.store.load_cart(
+            user_id,
+            cart_id,
+            [
+                CartLine(
+                    id=item.id,
+                    product_id=item.product_id,
+                    quantity=item.quantity,
+                    variant_data=item.variant_data,
+                    variant_hash=item.variant_hash,
+                )
+                for item in self.list_items(db, cart_id)
+            ],
+        )
+        return self.store.get_cart_id(user_id)
@@ -1,22 +1,121 @@
-from decimal import Decimal
-from typing import List, Optional, Tuple
+import base64
+import binascii
+import json
+import threading
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
 
-from sqlalchemy import asc, desc, or_
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, asc, case, desc, func, literal, or_, select, union_all
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session, selectinload
 
+from app.core.cache import catalog_version, product_detail_cache
+from app.db.loaders import Loader, fetch_by_ids, get_loader
 from app.models.product import Product, ProductStatus
 from app.models.product_avatar_config import ProductAvatarConfig
+from app.models.product_facet import ProductColor, ProductSize
 from app.models.product_image import ProductImage
 from app.schemas.product import ProductCreate, ProductUpdate
+from app.search.fulltext import get_fulltext_backend, product_document, product_text_index
+from app.search.suggest_index import suggest_index
+from app.search.vector_index import product_text, product_vector_index
+
+# Most full-text matches a catalog query ranks and pages through.
+TEXT_MATCH_LIMIT = 500
+
+
+# Upper bounds of the price facet buckets; the last bucket is open-ended.
+_PRICE_BUCKETS = (25, 50, 100, 200)
+
+
+def _price_bucket_label(index: int) -> str:
+    lower = _PRICE_BUCKETS[index - 1] if index else 0
+    if index == len(_PRICE_BUCKETS):
+        return f"{lower}+"
+    return f"{lower}-{_PRICE_BUCKETS[index]}"
+
+
+def _sort_spec(sort: Optional[str]):
+    """
+    Map the public sort name to (cursor key, leading column, direction).
+    Every ordering is made total by using the primary key as tie-breaker.
+    """
+    if sort == "price_asc":
+        return "price,id", Product.price, asc
+    if sort == "price_desc":
+        return "-price,id", Product.price, desc
+    if sort == "popularity":
+        return "-id", None, desc
+    return "-created_at,id", Product.created_at, desc
+
+
+def _encode_cursor(key: str, product: Any) -> str:
+    if key in {"price,id", "-price,id"}:
+        value: Any = str(product.price)
+    elif key == "-created_at,id":
+        value = product.created_at.isoformat()
+    elif key == "rank,id":
+        value = product.rank
+    else:
+        value = None
+    payload = json.dumps({"k": key, "v": value, "id": product.id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(key: str, cursor: str) -> Tuple[Any, int]:
+    """
+    Return (sort value, id) for an opaque cursor. Raises ValueError when the
+    cursor is malformed or was issued for a different sort order.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if payload["k"] != key:
+            raise ValueError("Cursor does not match the requested sort")
+        last_id = int(payload["id"])
+        raw = payload["v"]
+        if key in {"price,id", "-price,id"}:
+            return Decimal(raw), last_id
+        if key == "-created_at,id":
+            return datetime.fromisoformat(raw), last_id
+        if key == "rank,id":
+            return int(raw), last_id
+        return None, last_id
+    except (binascii.Error, InvalidOperation, KeyError, TypeError, UnicodeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
+def _facet_values(product: Product) -> Tuple[List[str], List[str]]:
+    return [row.value for row in product.sizes], [row.value for row in product.colors]
 
 
 class ProductRepository:
     def get(self, db: Session, product_id: int) -> Optional[Product]:
-        return db.query(Product).filter(Product.id == product_id).first()
+        return self._loader(db).load(product_id)
 
-    def list(
+    def get_many(self, db: Session, ids: Iterable[int]) -> Dict[int, Product]:
+        """
+        Products by id in at most one round trip, memoized for the request
+        (see app.db.loaders). Unknown ids are absent from the result.
+        """
+        return self._loader(db).load_many(ids)
+
+    def _loader(self, db: Session) -> Loader:
+        return get_loader(db, "products", lambda ids: fetch_by_ids(db, Product, ids))
+
+    def list_cards_by_ids(self, db: Session, ids: Sequence[int]) -> List[Row]:
+        """Card rows (see _card_columns) of the active products, in `ids` order."""
+        rows = (
+            db.query(*self._card_columns())
+            .filter(Product.id.in_(ids), Product.status == ProductStatus.ACTIVE)
+            .all()
+        )
+        by_id = {row.id: row for row in rows}
+        return [by_id[product_id] for product_id in dict.fromkeys(ids) if product_id in by_id]
+
+    def _list_filters(
         self,
-        db: Session,
         *,
         category: Optional[str] = None,
         price_min: Optional[Decimal] = None,
@@ -24,41 +123,217 @@ class ProductRepository:
         size: Optional[str] = None,
         color: Optional[str] = None,
         gender: Optional[str] = None,
-        sort: Optional[str] = None,
-        page: int = 1,
-        page_size: int = 20,
-    ) -> Tuple[List[Product], int]:
-        query = db.query(Product).filter(Product.status == ProductStatus.ACTIVE)
-
+        matched_ids: Optional[List[int]] = None,
+    ) -> List[Any]:
+        filters: List[Any] = [Product.status == ProductStatus.ACTIVE]
+        if matched_ids is not None:
+            filters.append(Product.id.in_(matched_ids))
         if category:
-            query = query.filter(Product.category == category)
+            filters.append(Product.category == category)
         if gender:
-            query = query.filter(Product.gender == gender)
+            filters.append(Product.gender == gender)
         if price_min is not None:
-            query = query.filter(Product.price >= price_min)
+            filters.append(Product.price >= price_min)
         if price_max is not None:
-            query = query.filter(Product.price <= price_max)
+            filters.append(Product.price <= price_max)
         if size:
-            query = query.filter(Product.size_options.contains([size]))
+            filters.append(
+                Product.id.in_(
+                    select(ProductSize.product_id).where(ProductSize.value == size)
+                )
+            )
         if color:
-            query = query.filter(Product.color_options.contains([color]))
-
-        if sort == "price_asc":
-            query = query.order_by(asc(Product.price))
-        elif sort == "price_desc":
-            query = query.order_by(desc(Product.price))
-        elif sort == "popularity":
-            query = query.order_by(desc(Product.id))
+            filters.append(
+                Product.id.in_(
+                    select(ProductColor.product_id).where(ProductColor.value == color)
+                )
+            )
+        return filters
+
+    def _card_columns(self) -> Sequence[Any]:
+        """
+        Columns needed to render a ProductListItem (plus the sort keys used by
+        cursors). The main image is the first image by insertion order,
+        resolved with a correlated subquery instead of loading the relation.
+        """
+        main_image_url = (
+            select(ProductImage.url)
+            .where(ProductImage.product_id == Product.id)
+            .order_by(ProductImage.id)
+            .limit(1)
+            .correlate(Product)
+            .scalar_subquery()
+        )
+        return (
+            Product.id,
+            Product.name,
+            Product.price,
+            Product.category,
+            Product.gender,
+            Product.seller_id,
+            Product.created_at,
+            main_image_url.label("main_image_url"),
+        )
+
+    def list(
+        self,
+        db: Session,
+        *,
+        category: Optional[str] = None,
+        price_min: Optional[Decimal] = None,
+        price_max: Optional[Decimal] = None,
+        size: Optional[str] = None,
+        color: Optional[str] = None,
+        gender: Optional[str] = None,
+        sort: Optional[str] = None,
+        page: int = 1,
+        page_size: int = 20,
+        cursor: Optional[str] = None,
+        query: Optional[str] = None,
+        ranked_ids: Optional[List[int]] = None,
+    ) -> Tuple[List[Row], Optional[int], Optional[str]]:
+        """
+        Returns (card rows, total, next_cursor).
+
+        Rows are plain column tuples (see _card_columns), not Product
+        entities. Without a cursor the page is addressed by offset and the
+        total is counted. With a cursor the page seeks past the last row of
+        the previous page on the sort key, so deep pages cost the same as the
+        first one, and the total is skipped (None).
+
+        A text query restricts the catalog to the full-text matches and,
+        unless another sort is requested, orders them by relevance. Callers
+        that rank on their own pass the ordered ids as `ranked_ids` instead.
+        """
+        matched_ids = ranked_ids
+        if matched_ids is None and query and query.strip():
+            matched_ids = get_fulltext_backend(db).search_ids(
+                db, query=query, limit=TEXT_MATCH_LIMIT
+            )
+        if matched_ids is not None and not matched_ids:
+            return [], None if cursor else 0, None
+
+        filters = self._list_filters(
+            category=category,
+            price_min=price_min,
+            price_max=price_max,
+            size=size,
+            color=color,
+            gender=gender,
+            matched_ids=matched_ids,
+        )
+        columns = list(self._card_columns())
+        key, column, direction = _sort_spec(sort)
+        if matched_ids is not None and sort in (None, "relevance"):
+            rank = case(
+                {product_id: position for position, product_id in enumerate(matched_ids)},
+                value=Product.id,
+            )
+            key, column, direction = "rank,id", rank, asc
+            columns.append(rank.label("rank"))
+        rows_query = db.query(*columns).filter(*filters)
+
+        total: Optional[int] = None
+        if cursor:
+            last_value, last_id = _decode_cursor(key, cursor)
+            if key == "-created_at,id":
+                # Seek from the stored timestamp of the cursor row: a bound
+                # datetime need not compare equal to it (SQLite stores the
+                # server default as text without microseconds).
+                last_value = (
+                    select(Product.created_at).where(Product.id == last_id).scalar_subquery()
+                )
+            past_id = Product.id > last_id if direction is asc else Product.id < last_id
+            if column is None:
+                rows_query = rows_query.filter(past_id)
+            else:
+                past_value = column > last_value if direction is asc else column < last_value
+                rows_query = rows_query.filter(
+                    or_(past_value, and_(column == last_value, past_id))
+                )
         else:
-            query = query.order_by(desc(Product.created_at))
+            total = db.query(func.count(Product.id)).filter(*filters).scalar()
 
-        total = query.count()
-        items = (
-            query.offset((page - 1) * page_size)
-            .limit(page_size)
-            .all()
+        if column is not None:
+            rows_query = rows_query.order_by(direction(column))
+        rows_query = rows_query.order_by(direction(Product.id))
+        if not cursor:
+            rows_query = rows_query.offset((page - 1) * page_size)
+
+        rows = rows_query.limit(page_size + 1).all()
+        items = rows[:page_size]
+        next_cursor = _encode_cursor(key, items[-1]) if len(rows) > page_size else None
+        return items, total, next_cursor
+
+    def facet_counts(
+        self,
+        db: Session,
+        *,
+        category: Optional[str] = None,
+        price_min: Optional[Decimal] = None,
+        price_max: Optional[Decimal] = None,
+        size: Optional[str] = None,
+        color: Optional[str] = None,
+        gender: Optional[str] = None,
+    ) -> Dict[str, Dict[str, int]]:
+        """
+        Count matching products per category, gender, size, color and price
+        bucket. All facets are grouped in one UNION ALL over a shared CTE of
+        the filtered products, so the whole sidebar costs one round trip.
+        """
+        filters = self._list_filters(
+            category=category,
+            price_min=price_min,
+            price_max=price_max,
+            size=size,
+            color=color,
+            gender=gender,
+        )
+        matched = (
+            select(Product.id, Product.category, Product.gender, Product.price)
+            .where(*filters)
+            .cte("matched")
+        )
+        price_bucket = case(
+            *[
+                (matched.c.price < bound, literal(_price_bucket_label(index)))
+                for index, bound in enumerate(_PRICE_BUCKETS)
+            ],
+            else_=literal(_price_bucket_label(len(_PRICE_BUCKETS))),
         )
-        return items, total
+
+        def grouped(facet: str, value, source=None):
+            query = select(
+                literal(facet).label("facet"),
+                value.label("value"),
+                func.count().label("count"),
+            )
+            if source is not None:
+                query = query.select_from(source).join(
+                    matched, source.product_id == matched.c.id
+                )
+            else:
+                query = query.select_from(matched)
+            return query.group_by(value)
+
+        statement = union_all(
+            grouped("category", matched.c.category),
+            grouped("gender", matched.c.gender),
+            grouped("size", ProductSize.value, ProductSize),
+            grouped("color", ProductColor.value, ProductColor),
+            grouped("price", price_bucket),
+        )
+
+        counts: Dict[str, Dict[str, int]] = {
+            facet: {} for facet in ("category", "gender", "size", "color")
+        }
+        counts["price"] = {
+            _price_bucket_label(index): 0 for index in range(len(_PRICE_BUCKETS) + 1)
+        }
+        for facet, value, count in db.execute(statement):
+            if value is not None:
+                counts[facet][value] = count
+        return counts
 
     def create(self, db: Session, *, seller_id: int, data: ProductCreate) -> Product:
         product = Product(
@@ -77,10 +352,13 @@ class ProductRepository:
         db.flush()
         self._replace_relations(product, data.images, data.avatar_configs)
         db.commit()
+        suggest_index.add_product_name(product.name)
         db.refresh(product)
+        self._sync_search_indexes(product)
         return product
 
     def update(self, db: Session, *, product: Product, data: ProductUpdate) -> Product:
+        previous_name = product.name
         for field, value in data.model_dump(exclude_unset=True).items():
             if field in {"images", "avatar_configs"}:
                 continue
@@ -91,7 +369,12 @@ class ProductRepository:
 
         db.add(product)
         db.commit()
+        product_detail_cache.invalidate(product.id)
+        if product.name != previous_name:
+            suggest_index.remove_product_name(previous_name)
+            suggest_index.add_product_name(product.name)
         db.refresh(product)
+        self._sync_search_indexes(product)
         return product
 
     def _replace_relations(
@@ -100,6 +383,10 @@ class ProductRepository:
         images_data,
         avatar_configs_data,
     ) -> None:
+        if images_data is not None or avatar_configs_data is not None:
+            # Child rows are part of the detail payload; bump the version
+            # stamp even when no product column changed.
+            product.updated_at = func.now()
         if images_data is not None:
             product.images = [
                 ProductImage(
@@ -118,10 +405,47 @@ class ProductRepository:
                 for config in avatar_configs_data
             ]
 
+    def backfill_facets(self, db: Session, *, batch_size: int = 500) -> int:
+        """
+        Rebuild product_sizes/product_colors from each product's option
+        lists, for products written before the facet tables existed. Walks
+        products in id order with one transaction per batch; returns the
+        number of products whose facet rows changed.
+        """
+        updated = 0
+        last_id = 0
+        while True:
+            products = (
+                db.query(Product)
+                .options(selectinload(Product.sizes), selectinload(Product.colors))
+                .filter(Product.id > last_id)
+                .order_by(Product.id)
+                .limit(batch_size)
+                .all()
+            )
+            if not products:
+                break
+            for product in products:
+                before = _facet_values(product)
+                product.sync_facets()
+                if _facet_values(product) != before:
+                    updated += 1
+            last_id = products[-1].id
+            db.commit()
+            if len(products) < batch_size:
+                break
+        if updated:
+            catalog_version.bump()
+        return updated
+
     def soft_delete(self, db: Session, *, product: Product) -> Product:
         product.status = ProductStatus.DELETED
         db.add(product)
         db.commit()
+        product_detail_cache.invalidate(product.id)
+        product_text_index.remove(product.id)
+        product_vector_index.remove(product.id)
+        catalog_version.bump()
         db.refresh(product)
         return product
 
@@ -132,20 +456,162 @@ class ProductRepository:
         query: str,
         limit: int = 5,
     ) -> List[Product]:
-        pattern = f"%{query}%" if query else "%"
-        q = (
-            db.query(Product)
-            .filter(Product.status == ProductStatus.ACTIVE)
-            .filter(
-                or_(
-                    Product.name.ilike(pattern),
-                    Product.category.ilike(pattern),
-                )
+        """
+        Relevance-ranked active products from the configured full-text
+        backend; an empty query falls back to the newest products.
+        """
+        return self.get_active_in_order(
+            db, self.search_ids_by_text(db, query=query, limit=limit)
+        )
+
+    def search_ids_by_text(self, db: Session, *, query: str, limit: int = 5) -> List[int]:
+        if not (query or "").strip():
+            return self.list_filtered_ids(db, limit=limit)
+        return get_fulltext_backend(db).search_ids(db, query=query, limit=limit)
+
+    def search_by_embedding(
+        self,
+        db: Session,
+        *,
+        query: str,
+        limit: int = 5,
+    ) -> List[Product]:
+        """
+        Active products nearest to the query in the product embedding space.
+        """
+        return self.get_active_in_order(
+            db, self.search_vector_ids(db, query=query, limit=limit)
+        )
+
+    def search_vector_ids(
+        self,
+        db: Session,
+        *,
+        query: str,
+        limit: int,
+        allowed_ids: Optional[Set[int]] = None,
+        min_score: float = 0.0,
+    ) -> List[int]:
+        """Ids ranked by embedding similarity, building the index on first use."""
+        self.ensure_vector_index(db)
+        return self.search_built_vector_ids(
+            query=query, limit=limit, allowed_ids=allowed_ids, min_score=min_score
+        )
+
+    def search_built_vector_ids(
+        self,
+        *,
+        query: str,
+        limit: int,
+        allowed_ids: Optional[Set[int]] = None,
+        min_score: float = 0.0,
+    ) -> List[int]:
+        """
+        search_vector_ids against the index as ensure_vector_index left it.
+        Takes no session, so it can run off the request thread.
+        """
+        return [
+            product_id
+            for product_id, _ in product_vector_index.search(
+                query or "", limit=limit, allowed_ids=allowed_ids, min_score=min_score
             )
-            .order_by(desc(Product.created_at))
-            .limit(limit)
+        ]
+
+    def ensure_vector_index(self, db: Session) -> None:
+        """Build the embedding index on first use and refresh it once stale."""
+        if not product_vector_index.is_built:
+            self.rebuild_vector_index(db)
+        elif product_vector_index.is_stale() and product_vector_index.claim_refresh():
+            # Keep searching the current index while a fresh one is built on
+            # its own session.
+            threading.Thread(
+                target=self._rebuild_vector_index_in_background,
+                args=(db.get_bind(),),
+                daemon=True,
+            ).start()
+
+    def rebuild_vector_index(self, db: Session) -> None:
+        products = db.query(Product).filter(Product.status == ProductStatus.ACTIVE)
+        product_vector_index.rebuild(
+            (product.id, product_text(product)) for product in products
+        )
+
+    def _rebuild_vector_index_in_background(self, bind: Any) -> None:
+        db = Session(bind=bind)
+        try:
+            self.rebuild_vector_index(db)
+        except Exception:
+            product_vector_index.release_refresh()
+        finally:
+            db.close()
+
+    def search_text_ids(
+        self,
+        db: Session,
+        *,
+        query: str,
+        limit: int,
+        price_min: Optional[Decimal] = None,
+        price_max: Optional[Decimal] = None,
+        color: Optional[str] = None,
+        gender: Optional[str] = None,
+    ) -> List[int]:
+        """Ids ranked by the full-text backend, restricted by the filters."""
+        filters = self._list_filters(
+            price_min=price_min, price_max=price_max, color=color, gender=gender
+        )
+        return get_fulltext_backend(db).search_ids(
+            db, query=query, limit=limit, filters=filters
         )
-        return q.all()
+
+    def list_filtered_ids(
+        self,
+        db: Session,
+        *,
+        price_min: Optional[Decimal] = None,
+        price_max: Optional[Decimal] = None,
+        color: Optional[str] = None,
+        gender: Optional[str] = None,
+        matched_ids: Optional[List[int]] = None,
+        limit: Optional[int] = None,
+    ) -> List[int]:
+        """Ids of the matching active products (among `matched_ids`), newest first."""
+        filters = self._list_filters(
+            price_min=price_min,
+            price_max=price_max,
+            color=color,
+            gender=gender,
+            matched_ids=matched_ids,
+        )
+        query = (
+            db.query(Product.id)
+            .filter(*filters)
+            .order_by(desc(Product.created_at), desc(Product.id))
+        )
+        if limit is not None:
+            query = query.limit(limit)
+        return [row[0] for row in query]
+
+    def get_active_in_order(self, db: Session, ids: List[int]) -> List[Product]:
+        if not ids:
+            return []
+        products = (
+            db.query(Product)
+            .options(selectinload(Product.images))
+            .filter(Product.id.in_(ids), Product.status == ProductStatus.ACTIVE)
+            .all()
+        )
+        by_id = {product.id: product for product in products}
+        return [by_id[product_id] for product_id in ids if product_id in by_id]
+
+    def _sync_search_indexes(self, product: Product) -> None:
+        catalog_version.bump()
+        if product.status == ProductStatus.ACTIVE:
+            product_text_index.upsert(product.id, product_document(product))
+            product_vector_index.upsert(product.id, product_text(product))
+        else:
+            product_text_index.remove(product.id)
+            product_vector_index.remove(product.id)
 
     def fetch_product_names(self, db: Session, *, limit: int = 500) -> List[str]:
         rows = (
@@ -1,10 +1,45 @@
-from typing import List, Optional
+import math
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
 
 from fastapi import HTTPException, status
-from sqlalchemy import desc
+from sqlalchemy import and_, case, desc, func, insert, or_, select, true
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from app.models.search_keyword import SearchKeyword
+from app.models.search_keyword import SearchKeyword, SearchKeywordStat
+from app.search.suggest_index import normalize, suggest_index
+
+# Half-life of a search's contribution to keyword popularity.
+KEYWORD_SCORE_HALF_LIFE_DAYS = 7
+_SCORE_EPOCH = datetime(2024, 1, 1)
+
+
+def keyword_log_weight(seen_at: datetime) -> float:
+    """Base-2 log of the forward-decay weight of one search made at `seen_at`."""
+    age = (seen_at - _SCORE_EPOCH).total_seconds() / 86400
+    return age / KEYWORD_SCORE_HALF_LIFE_DAYS
+
+
+def log_add(a: float, b: float) -> float:
+    """log2(2**a + 2**b) without leaving the log domain."""
+    high, low = max(a, b), min(a, b)
+    return high + math.log2(1.0 + 2.0 ** (low - high))
+
+
+def _log_add_sql(score, log_weight: float):
+    """log_add against the stored score, as a SQL expression."""
+    return case(
+        (
+            score >= log_weight,
+            score + func.log2(1.0 + func.power(2.0, log_weight - score)),
+        ),
+        else_=log_weight + func.log2(1.0 + func.power(2.0, score - log_weight)),
+    )
+
+
+def _stat_key(keyword: str) -> str:
+    return normalize(keyword)[:255]
 
 
 class SearchRepository:
@@ -53,17 +88,198 @@ class SearchRepository:
             destination=destination,
         )
         db.add(item)
+        self._bump_keyword_stat(db, keyword=keyword, seen_at=datetime.utcnow())
         db.commit()
+        suggest_index.add_keyword(keyword)
         db.refresh(item)
         return item
 
+    def create_history_items(self, db: Session, items: Sequence[Dict[str, Any]]) -> None:
+        """
+        Write a batch of history entries (user_id, keyword, destination,
+        created_at) with one multi-row INSERT and one stats update per
+        distinct keyword, in a single commit.
+        """
+        if not items:
+            return
+        db.execute(insert(SearchKeyword).values(list(items)))
+        rollup: Dict[str, list] = {}
+        for item in items:
+            key = _stat_key(item["keyword"])
+            if not key:
+                continue
+            log_weight = keyword_log_weight(item["created_at"])
+            entry = rollup.setdefault(key, [0, item["created_at"], None])
+            entry[0] += 1
+            entry[1] = max(entry[1], item["created_at"])
+            entry[2] = log_weight if entry[2] is None else log_add(entry[2], log_weight)
+        for key, (count, last_seen, weight) in rollup.items():
+            self._add_to_keyword_stat(
+                db, key=key, count=count, last_seen=last_seen, weight=weight
+            )
+        db.commit()
+        for item in items:
+            suggest_index.add_keyword(item["keyword"])
+
+    def _bump_keyword_stat(self, db: Session, *, keyword: str, seen_at: datetime) -> None:
+        key = _stat_key(keyword)
+        if key:
+            self._add_to_keyword_stat(
+                db,
+                key=key,
+                count=1,
+                last_seen=seen_at,
+                weight=keyword_log_weight(seen_at),
+            )
+
+    def _add_to_keyword_stat(
+        self, db: Session, *, key: str, count: int, last_seen: datetime, weight: float
+    ) -> None:
+        """Add `count` searches of log weight `weight` to the keyword's row."""
+        values = {
+            SearchKeywordStat.search_count: SearchKeywordStat.search_count + count,
+            SearchKeywordStat.last_seen: last_seen,
+            SearchKeywordStat.score: _log_add_sql(SearchKeywordStat.score, weight),
+        }
+        stats = db.query(SearchKeywordStat).filter(SearchKeywordStat.keyword == key)
+        if stats.update(values, synchronize_session=False):
+            return
+        try:
+            with db.begin_nested():
+                db.add(
+                    SearchKeywordStat(
+                        keyword=key, search_count=count, last_seen=last_seen, score=weight
+                    )
+                )
+        except IntegrityError:
+            # Another writer inserted the keyword first.
+            stats.update(values, synchronize_session=False)
+
+    def prune_history(
+        self,
+        db: Session,
+        *,
+        keep_per_user: int,
+        older_than: Optional[datetime] = None,
+        batch_size: int = 1000,
+    ) -> int:
+        """
+        Delete history entries beyond the newest `keep_per_user` of each
+        user (anonymous entries form one bucket), and, with `older_than`,
+        every entry created before it. Buckets are walked one at a time on
+        the (user_id, created_at, id) index, which finds the oldest kept
+        entry and the rows before it; those go oldest first in batches of
+        at most `batch_size`, each in its own transaction, so locks stay
+        short.
+        Keyword popularity lives in search_keyword_stats and is unaffected.
+        Returns the number of rows deleted.
+        """
+        user_ids = [row[0] for row in db.execute(select(SearchKeyword.user_id).distinct())]
+        deleted = 0
+        for user_id in user_ids:
+            in_bucket = (
+                SearchKeyword.user_id.is_(None)
+                if user_id is None
+                else SearchKeyword.user_id == user_id
+            )
+            expired = self._expired_in_bucket(
+                in_bucket, keep_per_user=keep_per_user, older_than=older_than
+            )
+            while True:
+                ids = [
+                    row[0]
+                    for row in db.execute(
+                        select(SearchKeyword.id)
+                        .where(in_bucket, expired)
+                        .order_by(SearchKeyword.created_at, SearchKeyword.id)
+                        .limit(batch_size)
+                    )
+                ]
+                if ids:
+                    db.query(SearchKeyword).filter(SearchKeyword.id.in_(ids)).delete(
+                        synchronize_session=False
+                    )
+                    db.commit()
+                    deleted += len(ids)
+                if len(ids) < batch_size:
+                    break
+        return deleted
+
+    def _expired_in_bucket(
+        self,
+        in_bucket: Any,
+        *,
+        keep_per_user: int,
+        older_than: Optional[datetime],
+    ) -> Any:
+        """Condition matching the expired rows of one history bucket."""
+        conditions = [true()] if keep_per_user <= 0 else []
+        if keep_per_user > 0:
+            # The oldest kept entry stays in SQL (not a bound value) so the
+            # comparison uses the stored representation of created_at.
+            oldest_kept = (
+                select(SearchKeyword.created_at, SearchKeyword.id)
+                .where(in_bucket)
+                .order_by(desc(SearchKeyword.created_at), desc(SearchKeyword.id))
+                .offset(keep_per_user - 1)
+                .limit(1)
+                .subquery()
+            )
+            kept_at = select(oldest_kept.c.created_at).scalar_subquery()
+            kept_id = select(oldest_kept.c.id).scalar_subquery()
+            conditions.append(
+                or_(
+                    SearchKeyword.created_at < kept_at,
+                    and_(SearchKeyword.created_at == kept_at, SearchKeyword.id < kept_id),
+                )
+            )
+        if older_than is not None:
+            conditions.append(SearchKeyword.created_at < older_than)
+        return or_(*conditions)
+
+    def has_keyword_stats(self, db: Session) -> bool:
+        return db.query(SearchKeywordStat.id).first() is not None
+
+    def rebuild_keyword_stats(self, db: Session, *, batch_size: int = 1000) -> int:
+        """
+        Compactor: recompute the rollup from the raw history. Returns the
+        number of distinct keywords written. Entries already removed by
+        prune_history are no longer counted, so after retention has run this
+        is only suitable for seeding an empty rollup.
+        """
+        totals: Dict[str, list] = {}
+        history = (
+            db.query(SearchKeyword.keyword, SearchKeyword.created_at)
+            .execution_options(yield_per=batch_size)
+        )
+        for keyword, created_at in history:
+            key = _stat_key(keyword)
+            if not key:
+                continue
+            log_weight = keyword_log_weight(created_at)
+            entry = totals.setdefault(key, [0, created_at, None])
+            entry[0] += 1
+            entry[1] = max(entry[1], created_at)
+            entry[2] = log_weight if entry[2] is None else log_add(entry[2], log_weight)
+
+        db.query(SearchKeywordStat).delete(synchronize_session=False)
+        db.bulk_insert_mappings(
+            SearchKeywordStat,
+            [
+                {"keyword": key, "search_count": count, "last_seen": last_seen, "score": score}
+                for key, (count, last_seen, score) in totals.items()
+            ],
+        )
+        db.commit()
+        return len(totals)
+
     def fetch_search_keywords_from_table(
         self, db: Session, *, limit: int = 200
     ) -> List[str]:
+        """Most popular keywords by decayed score, read from the rollup."""
         rows = (
-            db.query(SearchKeyword.keyword)
-            .distinct()
-            .order_by(desc(SearchKeyword.created_at))
+            db.query(SearchKeywordStat.keyword)
+            .order_by(desc(SearchKeywordStat.score), desc(SearchKeywordStat.id))
             .limit(limit)
             .all()
         )
@@ -2,6 +2,7 @@ from typing import Optional
 
 from sqlalchemy.orm import Session
 
+from app.db.loaders import Loader, fetch_by_ids, get_loader
 from app.models.user import User, UserRole, UserStatus
 
 
@@ -10,7 +11,7 @@ class UserRepository:
         return db.query(User).filter(User.email == email).first()
 
     def get_by_id(self, db: Session, *, user_id: int) -> Optional[User]:
-        return db.query(User).filter(User.id == user_id).first()
+        return self._loader(db).load(user_id)
 
     def create(
         self,
@@ -39,3 +40,6 @@ class UserRepository:
         db.commit()
         db.refresh(user)
         return user
+
+    def _loader(self, db: Session) -> Loader:
+        return get_loader(db, "users", lambda ids: fetch_by_ids(db, User, ids))
@@ -1,6 +1,6 @@
 from datetime import datetime
 from decimal import Decimal
-from typing import List, Literal, Optional
+from typing import Dict, List, Literal, Optional
 
 from pydantic import BaseModel, EmailStr
 
@@ -76,3 +76,26 @@ class AdminOrderListResponse(BaseModel):
 class AdminProductModerationUpdate(BaseModel):
     action: Literal["approve", "hide", "unhide", "flag", "unflag"]
     flag_reason: Optional[str] = None
+
+
+class AdminSearchHistoryPruneResponse(BaseModel):
+    deleted: int
+
+
+class AdminProductFacetBackfillResponse(BaseModel):
+    updated: int
+
+
+class AdminCacheStats(BaseModel):
+    size: int
+    maxsize: int
+    hits: int
+    misses: int
+    hit_rate: float
+    evictions: int
+    rejections: int
+
+
+class AdminCacheStatsResponse(BaseModel):
+    catalog_version: int
+    caches: Dict[str, AdminCacheStats]
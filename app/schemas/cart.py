@@ -1,6 +1,9 @@
-from typing import Any, Dict, List, Optional
+from decimal import Decimal
+from typing import Any, Dict, List, Literal, Optional
 
-from pydantic import BaseModel, ConfigDict, conint
+from pydantic import BaseModel, ConfigDict, Field, conint, model_validator
+
+from app.models.product import ProductStatus
 
 
 class CartItemCreate(BaseModel):
@@ -13,11 +16,53 @@ class CartItemUpdate(BaseModel):
     quantity: conint(gt=0)
 
 
+CART_BATCH_LIMIT = 100
+
+
+class CartItemOperation(BaseModel):
+    """
+    One step of a batch cart update: `add` a quantity of a product variant
+    (merging into its line), `set` the quantity of a line, or `remove` it.
+    """
+
+    op: Literal["add", "set", "remove"]
+    product_id: Optional[int] = None
+    item_id: Optional[int] = None
+    quantity: Optional[conint(gt=0)] = None
+    variant_data: Optional[Dict[str, Any]] = None
+
+    @model_validator(mode="after")
+    def check_target(self) -> "CartItemOperation":
+        if self.op == "add" and self.product_id is None:
+            raise ValueError("add requires product_id")
+        if self.op in ("set", "remove") and self.item_id is None:
+            raise ValueError(f"{self.op} requires item_id")
+        if self.op == "set" and self.quantity is None:
+            raise ValueError("set requires quantity")
+        return self
+
+
+class CartBatchRequest(BaseModel):
+    operations: List[CartItemOperation] = Field(
+        ..., min_length=1, max_length=CART_BATCH_LIMIT
+    )
+
+
+class CartProductSnapshot(BaseModel):
+    name: str
+    price: Decimal
+    main_image_url: Optional[str] = None
+    stock: int
+    status: ProductStatus
+
+
 class CartItemSchema(BaseModel):
     id: int
     product_id: int
     quantity: int
     variant_data: Optional[Dict[str, Any]] = None
+    product: Optional[CartProductSnapshot] = None
+    line_total: Decimal = Decimal("0.00")
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -26,5 +71,7 @@ class CartSchema(BaseModel):
     id: int
     user_id: int
     items: List[CartItemSchema]
+    # Sum of line totals of the items whose product is still active.
+    subtotal: Decimal = Decimal("0.00")
 
     model_config = ConfigDict(from_attributes=True)
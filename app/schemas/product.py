@@ -1,13 +1,18 @@
 from datetime import datetime
 from decimal import Decimal
-from typing import Any, Dict, List, Optional
+from typing import Annotated, Any, Dict, List, Optional
 
 from pydantic import BaseModel, ConfigDict, EmailStr, Field
 
 from app.models.product import ProductStatus
+from app.models.product_facet import FACET_VALUE_MAX_LENGTH
 from app.models.user import UserRole
 
 
+# Size/color options as accepted on writes; each one becomes a facet row.
+FacetOption = Annotated[str, Field(max_length=FACET_VALUE_MAX_LENGTH)]
+
+
 class ProductImageSchema(BaseModel):
     id: Optional[int] = None
     url: str
@@ -48,6 +53,8 @@ class ProductBase(BaseModel):
 
 
 class ProductCreate(ProductBase):
+    size_options: Optional[List[FacetOption]] = None
+    color_options: Optional[List[FacetOption]] = None
     images: Optional[List[ProductImageSchema]] = None
     avatar_configs: Optional[List[ProductAvatarConfigSchema]] = None
 
@@ -58,8 +65,8 @@ class ProductUpdate(BaseModel):
     price: Optional[Decimal] = None
     category: Optional[str] = None
     gender: Optional[str] = None
-    size_options: Optional[List[str]] = None
-    color_options: Optional[List[str]] = None
+    size_options: Optional[List[FacetOption]] = None
+    color_options: Optional[List[FacetOption]] = None
     variants: Optional[Dict[str, Any]] = None
     stock: Optional[int] = None
     status: Optional[ProductStatus] = None
@@ -100,6 +107,32 @@ class ProductListItem(BaseModel):
 
 class ProductListResponse(BaseModel):
     items: List[ProductListItem]
-    total: int
+    total: Optional[int] = None
     page: int
     page_size: int
+    next_cursor: Optional[str] = None
+
+
+# Most ids a single POST /products/batch request may ask for.
+PRODUCT_BATCH_LIMIT = 100
+
+
+class ProductBatchRequest(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=PRODUCT_BATCH_LIMIT)
+
+
+class ProductBatchResponse(BaseModel):
+    items: List[ProductListItem]
+
+
+class ProductFacetCount(BaseModel):
+    value: str
+    count: int
+
+
+class ProductFacetsResponse(BaseModel):
+    category: List[ProductFacetCount]
+    gender: List[ProductFacetCount]
+    size: List[ProductFacetCount]
+    color: List[ProductFacetCount]
+    price: List[ProductFacetCount]
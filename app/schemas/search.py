@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import List
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class SearchHistoryItem(BaseModel):
@@ -14,6 +14,11 @@ class SearchHistoryItem(BaseModel):
         orm_mode = True
 
 
+class SearchHistoryCreate(BaseModel):
+    keyword: str = Field(..., min_length=1, max_length=255)
+    destination: str = Field(..., min_length=1, max_length=512)
+
+
 class SearchHistoryListResponse(BaseModel):
     items: List[SearchHistoryItem]
 
@@ -0,0 +1,86 @@
+from typing import Dict, List, Optional, Tuple
+
+Completion = Tuple[str, int]
+
+
+def _rank(entry: Completion) -> Tuple[int, str]:
+    return -entry[1], entry[0]
+
+
+class _Node:
+    __slots__ = ("children", "top")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.top: List[Completion] = []
+
+
+class PrefixCompleter:
+    """
+    Trie over normalized terms where every node caches the top-k terms of
+    its subtree by weight. A completion walks the prefix and reads the cached
+    list, so it costs O(len(prefix) + k) whatever the vocabulary size.
+    """
+
+    def __init__(self, weights: Dict[str, int], top_k: int = 10):
+        self.top_k = top_k
+        self._root = _Node()
+        for term, weight in weights.items():
+            self._insert_path(term)
+        self._fill_top(self._root, "", weights)
+
+    def complete(self, prefix: str, limit: int = 10) -> List[Completion]:
+        node = self._find(prefix)
+        if node is None:
+            return []
+        return node.top[:limit]
+
+    def upsert(self, term: str, weight: int) -> None:
+        """Insert a term or raise its weight, updating each cached top-k."""
+        node = self._root
+        self._offer(node, term, weight)
+        for char in term:
+            node = node.children.setdefault(char, _Node())
+            self._offer(node, term, weight)
+
+    def discard(self, term: str) -> None:
+        """
+        Drop a term from the cached lists on its path. Terms that would now
+        enter a top-k are only picked up by the next full rebuild.
+        """
+        node: Optional[_Node] = self._root
+        node.top = [entry for entry in node.top if entry[0] != term]
+        for char in term:
+            node = node.children.get(char)
+            if node is None:
+                return
+            node.top = [entry for entry in node.top if entry[0] != term]
+
+    def _find(self, prefix: str) -> Optional[_Node]:
+        node = self._root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return None
+        return node
+
+    def _insert_path(self, term: str) -> None:
+        node = self._root
+        for char in term:
+            node = node.children.setdefault(char, _Node())
+
+    def _fill_top(self, node: _Node, path: str, weights: Dict[str, int]) -> List[Completion]:
+        entries: List[Completion] = []
+        if path in weights:
+            entries.append((path, weights[path]))
+        for char, child in node.children.items():
+            entries.extend(self._fill_top(child, path + char, weights))
+        entries.sort(key=_rank)
+        node.top = entries[: self.top_k]
+        return node.top
+
+    def _offer(self, node: _Node, term: str, weight: int) -> None:
+        top = [entry for entry in node.top if entry[0] != term]
+        top.append((term, weight))
+        top.sort(key=_rank)
+        node.top = top[: self.top_k]
@@ -0,0 +1,209 @@
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import column, desc, select, table, text
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.product import Product, ProductStatus
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Relative importance of each product field in relevance scoring.
+FIELD_WEIGHTS = {"name": 3.0, "category": 2.0, "description": 1.0, "colors": 1.0}
+
+
+def tokenize(value: Optional[str]) -> List[str]:
+    return _TOKEN_RE.findall((value or "").lower())
+
+
+def product_document(product: Any) -> Dict[str, str]:
+    return {
+        "name": product.name or "",
+        "category": product.category or "",
+        "description": product.description or "",
+        "colors": " ".join(product.color_options or []),
+    }
+
+
+class BM25Index:
+    """
+    In-process BM25 inverted index over product documents, used when the
+    database has no native full-text support. Field weights scale term
+    frequencies (a BM25F-style simplification) before saturation.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+        self._postings: Dict[str, Dict[int, float]] = defaultdict(dict)
+        self._lengths: Dict[int, float] = {}
+        self._terms: Dict[int, List[str]] = {}
+        self._built = False
+
+    @property
+    def is_built(self) -> bool:
+        return self._built
+
+    def rebuild(self, documents: Iterable[Tuple[int, Dict[str, str]]]) -> None:
+        with self._lock:
+            self._postings = defaultdict(dict)
+            self._lengths = {}
+            self._terms = {}
+            for doc_id, fields in documents:
+                self._add(doc_id, fields)
+            self._built = True
+
+    def upsert(self, doc_id: int, fields: Dict[str, str]) -> None:
+        with self._lock:
+            if not self._built:
+                return
+            self._remove(doc_id)
+            self._add(doc_id, fields)
+
+    def remove(self, doc_id: int) -> None:
+        with self._lock:
+            if self._built:
+                self._remove(doc_id)
+
+    def search(self, query: str, limit: int = 10) -> List[Tuple[int, float]]:
+        terms = set(tokenize(query))
+        with self._lock:
+            total = len(self._lengths)
+            if not terms or not total:
+                return []
+            avg_length = sum(self._lengths.values()) / total
+            scores: Dict[int, float] = defaultdict(float)
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, tf in postings.items():
+                    norm = 1 - self.b + self.b * self._lengths[doc_id] / avg_length
+                    scores[doc_id] += idf * tf * (self.k1 + 1) / (tf + self.k1 * norm)
+        ranked = sorted(scores.items(), key=lambda kv: (-kv[1], -kv[0]))
+        return ranked[:limit]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._postings = defaultdict(dict)
+            self._lengths = {}
+            self._terms = {}
+            self._built = False
+
+    def _add(self, doc_id: int, fields: Dict[str, str]) -> None:
+        weighted: Counter = Counter()
+        for field, value in fields.items():
+            for term in tokenize(value):
+                weighted[term] += FIELD_WEIGHTS.get(field, 1.0)
+        for term, tf in weighted.items():
+            self._postings[term][doc_id] = tf
+        self._lengths[doc_id] = sum(weighted.values())
+        self._terms[doc_id] = list(weighted)
+
+    def _remove(self, doc_id: int) -> None:
+        for term in self._terms.pop(doc_id, []):
+            self._postings[term].pop(doc_id, None)
+            if not self._postings[term]:
+                del self._postings[term]
+        self._lengths.pop(doc_id, None)
+
+
+product_text_index = BM25Index()
+
+
+class MySQLFullTextBackend:
+    """MATCH ... AGAINST over the FULLTEXT index on name/description/category."""
+
+    def search_ids(
+        self, db: Session, *, query: str, limit: int, filters: Sequence[Any] = ()
+    ) -> List[int]:
+        relevance = match(
+            Product.name,
+            Product.description,
+            Product.category,
+            against=query,
+        ).in_natural_language_mode()
+        rows = db.execute(
+            select(Product.id)
+            .where(Product.status == ProductStatus.ACTIVE, relevance > 0, *filters)
+            .order_by(desc(relevance), desc(Product.id))
+            .limit(limit)
+        )
+        return [row[0] for row in rows]
+
+
+class SQLiteFTS5Backend:
+    """bm25() ranking over the products_fts FTS5 table kept in sync by triggers."""
+
+    fts = table("products_fts", column("rowid"))
+
+    def search_ids(
+        self, db: Session, *, query: str, limit: int, filters: Sequence[Any] = ()
+    ) -> List[int]:
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        # Quote every token (FTS5 syntax is not user input) and allow prefixes.
+        expression = " OR ".join(f'"{token}"*' for token in tokens)
+        rows = db.execute(
+            select(Product.id)
+            .select_from(self.fts.join(Product, Product.id == self.fts.c.rowid))
+            .where(text("products_fts MATCH :expression"))
+            .where(Product.status == ProductStatus.ACTIVE, *filters)
+            .order_by(text("bm25(products_fts, 3.0, 1.0, 2.0)"), desc(Product.id))
+            .limit(limit),
+            {"expression": expression},
+        )
+        return [row[0] for row in rows]
+
+
+class BM25Backend:
+    """Fallback backed by the in-process product_text_index."""
+
+    def __init__(self, index: BM25Index):
+        self.index = index
+
+    def search_ids(
+        self, db: Session, *, query: str, limit: int, filters: Sequence[Any] = ()
+    ) -> List[int]:
+        if not self.index.is_built:
+            products = db.query(Product).filter(Product.status == ProductStatus.ACTIVE)
+            self.index.rebuild(
+                (product.id, product_document(product)) for product in products
+            )
+        if not filters:
+            return [doc_id for doc_id, _ in self.index.search(query, limit=limit)]
+        # Filters are SQL criteria: rank in memory, then keep the matching ids.
+        ranked = [doc_id for doc_id, _ in self.index.search(query, limit=limit * 4)]
+        if not ranked:
+            return []
+        allowed = {
+            row[0]
+            for row in db.execute(
+                select(Product.id).where(Product.id.in_(ranked), *filters)
+            )
+        }
+        return [doc_id for doc_id in ranked if doc_id in allowed][:limit]
+
+
+def get_fulltext_backend(db: Session):
+    """
+    Pick the backend from settings.SEARCH_BACKEND ("auto", "mysql", "fts5"
+    or "bm25"); "auto" follows the session's database dialect.
+    """
+    name = settings.SEARCH_BACKEND
+    if name == "auto":
+        dialect = db.get_bind().dialect.name
+        name = {"mysql": "mysql", "sqlite": "fts5"}.get(dialect, "bm25")
+    if name == "mysql":
+        return MySQLFullTextBackend()
+    if name == "fts5":
+        return SQLiteFTS5Backend()
+    return BM25Backend(product_text_index)
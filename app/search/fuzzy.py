@@ -0,0 +1,122 @@
+import bisect
+from collections import defaultdict
+from typing import Dict, List, Set, Tuple
+
+# Most vocabulary tokens a prefix lookup expands to.
+PREFIX_LIMIT = 50
+
+
+def max_edits(token: str) -> int:
+    """Edit budget for a query token: none for very short tokens."""
+    if len(token) < 3:
+        return 0
+    if len(token) <= 5:
+        return 1
+    return 2
+
+
+def edit_distance(a: str, b: str, max_distance: int) -> int:
+    """
+    Optimal string alignment (Damerau-Levenshtein with adjacent
+    transpositions) distance, bounded: any distance above `max_distance`
+    is reported as max_distance + 1 without finishing the table.
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    if a == b:
+        return 0
+    previous_previous: List[int] = []
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + cost,
+            )
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous_previous[j - 2] + 1)
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous_previous, previous = previous, current
+    return min(previous[-1], max_distance + 1)
+
+
+def _deletes(word: str, max_distance: int) -> Set[str]:
+    result = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        frontier = {
+            candidate[:i] + candidate[i + 1 :]
+            for candidate in frontier
+            for i in range(len(candidate))
+        }
+        result |= frontier
+    return result
+
+
+class FuzzyTokenIndex:
+    """
+    SymSpell-style deletion dictionary over a token vocabulary.
+
+    Every token is stored under each string reachable from it by up to
+    `max_distance` deletions. A lookup generates the query's own deletions
+    and only verifies the tokens found under them, so its cost depends on
+    the query length rather than the vocabulary size. A sorted copy of the
+    vocabulary answers prefix lookups for the token still being typed.
+    """
+
+    def __init__(self, max_distance: int = 2):
+        self.max_distance = max_distance
+        self._deletes: Dict[str, Set[str]] = defaultdict(set)
+        self._sorted: List[str] = []
+
+    def __contains__(self, token: str) -> bool:
+        return token in self._deletes.get(token, ())
+
+    def __len__(self) -> int:
+        return len(self._sorted)
+
+    def add(self, token: str) -> None:
+        if not token or token in self:
+            return
+        for variant in _deletes(token, self.max_distance):
+            self._deletes[variant].add(token)
+        bisect.insort(self._sorted, token)
+
+    def remove(self, token: str) -> None:
+        if token not in self:
+            return
+        for variant in _deletes(token, self.max_distance):
+            tokens = self._deletes[variant]
+            tokens.discard(token)
+            if not tokens:
+                del self._deletes[variant]
+        del self._sorted[bisect.bisect_left(self._sorted, token)]
+
+    def lookup(
+        self, token: str, max_distance: int, *, prefix: bool = False
+    ) -> List[Tuple[str, int]]:
+        """
+        Vocabulary tokens within `max_distance` edits of `token`, as
+        (token, distance). With `prefix`, up to PREFIX_LIMIT tokens starting
+        with `token` are included at distance 0.
+        """
+        max_distance = min(max_distance, self.max_distance)
+        found: Dict[str, int] = {}
+        if prefix:
+            start = bisect.bisect_left(self._sorted, token)
+            for candidate in self._sorted[start : start + PREFIX_LIMIT]:
+                if not candidate.startswith(token):
+                    break
+                found[candidate] = 0
+        for variant in _deletes(token, max_distance):
+            for candidate in self._deletes.get(variant, ()):
+                if candidate in found:
+                    continue
+                distance = edit_distance(token, candidate, max_distance)
+                if distance <= max_distance:
+                    found[candidate] = distance
+        return sorted(found.items(), key=lambda kv: (kv[1], kv[0]))
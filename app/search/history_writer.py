@@ -0,0 +1,149 @@
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal
+from app.repositories.search_repository import SearchRepository
+
+logger = logging.getLogger(__name__)
+
+
+class SearchHistoryWriter:
+    """
+    Buffers search history entries and writes them from a background thread
+    in batches: a flush happens once `batch_size` entries are pending or
+    `flush_interval` seconds after the oldest pending entry was queued.
+
+    At most `max_pending` entries are held in memory. When the buffer is
+    full, enqueue waits up to `flush_interval` for the writer to drain it and
+    drops the entry if it is still full.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        *,
+        batch_size: int = 200,
+        flush_interval: float = 0.5,
+        max_pending: int = 10000,
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.repo = SearchRepository()
+        self.dropped = 0
+        self._pending: Deque[Dict[str, Any]] = deque()
+        self._oldest_at = 0.0
+        self._cond = threading.Condition()
+        # Serializes batch writes between the worker and explicit flushes.
+        self._write_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+    def configure(self, session_factory: Callable[[], Session]) -> None:
+        self.session_factory = session_factory
+
+    def enqueue(self, *, user_id: Optional[int], keyword: str, destination: str) -> bool:
+        item = {
+            "user_id": user_id,
+            "keyword": keyword,
+            "destination": destination,
+            "created_at": datetime.utcnow(),
+        }
+        with self._cond:
+            if self._closed:
+                return False
+            if len(self._pending) >= self.max_pending:
+                self._cond.notify_all()
+                self._cond.wait_for(
+                    lambda: len(self._pending) < self.max_pending, self.flush_interval
+                )
+                if len(self._pending) >= self.max_pending:
+                    self.dropped += 1
+                    return False
+            if not self._pending:
+                self._oldest_at = time.monotonic()
+            self._pending.append(item)
+            self._start_worker()
+            if len(self._pending) >= self.batch_size:
+                self._cond.notify_all()
+        return True
+
+    def flush(self) -> None:
+        """Write everything queued so far on the calling thread."""
+        while True:
+            batch = self._take_batch()
+            if not batch:
+                return
+            self._write(batch)
+
+    def close(self) -> None:
+        """Stop the worker and flush what is left; used on app shutdown."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join()
+        self.flush()
+
+    def clear(self) -> None:
+        with self._cond:
+            self._pending.clear()
+            self._cond.notify_all()
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def _start_worker(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def _take_batch(self) -> List[Dict[str, Any]]:
+        with self._cond:
+            count = min(self.batch_size, len(self._pending))
+            batch = [self._pending.popleft() for _ in range(count)]
+            if self._pending:
+                self._oldest_at = time.monotonic()
+            self._cond.notify_all()
+            return batch
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._closed:
+                    if len(self._pending) >= self.batch_size:
+                        break
+                    if self._pending:
+                        remaining = self._oldest_at + self.flush_interval - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._cond.wait(remaining)
+                    else:
+                        self._cond.wait()
+                if self._closed:
+                    return
+            batch = self._take_batch()
+            if batch:
+                self._write(batch)
+
+    def _write(self, batch: List[Dict[str, Any]]) -> None:
+        with self._write_lock:
+            db = self.session_factory()
+            try:
+                self.repo.create_history_items(db, batch)
+            except Exception:
+                db.rollback()
+                logger.exception("Dropped %d search history entries", len(batch))
+            finally:
+                db.close()
+
+
+search_history_writer = SearchHistoryWriter()
@@ -0,0 +1,84 @@
+import re
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Optional
+
+GENDER_WORDS = {
+    "women": "women",
+    "womens": "women",
+    "woman": "women",
+    "ladies": "women",
+    "female": "women",
+    "men": "men",
+    "mens": "men",
+    "man": "men",
+    "male": "men",
+    "unisex": "unisex",
+}
+
+COLOR_WORDS = frozenset(
+    "black white grey gray red blue green yellow orange purple pink brown beige "
+    "navy cream ivory khaki olive burgundy maroon teal gold silver".split()
+)
+
+_AMOUNT = r"\$?\s*(\d+(?:\.\d{1,2})?)\s*(?:\$|usd|dollars?|bucks)?"
+_PRICE_PATTERNS = (
+    (re.compile(rf"\bbetween\s+{_AMOUNT}\s+and\s+{_AMOUNT}"), "range"),
+    (re.compile(rf"(?<![\w.]){_AMOUNT}\s*-\s*{_AMOUNT}"), "range"),
+    (re.compile(rf"(?:\bunder|\bbelow|\bless than|\bcheaper than|\bmax|\bup to|<=?)\s*{_AMOUNT}"), "max"),
+    (re.compile(rf"(?:\bover|\babove|\bmore than|\bfrom|\bmin|>=?)\s*{_AMOUNT}"), "min"),
+)
+_WORD_RE = re.compile(r"[a-z']+")
+
+
+@dataclass
+class ParsedQuery:
+    text: str
+    price_min: Optional[Decimal] = None
+    price_max: Optional[Decimal] = None
+    gender: Optional[str] = None
+    color: Optional[str] = None
+
+    @property
+    def has_constraints(self) -> bool:
+        return any(
+            value is not None
+            for value in (self.price_min, self.price_max, self.gender, self.color)
+        )
+
+
+def parse_query(query: str) -> ParsedQuery:
+    """
+    Split a free-text product query into the words to retrieve on and the
+    structured constraints it states: a price bound or range ("under 50",
+    "between 20 and 40", "20-40"), a gender and a color. The constraint
+    words are removed from the retrieval text; the first gender and color
+    mentioned win.
+    """
+    text = (query or "").lower()
+    parsed = ParsedQuery(text="")
+    for pattern, kind in _PRICE_PATTERNS:
+        found = pattern.search(text)
+        if not found:
+            continue
+        if kind == "range":
+            low, high = sorted((Decimal(found.group(1)), Decimal(found.group(2))))
+            parsed.price_min = parsed.price_min if parsed.price_min is not None else low
+            parsed.price_max = parsed.price_max if parsed.price_max is not None else high
+        elif kind == "max" and parsed.price_max is None:
+            parsed.price_max = Decimal(found.group(1))
+        elif kind == "min" and parsed.price_min is None:
+            parsed.price_min = Decimal(found.group(1))
+        text = text[: found.start()] + " " + text[found.end() :]
+
+    words = []
+    for word in _WORD_RE.findall(text):
+        bare = word.replace("'", "")
+        if bare in GENDER_WORDS:
+            parsed.gender = parsed.gender or GENDER_WORDS[bare]
+        elif bare in COLOR_WORDS:
+            parsed.color = parsed.color or bare
+        else:
+            words.append(word)
+    parsed.text = " ".join(words)
+    return parsed
@@ -0,0 +1,240 @@
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from app.search.completion import PrefixCompleter
+from app.search.fuzzy import FuzzyTokenIndex, max_edits
+
+KEYWORD_WEIGHT = 3
+PRODUCT_NAME_WEIGHT = 1
+PREFIX_BONUS = 3
+FUZZY_EDIT_PENALTY = 2
+
+
+def normalize(text: str) -> str:
+    return (text or "").lower().strip()
+
+
+def ngrams(text: str, n: int = 2) -> List[str]:
+    if not text:
+        return []
+    if len(text) <= n:
+        return [text]
+    return [text[i : i + n] for i in range(len(text) - n + 1)]
+
+
+class SuggestIndex:
+    """
+    In-memory index over the suggestion vocabulary (search keywords and
+    product names), each term carrying a precomputed popularity weight.
+    Prefix completions come from a PrefixCompleter trie; when they do not
+    fill the requested slots, an inverted index from character unigrams and
+    bigrams supplies infix matches, touching only terms sharing a gram with
+    the query, and a FuzzyTokenIndex over the terms' words supplies
+    typo-tolerant matches (every query word within a small edit distance of
+    a word of the term).
+
+    The index is rebuilt wholesale every `refresh_interval` seconds and
+    patched incrementally in between when keywords or products are written.
+    """
+
+    def __init__(self, refresh_interval: float = 300.0, top_k: int = 10):
+        self.refresh_interval = refresh_interval
+        self.top_k = top_k
+        self._lock = threading.Lock()
+        self._weights: Dict[str, int] = {}
+        self._keywords: Set[str] = set()
+        self._postings: Dict[str, Set[str]] = defaultdict(set)
+        self._completer = PrefixCompleter({}, top_k=top_k)
+        self._token_terms: Dict[str, Set[str]] = defaultdict(set)
+        self._fuzzy = FuzzyTokenIndex()
+        self._built_at: Optional[float] = None
+        self._refreshing = False
+        # Bumped on every change to the vocabulary, for result caches.
+        self.version = 0
+
+    @property
+    def is_built(self) -> bool:
+        return self._built_at is not None
+
+    def is_stale(self) -> bool:
+        return (
+            self._built_at is None
+            or time.monotonic() - self._built_at >= self.refresh_interval
+        )
+
+    def claim_refresh(self) -> bool:
+        """Mark a background refresh as running; False if one already is."""
+        with self._lock:
+            if self._refreshing:
+                return False
+            self._refreshing = True
+            return True
+
+    def release_refresh(self) -> None:
+        with self._lock:
+            self._refreshing = False
+
+    def rebuild(self, keywords: Iterable[str], product_names: Iterable[str]) -> None:
+        weights: Dict[str, int] = defaultdict(int)
+        keyword_terms = {term for term in map(normalize, keywords) if term}
+        for keyword in keyword_terms:
+            weights[keyword] += KEYWORD_WEIGHT
+        for name in map(normalize, product_names):
+            if name:
+                weights[name] += PRODUCT_NAME_WEIGHT
+
+        postings: Dict[str, Set[str]] = defaultdict(set)
+        token_terms: Dict[str, Set[str]] = defaultdict(set)
+        for term in weights:
+            for gram in self._grams(term):
+                postings[gram].add(term)
+            for token in term.split():
+                token_terms[token].add(term)
+        completer = PrefixCompleter(weights, top_k=self.top_k)
+        fuzzy = FuzzyTokenIndex()
+        for token in token_terms:
+            fuzzy.add(token)
+
+        # Everything is built off to the side and swapped in at once.
+        with self._lock:
+            self._weights = dict(weights)
+            self._keywords = keyword_terms
+            self._postings = postings
+            self._completer = completer
+            self._token_terms = token_terms
+            self._fuzzy = fuzzy
+            self._built_at = time.monotonic()
+            self._refreshing = False
+            self.version += 1
+
+    def add_keyword(self, keyword: str) -> None:
+        term = normalize(keyword)
+        with self._lock:
+            # Keywords count once, however often they are searched.
+            if not self.is_built or not term or term in self._keywords:
+                return
+            self._keywords.add(term)
+            self._add(term, KEYWORD_WEIGHT)
+
+    def add_product_name(self, name: str) -> None:
+        term = normalize(name)
+        with self._lock:
+            if self.is_built and term:
+                self._add(term, PRODUCT_NAME_WEIGHT)
+
+    def remove_product_name(self, name: str) -> None:
+        term = normalize(name)
+        with self._lock:
+            if not self.is_built or term not in self._weights:
+                return
+            self._weights[term] -= PRODUCT_NAME_WEIGHT
+            self.version += 1
+            if self._weights[term] <= 0:
+                del self._weights[term]
+                for gram in self._grams(term):
+                    self._postings[gram].discard(term)
+                for token in term.split():
+                    terms = self._token_terms[token]
+                    terms.discard(term)
+                    if not terms:
+                        del self._token_terms[token]
+                        self._fuzzy.remove(token)
+                self._completer.discard(term)
+            else:
+                self._completer.upsert(term, self._weights[term])
+
+    def search(self, query: str, limit: int = 10) -> List[Tuple[str, int]]:
+        q = normalize(query)
+        if not q:
+            return []
+        query_grams = ngrams(q)
+        prefix_score = PREFIX_BONUS + len(query_grams)
+        with self._lock:
+            results = [
+                (term, weight + prefix_score)
+                for term, weight in self._completer.complete(q, limit)
+            ]
+            if len(results) >= limit:
+                return results
+
+            # Not enough completions: rank infix and fuzzy matches after them.
+            seen = {term for term, _ in results}
+            candidates: Set[str] = set()
+            for gram in set(query_grams):
+                candidates |= self._postings.get(gram, set())
+            scores: Dict[str, int] = {}
+            for term in candidates - seen:
+                score = self._weights.get(term, 0)
+                if term.startswith(q):
+                    score += PREFIX_BONUS
+                score += sum(1 for gram in query_grams if gram in term)
+                scores[term] = score
+            for term, distance in self._fuzzy_matches(q).items():
+                if term in seen:
+                    continue
+                score = self._weights.get(term, 0) + prefix_score
+                score -= FUZZY_EDIT_PENALTY * distance
+                scores[term] = max(score, scores.get(term, score))
+        ranked = sorted(scores.items(), key=lambda kv: (-kv[1], kv[0]))
+        return results + ranked[: limit - len(results)]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._weights = {}
+            self._keywords = set()
+            self._postings = defaultdict(set)
+            self._completer = PrefixCompleter({}, top_k=self.top_k)
+            self._token_terms = defaultdict(set)
+            self._fuzzy = FuzzyTokenIndex()
+            self._built_at = None
+            self._refreshing = False
+            self.version += 1
+
+    def _fuzzy_matches(self, q: str) -> Dict[str, int]:
+        """
+        Terms in which every query word has a word within its edit budget
+        (the last word may also be an unfinished prefix), mapped to the
+        total number of edits.
+        """
+        words = q.split()
+        matched: Optional[Dict[str, int]] = None
+        for position, word in enumerate(words):
+            hits: Dict[str, int] = {}
+            for token, distance in self._fuzzy.lookup(
+                word, max_edits(word), prefix=position == len(words) - 1
+            ):
+                for term in self._token_terms.get(token, ()):
+                    if distance < hits.get(term, distance + 1):
+                        hits[term] = distance
+            if matched is None:
+                matched = hits
+            else:
+                matched = {
+                    term: matched[term] + distance
+                    for term, distance in hits.items()
+                    if term in matched
+                }
+            if not matched:
+                return {}
+        return matched or {}
+
+    def _add(self, term: str, weight: int) -> None:
+        self.version += 1
+        if term not in self._weights:
+            for gram in self._grams(term):
+                self._postings[gram].add(term)
+            for token in term.split():
+                if token not in self._token_terms:
+                    self._fuzzy.add(token)
+                self._token_terms[token].add(term)
+        self._weights[term] = self._weights.get(term, 0) + weight
+        self._completer.upsert(term, self._weights[term])
+
+    @staticmethod
+    def _grams(term: str) -> Set[str]:
+        return set(term) | set(ngrams(term, 2))
+
+
+suggest_index = SuggestIndex()
@@ -0,0 +1,262 @@
+import hashlib
+import heapq
+import math
+import re
+import threading
+import time
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Protocol, Sequence, Set, Tuple
+
+# Optional dependency: with NumPy installed scoring is one matrix-vector
+# product; without it the index falls back to pure-Python scoring.
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - pure-Python scoring is used instead
+    np = None
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+# Words that carry no product meaning in conversational queries.
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from have i in is it looking me my need of "
+    "on or please show some something that the this to want with would you".split()
+)
+
+
+class EmbeddingProvider(Protocol):
+    dimension: int
+
+    def embed(self, texts: Sequence[str]) -> List[List[float]]:
+        ...
+
+
+class HashingEmbedder:
+    """
+    Local embedding with the hashing trick: words and their character
+    trigrams are hashed into a fixed number of signed buckets and the vector
+    is L2-normalised. Trigrams let inflections ("dresses", "dress") and small
+    typos share most of their mass. Swap in a model-backed provider with the
+    same `dimension` / `embed` interface for real semantics.
+    """
+
+    def __init__(self, dimension: int = 256, trigram_weight: float = 0.5):
+        self.dimension = dimension
+        self.trigram_weight = trigram_weight
+
+    def embed(self, texts: Sequence[str]) -> List[List[float]]:
+        return [self._embed_one(text) for text in texts]
+
+    def _embed_one(self, text: str) -> List[float]:
+        vector = [0.0] * self.dimension
+        for word in _WORD_RE.findall((text or "").lower()):
+            if word in STOPWORDS:
+                continue
+            self._add(vector, word, 1.0)
+            padded = f"<{word}>"
+            for i in range(len(padded) - 2):
+                self._add(vector, padded[i : i + 3], self.trigram_weight)
+        norm = math.sqrt(sum(value * value for value in vector))
+        if norm:
+            vector = [value / norm for value in vector]
+        return vector
+
+    def _add(self, vector: List[float], feature: str, weight: float) -> None:
+        digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+        hashed = int.from_bytes(digest, "little")
+        sign = 1.0 if hashed >> 63 else -1.0
+        vector[hashed % self.dimension] += sign * weight
+
+
+def product_text(product: Any) -> str:
+    return " ".join(
+        part
+        for part in (
+            product.name,
+            product.category,
+            product.gender,
+            " ".join(product.color_options or []),
+            product.description,
+        )
+        if part
+    )
+
+
+class VectorIndex:
+    """
+    Brute-force cosine top-k over product embeddings.
+
+    Vectors live in one preallocated NumPy matrix (grown by doubling) when
+    NumPy is in use, otherwise in compact float arrays scored over the
+    query's non-zero dimensions. `use_numpy` defaults to whether NumPy is
+    installed. Removal swaps the last row into the hole so storage stays
+    dense.
+
+    Like the suggest index, the index is per process: it is rebuilt
+    wholesale every `refresh_interval` seconds and patched incrementally in
+    between when products are written.
+    """
+
+    def __init__(
+        self,
+        provider: Optional[EmbeddingProvider] = None,
+        *,
+        use_numpy: Optional[bool] = None,
+        refresh_interval: float = 300.0,
+    ):
+        if use_numpy and np is None:
+            raise RuntimeError("VectorIndex(use_numpy=True) requires the numpy package")
+        self.provider = provider or HashingEmbedder()
+        self.use_numpy = np is not None if use_numpy is None else use_numpy
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._reset()
+
+    @property
+    def is_built(self) -> bool:
+        return self._built_at is not None
+
+    def is_stale(self) -> bool:
+        return (
+            self._built_at is None
+            or time.monotonic() - self._built_at >= self.refresh_interval
+        )
+
+    def claim_refresh(self) -> bool:
+        """Mark a background refresh as running; False if one already is."""
+        with self._lock:
+            if self._refreshing:
+                return False
+            self._refreshing = True
+            return True
+
+    def release_refresh(self) -> None:
+        with self._lock:
+            self._refreshing = False
+
+    def configure(self, provider: EmbeddingProvider) -> None:
+        """Switch embedding provider; the index must be rebuilt afterwards."""
+        with self._lock:
+            self.provider = provider
+            self._reset()
+
+    def rebuild(self, items: Iterable[Tuple[int, str]]) -> None:
+        items = list(items)
+        vectors = self.provider.embed([text for _, text in items]) if items else []
+        with self._lock:
+            self._reset()
+            for (item_id, _), vector in zip(items, vectors):
+                self._put(item_id, vector)
+            self._built_at = time.monotonic()
+            self._refreshing = False
+
+    def upsert(self, item_id: int, text: str) -> None:
+        if not self.is_built:
+            return
+        vector = self.provider.embed([text])[0]
+        with self._lock:
+            self._put(item_id, vector)
+
+    def remove(self, item_id: int) -> None:
+        with self._lock:
+            row = self._rows.pop(item_id, None)
+            if row is None:
+                return
+            last = len(self._ids) - 1
+            if row != last:
+                moved = self._ids[last]
+                self._ids[row] = moved
+                self._rows[moved] = row
+                if self.use_numpy:
+                    self._matrix[row] = self._matrix[last]
+                else:
+                    self._vectors[row] = self._vectors[last]
+            self._ids.pop()
+            if not self.use_numpy:
+                self._vectors.pop()
+
+    def search(
+        self,
+        query: str,
+        limit: int = 10,
+        allowed_ids: Optional[Set[int]] = None,
+        min_score: float = 0.0,
+    ) -> List[Tuple[int, float]]:
+        """
+        Top `limit` (id, cosine) pairs scoring above `min_score`.
+        `allowed_ids` restricts the candidates before ranking.
+        """
+        vector = self.provider.embed([query])[0]
+        if not any(vector):
+            return []
+        with self._lock:
+            count = len(self._ids)
+            if not count or limit <= 0:
+                return []
+            if self.use_numpy:
+                scores = self._matrix[:count] @ np.asarray(vector, dtype=np.float32)
+                if allowed_ids is not None:
+                    mask = np.fromiter(
+                        (item_id in allowed_ids for item_id in self._ids),
+                        dtype=bool,
+                        count=count,
+                    )
+                    scores = np.where(mask, scores, -np.inf)
+                top = min(limit, count)
+                best = np.argpartition(-scores, top - 1)[:top]
+                ranked = [(self._ids[i], float(scores[i])) for i in best]
+            else:
+                nonzero = [(i, value) for i, value in enumerate(vector) if value]
+                ranked = heapq.nlargest(
+                    limit,
+                    (
+                        (item_id, sum(row[i] * value for i, value in nonzero))
+                        for item_id, row in zip(self._ids, self._vectors)
+                        if allowed_ids is None or item_id in allowed_ids
+                    ),
+                    key=lambda kv: kv[1],
+                )
+        ranked = [(item_id, score) for item_id, score in ranked if score > min_score]
+        ranked.sort(key=lambda kv: (-kv[1], kv[0]))
+        return ranked[:limit]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._reset()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def _reset(self) -> None:
+        self._ids: List[int] = []
+        self._rows: Dict[int, int] = {}
+        self._vectors: List[array] = []
+        self._matrix = (
+            np.zeros((0, self.provider.dimension), dtype=np.float32)
+            if self.use_numpy
+            else None
+        )
+        self._built_at: Optional[float] = None
+        self._refreshing = False
+
+    def _put(self, item_id: int, vector: List[float]) -> None:
+        row = self._rows.get(item_id)
+        if row is None:
+            row = len(self._ids)
+            self._ids.append(item_id)
+            self._rows[item_id] = row
+            if self.use_numpy and row >= len(self._matrix):
+                grown = np.zeros(
+                    (max(64, 2 * len(self._matrix)), self.provider.dimension),
+                    dtype=np.float32,
+                )
+                grown[: len(self._matrix)] = self._matrix
+                self._matrix = grown
+            elif not self.use_numpy:
+                self._vectors.append(array("f"))
+        if self.use_numpy:
+            self._matrix[row] = vector
+        else:
+            self._vectors[row] = array("f", vector)
+
+
+product_vector_index = VectorIndex()
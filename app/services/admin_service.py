@@ -1,9 +1,15 @@
-from typing import List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 from fastapi import HTTPException, status
 from sqlalchemy import desc, or_
 from sqlalchemy.orm import Session
 
+from app.core.cache import (
+    catalog_version,
+    product_detail_cache,
+    search_result_cache,
+    suggest_cache,
+)
 from app.models.order import Order, OrderStatus
 from app.models.product import Product, ProductStatus
 from app.models.user import User, UserRole, UserStatus
@@ -153,9 +159,14 @@ class AdminService:
         
         db.add(product)
         db.commit()
+        product_detail_cache.invalidate(product.id)
+        catalog_version.bump()
         db.refresh(product)
         return product
 
+    def backfill_product_facets(self, db: Session) -> int:
+        return self.product_repo.backfill_facets(db)
+
     # 3. Orders
 
     def list_orders(
@@ -186,3 +197,14 @@ class AdminService:
             .all()
         )
         return items, total
+
+    # 4. Caches
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        return {
+            "catalog_version": catalog_version.value,
+            "caches": {
+                "search_results": search_result_cache.stats(),
+                "suggest": suggest_cache.stats(),
+            },
+        }
@@ -2,9 +2,11 @@ import uuid
 from typing import Any, Dict, Optional
 
 from fastapi import HTTPException, status
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from app.ai.avatar_chain import AvatarChain
+from app.core.cache import product_detail_cache
 from app.models.ai_avatar_request import AiAvatarRequestStatus
 from app.models.avatar_preset import AvatarPresetStatus
 from app.models.product_image import ProductImage
@@ -89,7 +91,9 @@ class AiAvatarService:
                     for idx, url in enumerate(image_urls)
                 ]
             )
+            product.updated_at = func.now()
             db.commit()
+            product_detail_cache.invalidate(product.id)
 
         return AvatarRenderResponse(
             requestId=ai_request.request_id,
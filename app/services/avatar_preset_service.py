@@ -2,9 +2,14 @@ from typing import List, Optional, Union
 
 from sqlalchemy.orm import Session
 
+from app.core.etag import make_etag
 from app.models.avatar_preset import AvatarPreset
 from app.repositories.avatar_preset_repository import AvatarPresetRepository
-from app.schemas.avatar import AvatarPresetCreate, AvatarPresetUpdate
+from app.schemas.avatar import (
+    AvatarPresetCreate,
+    AvatarPresetListResponse,
+    AvatarPresetUpdate,
+)
 
 
 class AvatarPresetService:
@@ -14,6 +19,14 @@ class AvatarPresetService:
     def list_active_presets(self, db: Session) -> List[AvatarPreset]:
         return self.preset_repo.list_active(db)
 
+    def get_active_presets_etag(self, db: Session) -> str:
+        """ETag of the active preset list, from ids and edit versions only."""
+        return make_etag("avatar-presets", self.preset_repo.list_active_versions(db))
+
+    def get_active_presets_json(self, db: Session) -> bytes:
+        presets = self.list_active_presets(db)
+        return AvatarPresetListResponse(items=presets).model_dump_json().encode("utf-8")
+
     def create_or_update_preset(
         self,
         db: Session,
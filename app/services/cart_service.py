@@ -1,10 +1,21 @@
+from decimal import Decimal
+from typing import List
+
 from fastapi import HTTPException, status
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session
 
+from app.models.cart import CartItem
 from app.models.product import Product, ProductStatus
 from app.repositories.cart_repository import CartRepository
 from app.repositories.product_repository import ProductRepository
-from app.schemas.cart import CartItemCreate, CartSchema
+from app.schemas.cart import (
+    CartItemCreate,
+    CartItemOperation,
+    CartItemSchema,
+    CartProductSnapshot,
+    CartSchema,
+)
 
 
 class CartService:
@@ -13,9 +24,12 @@ class CartService:
         self.product_repo = product_repo
 
     def get_cart_for_user(self, db: Session, user_id: int) -> CartSchema:
-        cart = self.cart_repo.get_or_create_cart(db, user_id)
-        db.refresh(cart)
-        return CartSchema.model_validate(cart)
+        rows = self.cart_repo.get_cart_rows(db, user_id)
+        if not rows:
+            cart_id = self.cart_repo.get_or_create_cart_id(db, user_id)
+            db.commit()
+            return CartSchema(id=cart_id, user_id=user_id, items=[])
+        return self._build_cart(user_id, rows)
 
     def add_item_to_cart(
         self,
@@ -29,24 +43,10 @@ class CartService:
                 detail="Quantity must be greater than zero",
             )
         self._get_active_product(db, data.product_id)
-        cart = self.cart_repo.get_or_create_cart(db, user_id)
-
-        existing_item = next(
-            (
-                item
-                for item in cart.items
-                if item.product_id == data.product_id
-                and item.variant_data == data.variant_data
-            ),
-            None,
-        )
-        if existing_item:
-            new_quantity = existing_item.quantity + data.quantity
-            self.cart_repo.update_item_quantity(db, existing_item, new_quantity)
-        else:
-            self.cart_repo.add_item(db, cart, data)
-        db.refresh(cart)
-        return CartSchema.model_validate(cart)
+        cart_id = self.cart_repo.get_or_create_cart_id(db, user_id)
+        self.cart_repo.add_quantity(db, cart_id=cart_id, data=data)
+        db.commit()
+        return self.get_cart_for_user(db, user_id)
 
     def update_cart_item_quantity(
         self,
@@ -60,11 +60,10 @@ class CartService:
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Quantity must be greater than zero",
             )
-        item = self.cart_repo.get_item_by_id(db, item_id)
-        cart = self._ensure_item_belongs_to_user(item, user_id)
-        self.cart_repo.update_item_quantity(db, item, quantity)
-        db.refresh(cart)
-        return CartSchema.model_validate(cart)
+        item = self._get_user_item_or_404(db, user_id, item_id)
+        self.cart_repo.set_quantity(db, item, quantity)
+        db.commit()
+        return self.get_cart_for_user(db, user_id)
 
     def remove_cart_item(
         self,
@@ -72,19 +71,109 @@ class CartService:
         user_id: int,
         item_id: int,
     ) -> CartSchema:
-        item = self.cart_repo.get_item_by_id(db, item_id)
-        cart = self._ensure_item_belongs_to_user(item, user_id)
+        item = self._get_user_item_or_404(db, user_id, item_id)
         self.cart_repo.remove_item(db, item)
-        db.refresh(cart)
-        return CartSchema.model_validate(cart)
+        db.commit()
+        return self.get_cart_for_user(db, user_id)
+
+    def apply_cart_operations(
+        self,
+        db: Session,
+        user_id: int,
+        operations: List[CartItemOperation],
+    ) -> CartSchema:
+        """
+        Apply add / set / remove operations in order as one transaction.
+        All added products are validated with one query and all targeted
+        lines loaded with another; any invalid target rejects the batch.
+        """
+        product_ids = [op.product_id for op in operations if op.op == "add"]
+        if product_ids:
+            products = self.product_repo.get_many(db, product_ids)
+            if any(
+                product_id not in products
+                or products[product_id].status != ProductStatus.ACTIVE
+                for product_id in product_ids
+            ):
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Product not found",
+                )
+        item_ids = [op.item_id for op in operations if op.op != "add"]
+        items = (
+            self.cart_repo.get_user_items(db, user_id=user_id, item_ids=item_ids)
+            if item_ids
+            else {}
+        )
+        if any(item_id not in items for item_id in item_ids):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Cart item not found",
+            )
+
+        cart_id = self.cart_repo.get_or_create_cart_id(db, user_id) if product_ids else None
+        for operation in operations:
+            if operation.op == "add":
+                self.cart_repo.add_quantity(
+                    db,
+                    cart_id=cart_id,
+                    data=CartItemCreate(
+                        product_id=operation.product_id,
+                        quantity=operation.quantity or 1,
+                        variant_data=operation.variant_data,
+                    ),
+                )
+            elif operation.op == "set":
+                self.cart_repo.set_quantity(db, items[operation.item_id], operation.quantity)
+            else:
+                self.cart_repo.remove_item(db, items[operation.item_id])
+        db.commit()
+        return self.get_cart_for_user(db, user_id)
+
+    def _build_cart(self, user_id: int, rows: List[Row]) -> CartSchema:
+        items: List[CartItemSchema] = []
+        subtotal = Decimal("0.00")
+        for row in rows:
+            if row.item_id is None:
+                continue
+            product = None
+            line_total = Decimal("0.00")
+            if row.name is not None:
+                product = CartProductSnapshot(
+                    name=row.name,
+                    price=row.price,
+                    main_image_url=row.main_image_url,
+                    stock=row.stock,
+                    status=row.status,
+                )
+                if row.status == ProductStatus.ACTIVE:
+                    line_total = Decimal(row.price) * row.quantity
+            subtotal += line_total
+            items.append(
+                CartItemSchema(
+                    id=row.item_id,
+                    product_id=row.product_id,
+                    quantity=row.quantity,
+                    variant_data=row.variant_data,
+                    product=product,
+                    line_total=line_total,
+                )
+            )
+        return CartSchema(
+            id=rows[0].cart_id,
+            user_id=user_id,
+            items=items,
+            subtotal=subtotal,
+        )
 
-    def _ensure_item_belongs_to_user(self, item, user_id: int):
-        if item is None or item.cart is None or item.cart.user_id != user_id:
+    def _get_user_item_or_404(self, db: Session, user_id: int, item_id: int) -> CartItem:
+        item = self.cart_repo.get_user_item(db, user_id=user_id, item_id=item_id)
+        if item is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Cart item not found",
             )
-        return item.cart
+        return item
 
     def _get_active_product(self, db: Session, product_id: int) -> Product:
         product = self.product_repo.get(db, product_id)
@@ -0,0 +1,102 @@
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.repositories.product_repository import ProductRepository
+from app.search.query_parser import ParsedQuery, parse_query
+
+# Damping constant of reciprocal rank fusion (the usual value from the
+# original paper); larger values flatten the head of each ranking.
+RRF_K = 60
+# Candidates each retriever contributes to the fusion.
+CANDIDATE_DEPTH = 100
+# Vector hits fetched when the query has constraints. The embedding index
+# knows nothing about price, color or gender, so the hits are filtered in
+# SQL afterwards and the extra depth makes up for the ones dropped.
+CONSTRAINED_VECTOR_DEPTH = 5 * CANDIDATE_DEPTH
+# Cosine below which a vector hit is treated as noise rather than a match
+# (hashed embeddings leave small chance overlaps between unrelated texts).
+MIN_VECTOR_SIMILARITY = 0.2
+
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="hybrid-search")
+
+
+def reciprocal_rank_fusion(rankings: Iterable[List[int]], k: int = RRF_K) -> List[int]:
+    scores: Dict[int, float] = defaultdict(float)
+    for ranking in rankings:
+        for rank, item_id in enumerate(ranking, start=1):
+            scores[item_id] += 1.0 / (k + rank)
+    return sorted(scores, key=lambda item_id: (-scores[item_id], item_id))
+
+
+class HybridSearchService:
+    """
+    Product retrieval that runs the full-text backend and the embedding
+    index side by side and fuses their rankings with RRF. Price, gender and
+    color stated in the query are parsed out and applied as filters: inside
+    the full-text query, and to the (deeper) vector hits by one SQL lookup
+    limited to those ids.
+    """
+
+    def __init__(self, product_repo: ProductRepository):
+        self.product_repo = product_repo
+
+    def parse(
+        self,
+        query: str,
+        *,
+        price_min: Optional[Decimal] = None,
+        price_max: Optional[Decimal] = None,
+        color: Optional[str] = None,
+        gender: Optional[str] = None,
+    ) -> ParsedQuery:
+        """Parse the query; explicitly passed filters override parsed ones."""
+        parsed = parse_query(query)
+        if price_min is not None:
+            parsed.price_min = price_min
+        if price_max is not None:
+            parsed.price_max = price_max
+        if color:
+            parsed.color = color
+        if gender:
+            parsed.gender = gender
+        return parsed
+
+    def rank_ids(
+        self, db: Session, parsed: ParsedQuery, *, limit: int = CANDIDATE_DEPTH
+    ) -> Optional[List[int]]:
+        """
+        Fused ranking of product ids for the parsed query, or None when the
+        query is constraints only and there is nothing to rank on.
+        """
+        if not parsed.text:
+            return None
+        constraints = dict(
+            price_min=parsed.price_min,
+            price_max=parsed.price_max,
+            color=parsed.color,
+            gender=parsed.gender,
+        )
+        # Sessions are not thread-safe: build the index on this thread and
+        # hand the worker only the in-memory search.
+        self.product_repo.ensure_vector_index(db)
+        vector_future = _executor.submit(
+            self.product_repo.search_built_vector_ids,
+            query=parsed.text,
+            limit=CONSTRAINED_VECTOR_DEPTH if parsed.has_constraints else CANDIDATE_DEPTH,
+            min_score=MIN_VECTOR_SIMILARITY,
+        )
+        lexical = self.product_repo.search_text_ids(
+            db, query=parsed.text, limit=CANDIDATE_DEPTH, **constraints
+        )
+        semantic = vector_future.result()
+        if parsed.has_constraints and semantic:
+            allowed = set(
+                self.product_repo.list_filtered_ids(db, matched_ids=semantic, **constraints)
+            )
+            semantic = [product_id for product_id in semantic if product_id in allowed]
+            semantic = semantic[:CANDIDATE_DEPTH]
+        return reciprocal_rank_fusion([lexical, semantic])[:limit]
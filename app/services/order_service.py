@@ -4,6 +4,7 @@ from typing import List
 from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
 
+from app.core.cache import product_detail_cache
 from app.models.order import Order
 from app.models.product import ProductStatus
 from app.repositories.cart_repository import CartRepository
@@ -34,52 +35,62 @@ class OrderService:
         user_id: int,
         currency: str = "USD",
     ) -> OrderCreateResponse:
-        cart = self.cart_repo.get_cart(db, user_id)
-        if cart is None or not cart.items:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Cart is empty",
-            )
-
-        items_payload: List[dict] = []
-        total_amount = Decimal("0.00")
-        for item in cart.items:
-            product = self.product_repo.get(db, item.product_id)
-            if not product or product.status != ProductStatus.ACTIVE:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Product in cart is unavailable",
-                )
-            if product.stock < item.quantity:
+        # A write-back pass must not re-insert the lines deleted below.
+        with self.cart_repo.lock_cart(db, user_id):
+            self.cart_repo.flush_cart(db, user_id)
+            cart = self.cart_repo.get_cart(db, user_id)
+            if cart is None or not cart.items:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Insufficient stock for product",
+                    detail="Cart is empty",
                 )
 
-            unit_price = Decimal(product.price)
-            total_amount += unit_price * item.quantity
-            items_payload.append(
-                {
-                    "product_id": item.product_id,
-                    "quantity": item.quantity,
-                    "unit_price": unit_price,
-                    "variant_data": item.variant_data,
-                }
+            products = self.product_repo.get_many(
+                db, [item.product_id for item in cart.items]
             )
-            product.stock -= item.quantity
-            db.add(product)
+            items_payload: List[dict] = []
+            total_amount = Decimal("0.00")
+            for item in cart.items:
+                product = products.get(item.product_id)
+                if not product or product.status != ProductStatus.ACTIVE:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail="Product in cart is unavailable",
+                    )
+                if product.stock < item.quantity:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail="Insufficient stock for product",
+                    )
 
-        order = self.order_repo.create_order(
-            db,
-            user_id=user_id,
-            total_amount=total_amount,
-            currency=currency,
-            items_data=items_payload,
-        )
+                unit_price = Decimal(product.price)
+                total_amount += unit_price * item.quantity
+                items_payload.append(
+                    {
+                        "product_id": item.product_id,
+                        "quantity": item.quantity,
+                        "unit_price": unit_price,
+                        "variant_data": item.variant_data,
+                    }
+                )
+                product.stock -= item.quantity
+                db.add(product)
+
+            order = self.order_repo.create_order(
+                db,
+                user_id=user_id,
+                total_amount=total_amount,
+                currency=currency,
+                items_data=items_payload,
+            )
 
-        for cart_item in list(cart.items):
-            db.delete(cart_item)
-        db.commit()
+            for cart_item in list(cart.items):
+                db.delete(cart_item)
+            db.commit()
+            self.cart_repo.evict_cart(db, user_id)
+        # Stock is part of the product detail payload.
+        for item in items_payload:
+            product_detail_cache.invalidate(item["product_id"])
 
         return OrderCreateResponse(
             id=order.id,
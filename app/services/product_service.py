@@ -2,23 +2,42 @@ from decimal import Decimal
 from typing import Any, Dict, List, Optional
 
 from fastapi import HTTPException, status
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
+from app.core.cache import (
+    CachedDetail,
+    catalog_version,
+    facet_cache,
+    product_detail_cache,
+    search_result_cache,
+)
+from app.core.etag import body_etag
 from app.models.product import Product, ProductStatus
 from app.models.product_avatar_config import ProductAvatarConfig
 from app.models.user import User, UserRole
-from app.repositories.product_repository import ProductRepository
+from app.repositories.product_repository import TEXT_MATCH_LIMIT, ProductRepository
 from app.schemas.product import (
+    ProductBatchResponse,
     ProductCreate,
     ProductDetail,
+    ProductFacetCount,
+    ProductFacetsResponse,
     ProductListResponse,
     ProductUpdate,
 )
+from app.search.suggest_index import normalize
+from app.services.hybrid_search_service import HybridSearchService
 
 
 class ProductService:
-    def __init__(self, product_repo: ProductRepository):
+    def __init__(
+        self,
+        product_repo: ProductRepository,
+        hybrid_search: Optional[HybridSearchService] = None,
+    ):
         self.product_repo = product_repo
+        self.hybrid_search = hybrid_search or HybridSearchService(product_repo)
 
     def list_products(
         self,
@@ -33,38 +52,110 @@ class ProductService:
         sort: Optional[str] = None,
         page: int = 1,
         page_size: int = 20,
+        cursor: Optional[str] = None,
+        query: Optional[str] = None,
+        q: Optional[str] = None,
     ) -> ProductListResponse:
-        products, total = self.product_repo.list(
-            db,
-            category=category,
-            price_min=price_min,
-            price_max=price_max,
-            size=size,
-            color=color,
-            gender=gender,
-            sort=sort,
-            page=page,
-            page_size=page_size,
-        )
-        items = [
-            {
-                "id": product.id,
-                "name": product.name,
-                "price": product.price,
-                "category": product.category,
-                "gender": product.gender,
-                "main_image_url": product.images[0].url if product.images else None,
-                "seller_id": product.seller_id,
-            }
-            for product in products
-        ]
+        """
+        `query` ranks with the full-text backend only; `q` runs the hybrid
+        retriever and also applies the price, gender and color it mentions.
+        A request may use one of them, not both.
+        """
+        if query and q:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Use either query or q, not both",
+            )
+        ranked_ids = None
+        if q and q.strip():
+            parsed = self.hybrid_search.parse(
+                q, price_min=price_min, price_max=price_max, color=color, gender=gender
+            )
+            price_min, price_max = parsed.price_min, parsed.price_max
+            color, gender = parsed.color, parsed.gender
+            ranked_ids = self.hybrid_search.rank_ids(db, parsed, limit=TEXT_MATCH_LIMIT)
+        try:
+            rows, total, next_cursor = self.product_repo.list(
+                db,
+                category=category,
+                price_min=price_min,
+                price_max=price_max,
+                size=size,
+                color=color,
+                gender=gender,
+                sort=sort,
+                page=page,
+                page_size=page_size,
+                cursor=cursor,
+                query=query,
+                ranked_ids=ranked_ids,
+            )
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor",
+            )
         return ProductListResponse(
-            items=items,
+            items=rows,
             total=total,
             page=page,
             page_size=page_size,
+            next_cursor=next_cursor,
         )
 
+    def get_product_cards(self, db: Session, *, ids: List[int]) -> ProductBatchResponse:
+        """Cards for the active products among `ids`, in request order."""
+        return ProductBatchResponse(items=self.product_repo.list_cards_by_ids(db, ids))
+
+    def get_facets(
+        self,
+        db: Session,
+        *,
+        category: Optional[str] = None,
+        price_min: Optional[Decimal] = None,
+        price_max: Optional[Decimal] = None,
+        size: Optional[str] = None,
+        color: Optional[str] = None,
+        gender: Optional[str] = None,
+    ) -> ProductFacetsResponse:
+        filters = {
+            "category": category,
+            "price_min": price_min,
+            "price_max": price_max,
+            "size": size,
+            "color": color,
+            "gender": gender,
+        }
+        cache_key = (tuple(sorted(filters.items())), catalog_version.value)
+        cached = facet_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        counts = self.product_repo.facet_counts(db, **filters)
+
+        def by_count(facet: str):
+            return [
+                ProductFacetCount(value=value, count=count)
+                for value, count in sorted(
+                    counts[facet].items(),
+                    key=lambda kv: (-kv[1], kv[0]),
+                )
+            ]
+
+        response = ProductFacetsResponse(
+            category=by_count("category"),
+            gender=by_count("gender"),
+            size=by_count("size"),
+            color=by_count("color"),
+            # Price buckets keep their natural low-to-high order.
+            price=[
+                ProductFacetCount(value=value, count=count)
+                for value, count in counts["price"].items()
+            ],
+        )
+        facet_cache.set(cache_key, response)
+        return response
+
     def get_product_detail(self, db: Session, *, product_id: int) -> ProductDetail:
         product = self.product_repo.get(db, product_id)
         if not product or product.status == ProductStatus.DELETED:
@@ -74,6 +165,32 @@ class ProductService:
             )
         return ProductDetail.model_validate(product)
 
+    def get_cached_product_detail(self, db: Session, *, product_id: int) -> CachedDetail:
+        """
+        Serialized ProductDetail and its ETag, served from product_detail_cache
+        when possible so hot product pages skip the DB and Pydantic entirely.
+        The ETag hashes the body, so any change to the payload changes it.
+        """
+        cached = product_detail_cache.get(product_id)
+        if cached is not None:
+            return cached
+
+        # Taken before the read so a write committed meanwhile wins over us.
+        generation = product_detail_cache.generation(product_id)
+        product = self.product_repo.get(db, product_id)
+        if not product or product.status == ProductStatus.DELETED:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Product not found",
+            )
+        body = ProductDetail.model_validate(product).model_dump_json().encode("utf-8")
+        detail = CachedDetail(etag=body_etag(body), body=body)
+        product_detail_cache.set(product_id, detail, generation=generation)
+        return detail
+
+    def get_product_detail_json(self, db: Session, *, product_id: int) -> bytes:
+        return self.get_cached_product_detail(db, product_id=product_id).body
+
     def _ensure_seller_permissions(self, user: User) -> None:
         if user.role not in {UserRole.SELLER, UserRole.ADMIN}:
             raise HTTPException(
@@ -141,12 +258,59 @@ class ProductService:
         query: str,
         limit: int = 5,
     ) -> List[Product]:
-        return self.product_repo.search_by_text(
+        """
+        Full-text search. The ranked ids of each normalized query are cached
+        per catalog version; only the primary-key hydration hits the DB on a
+        cache hit.
+        """
+        key = ("text", normalize(query), limit, catalog_version.value)
+        ids = search_result_cache.get(key)
+        if ids is None:
+            ids = tuple(
+                self.product_repo.search_ids_by_text(db, query=query or "", limit=limit)
+            )
+            search_result_cache.set(key, ids)
+        return self.product_repo.get_active_in_order(db, list(ids))
+
+    def semantic_search_products(
+        self,
+        db: Session,
+        *,
+        query: str,
+        limit: int = 5,
+    ) -> List[Product]:
+        return self.product_repo.search_by_embedding(
             db,
             query=query or "",
             limit=limit,
         )
 
+    def hybrid_search_products(
+        self,
+        db: Session,
+        *,
+        query: str,
+        limit: int = 5,
+    ) -> List[Product]:
+        key = ("hybrid", normalize(query), limit, catalog_version.value)
+        ids = search_result_cache.get(key)
+        if ids is None:
+            parsed = self.hybrid_search.parse(query or "")
+            ranked = self.hybrid_search.rank_ids(db, parsed, limit=limit)
+            if ranked is None:
+                # Only constraints were given: newest products that satisfy them.
+                ranked = self.product_repo.list_filtered_ids(
+                    db,
+                    price_min=parsed.price_min,
+                    price_max=parsed.price_max,
+                    color=parsed.color,
+                    gender=parsed.gender,
+                    limit=limit,
+                )
+            ids = tuple(ranked)
+            search_result_cache.set(key, ids)
+        return self.product_repo.get_active_in_order(db, list(ids))
+
     def get_product_for_context(
         self,
         db: Session,
@@ -202,6 +366,9 @@ class ProductService:
                 style_params=style_params,
             )
             db.add(config)
+        # Avatar configs are part of the detail; bump the version stamp.
+        product.updated_at = func.now()
         db.commit()
+        product_detail_cache.invalidate(product.id)
         db.refresh(config)
         return config
@@ -1,10 +1,20 @@
-from typing import Dict, List, Optional
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
 
 from sqlalchemy.orm import Session
 
+from app.core.cache import suggest_cache
+from app.core.config import settings
 from app.models.search_keyword import SearchKeyword
 from app.repositories.product_repository import ProductRepository
 from app.repositories.search_repository import SearchRepository
+from app.search.history_writer import search_history_writer
+from app.search.suggest_index import ngrams, normalize, suggest_index
+
+# How much of each source the suggest index loads on a full rebuild.
+INDEX_KEYWORD_LIMIT = 5000
+INDEX_PRODUCT_NAME_LIMIT = 5000
 
 
 class SearchService:
@@ -16,12 +26,7 @@ class SearchService:
         """
         Generate n-grams from normalized text. Lightweight for memory.
         """
-        normalized = (text or "").lower().strip()
-        if not normalized:
-            return []
-        if len(normalized) <= n:
-            return [normalized]
-        return [normalized[i : i + n] for i in range(len(normalized) - n + 1)]
+        return ngrams(normalize(text), n)
 
     def fetch_search_keywords_from_search_keyword_table(
         self, db: Session, *, limit: int = 200
@@ -33,6 +38,44 @@ class SearchService:
     ) -> List[str]:
         return self.product_repo.fetch_product_names(db, limit=limit)
 
+    def compact_keyword_stats(self, db: Session) -> int:
+        return self.search_repo.rebuild_keyword_stats(db)
+
+    def refresh_suggest_index(self, db: Session) -> None:
+        if not self.search_repo.has_keyword_stats(db):
+            # Seed the rollup from history the first time (e.g. right after
+            # the table is introduced).
+            self.compact_keyword_stats(db)
+        suggest_index.rebuild(
+            self.fetch_search_keywords_from_search_keyword_table(
+                db, limit=INDEX_KEYWORD_LIMIT
+            ),
+            self.fetch_product_names_from_product_table(
+                db, limit=INDEX_PRODUCT_NAME_LIMIT
+            ),
+        )
+
+    def _ensure_suggest_index(self, db: Session) -> None:
+        if not suggest_index.is_built:
+            self.refresh_suggest_index(db)
+        elif suggest_index.is_stale() and suggest_index.claim_refresh():
+            # Keep answering from the current index while a fresh one is
+            # built on its own session.
+            threading.Thread(
+                target=self._refresh_in_background,
+                args=(db.get_bind(),),
+                daemon=True,
+            ).start()
+
+    def _refresh_in_background(self, bind: Any) -> None:
+        db = Session(bind=bind)
+        try:
+            self.refresh_suggest_index(db)
+        except Exception:
+            suggest_index.release_refresh()
+        finally:
+            db.close()
+
     def suggest_keywords(
         self, db: Session, *, query: str, limit: int = 10
     ) -> List[Dict[str, str]]:
@@ -40,49 +83,19 @@ class SearchService:
         if not q:
             return []
 
-        q_lower = q.lower()
-        ngrams = self.generate_ngrams(q_lower, n=2)
-
-        search_keywords = self.fetch_search_keywords_from_search_keyword_table(
-            db, limit=200
-        )
-        product_names = self.fetch_product_names_from_product_table(db, limit=500)
-
-        candidates: Dict[str, int] = {}
-
-        def add_candidate(text: str, base_score: int) -> None:
-            key = text.lower()
-            if not key:
-                return
-            score = candidates.get(key, 0)
-            score += base_score
-            if key.startswith(q_lower):
-                score += 3
-            for ng in ngrams:
-                if ng in key:
-                    score += 1
-            candidates[key] = score
-
-        for kw in search_keywords:
-            add_candidate(kw, base_score=3)
-
-        for name in product_names:
-            add_candidate(name, base_score=1)
-
-        sorted_items = sorted(
-            candidates.items(),
-            key=lambda kv: (-kv[1], kv[0]),
-        )
-
-        suggestions: List[Dict[str, str]] = []
-        for key, _ in sorted_items[:limit]:
-            suggestions.append(
-                {
-                    "keyword": key,
-                    "destination": f"/products?query={key}",
-                }
-            )
-        return suggestions
+        self._ensure_suggest_index(db)
+        cache_key = (normalize(q), limit, suggest_index.version)
+        keywords = suggest_cache.get(cache_key)
+        if keywords is None:
+            keywords = tuple(key for key, _ in suggest_index.search(q, limit=limit))
+            suggest_cache.set(cache_key, keywords)
+        return [
+            {
+                "keyword": key,
+                "destination": f"/products?query={key}",
+            }
+            for key in keywords
+        ]
 
     def get_history_for_user(
         self, db: Session, user_id: Optional[int]
@@ -105,3 +118,27 @@ class SearchService:
         return self.search_repo.create_history_item(
             db, user_id=user_id, keyword=keyword, destination=destination
         )
+
+    def prune_search_history(self, db: Session) -> int:
+        older_than = None
+        if settings.SEARCH_HISTORY_MAX_AGE_DAYS is not None:
+            older_than = datetime.utcnow() - timedelta(
+                days=settings.SEARCH_HISTORY_MAX_AGE_DAYS
+            )
+        return self.search_repo.prune_history(
+            db,
+            keep_per_user=settings.SEARCH_HISTORY_KEEP_PER_USER,
+            older_than=older_than,
+        )
+
+    def record_search(
+        self,
+        *,
+        user_id: Optional[int],
+        keyword: str,
+        destination: str,
+    ) -> bool:
+        """Queue a history entry for the batching writer; does not touch the DB."""
+        return search_history_writer.enqueue(
+            user_id=user_id, keyword=keyword, destination=destination
+        )
@@ -1,6 +1,7 @@
 from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
 
+from app.core.cache import product_detail_cache
 from app.models.user import User, UserRole, UserStatus
 from app.repositories.user_repository import UserRepository
 
@@ -22,7 +23,11 @@ class UserService:
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="User not found",
             )
-        return self.user_repo.update_role(db, user=user, role=new_role)
+        user = self.user_repo.update_role(db, user=user, role=new_role)
+        # The seller block of every product detail carries the role; role
+        # changes are rare, so drop the whole cache rather than look up ids.
+        product_detail_cache.clear()
+        return user
 
     def change_status(
         self,
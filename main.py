@@ -1,3 +1,5 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
 from app.api.v1.admin_router import router as admin_router
@@ -13,9 +15,26 @@ from app.api.v1.ai_seller_router import router as ai_seller_router
 from app.api.v1.ai_avatars_router import router as ai_avatars_router
 from app.api.v1.avatars_router import router as avatars_router
 from app.api.v1.search_router import router as search_router
+from app.cart.store import get_cart_store
+from app.cart.write_back import get_cart_write_back
 from app.core.config import settings
+from app.search.history_writer import search_history_writer
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.CART_STORE != "sql":
+        # Fail at startup on a cart store this deployment cannot use.
+        get_cart_store()
+    yield
+    # Write out search history still buffered by the batching writer.
+    search_history_writer.close()
+    if settings.CART_STORE != "sql":
+        # Copy cart changes not yet written back to the cart tables.
+        get_cart_write_back().close()
+
 
-app = FastAPI(title=settings.PROJECT_NAME)
+app = FastAPI(title=settings.PROJECT_NAME, lifespan=lifespan)
 
 app.include_router(auth_router, prefix=settings.API_V1_PREFIX)
 app.include_router(admin_router, prefix=settings.API_V1_PREFIX)
@@ -1,11 +1,18 @@
+from contextlib import contextmanager
 from decimal import Decimal
-from typing import Generator, List, Optional
+from typing import Callable, ContextManager, Generator, List, Optional
 
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import Session, sessionmaker
 
+from app.core.cache import (
+    facet_cache,
+    product_detail_cache,
+    search_result_cache,
+    suggest_cache,
+)
 from app.core.security import get_password_hash
 from app.core.security import create_access_token
 from app.db.base import Base
@@ -14,6 +21,10 @@ from app.models.product import Product, ProductStatus
 from app.models.product_avatar_config import ProductAvatarConfig
 from app.models.product_image import ProductImage
 from app.models.user import User, UserRole, UserStatus
+from app.search.fulltext import product_text_index
+from app.search.history_writer import search_history_writer
+from app.search.suggest_index import suggest_index
+from app.search.vector_index import product_vector_index
 from main import app
 
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
@@ -37,13 +48,22 @@ def override_get_db() -> Generator[Session, None, None]:
 
 
 app.dependency_overrides[get_db] = override_get_db
+search_history_writer.configure(TestingSessionLocal)
 
 
 @pytest.fixture(autouse=True)
 def setup_test_database() -> Generator[None, None, None]:
     Base.metadata.create_all(bind=engine)
     yield
+    search_history_writer.clear()
     Base.metadata.drop_all(bind=engine)
+    facet_cache.clear()
+    product_detail_cache.clear()
+    search_result_cache.clear()
+    suggest_cache.clear()
+    suggest_index.clear()
+    product_text_index.clear()
+    product_vector_index.clear()
 
 
 @pytest.fixture()
@@ -56,6 +76,33 @@ def db_session() -> Generator[Session, None, None]:
         session.close()
 
 
+@pytest.fixture()
+def captured_statements() -> Callable[..., ContextManager[list]]:
+    """
+    Records the SQL run on the test engine inside the block:
+
+        with captured_statements() as statements:
+            ...
+
+    With parameters=True the list holds (statement, parameters) pairs.
+    """
+
+    @contextmanager
+    def capture(parameters: bool = False) -> Generator[list, None, None]:
+        statements: list = []
+
+        def _record(conn, cursor, statement, params, context, executemany):
+            statements.append((statement, params) if parameters else statement)
+
+        event.listen(engine, "before_cursor_execute", _record)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, "before_cursor_execute", _record)
+
+    return capture
+
+
 @pytest.fixture()
 def client() -> TestClient:
     return TestClient(app)
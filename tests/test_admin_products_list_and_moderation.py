@@ -1,6 +1,7 @@
 import pytest
 from decimal import Decimal
 from app.models.product import Product, ProductStatus
+from app.models.product_facet import ProductColor, ProductSize
 from tests.conftest import create_product
 
 def test_admin_can_list_products(client, create_admin, create_seller, db_session, auth_header_factory):
@@ -146,3 +147,27 @@ def test_non_admin_cannot_moderate_product(client, create_buyer, create_seller,
     headers = auth_header_factory(buyer)
     response = client.patch(f"/api/v1/admin/products/{product.id}", json={"action": "hide"}, headers=headers)
     assert response.status_code in [401, 403]
+
+
+def test_admin_backfills_facet_rows_for_existing_products(client, create_admin, create_seller, db_session, auth_header_factory):
+    admin = create_admin()
+    seller = create_seller()
+    legacy = create_product(db_session, seller_id=seller.id, size_options=["M", "L"], color_options=["red"])
+    current = create_product(db_session, seller_id=seller.id, size_options=["S"])
+    # Rows as they were before the facet tables were introduced.
+    db_session.query(ProductSize).filter(ProductSize.product_id == legacy.id).delete()
+    db_session.query(ProductColor).filter(ProductColor.product_id == legacy.id).delete()
+    db_session.commit()
+
+    headers = auth_header_factory(admin)
+    response = client.post("/api/v1/admin/products/facets/backfill", headers=headers)
+
+    assert response.status_code == 200
+    assert response.json() == {"updated": 1}
+    sizes = db_session.query(ProductSize.product_id, ProductSize.value).order_by(ProductSize.id).all()
+    assert sorted(sizes) == [(legacy.id, "L"), (legacy.id, "M"), (current.id, "S")]
+    assert db_session.query(ProductColor.value).all() == [("red",)]
+    assert client.get("/api/v1/products", params={"size": "M"}).json()["total"] == 1
+
+    response = client.post("/api/v1/admin/products/facets/backfill", headers=headers)
+    assert response.json() == {"updated": 0}
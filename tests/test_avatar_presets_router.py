@@ -1,6 +1,6 @@
 from app.models.avatar_preset import AvatarPresetStatus
 from app.repositories.avatar_preset_repository import AvatarPresetRepository
-from app.schemas.avatar import AvatarPresetCreate, AvatarPresetParameters
+from app.schemas.avatar import AvatarPresetCreate, AvatarPresetParameters, AvatarPresetUpdate
 
 
 def test_list_avatar_presets_returns_active_items(client, db_session):
@@ -64,3 +64,77 @@ def test_non_admin_cannot_create_preset(client, create_seller, auth_header_facto
     )
 
     assert response.status_code == 403
+
+
+def test_list_avatar_presets_supports_conditional_get(client, db_session):
+    repo = AvatarPresetRepository()
+    repo.create(
+        db_session,
+        AvatarPresetCreate(
+            name="Preset A",
+            parameters=AvatarPresetParameters(),
+            status=AvatarPresetStatus.ACTIVE,
+        ),
+    )
+
+    first = client.get("/api/v1/avatars/presets")
+    etag = first.headers["ETag"]
+
+    cached = client.get("/api/v1/avatars/presets", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+
+    repo.create(
+        db_session,
+        AvatarPresetCreate(
+            name="Preset B",
+            parameters=AvatarPresetParameters(),
+            status=AvatarPresetStatus.ACTIVE,
+        ),
+    )
+    changed = client.get("/api/v1/avatars/presets", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert len(changed.json()["items"]) == 2
+
+
+def test_list_avatar_presets_etag_changes_when_preset_is_edited(client, db_session):
+    repo = AvatarPresetRepository()
+    preset = repo.create(
+        db_session,
+        AvatarPresetCreate(
+            name="Preset A",
+            parameters=AvatarPresetParameters(),
+            status=AvatarPresetStatus.ACTIVE,
+        ),
+    )
+    updated_at = preset.updated_at
+    etag = client.get("/api/v1/avatars/presets").headers["ETag"]
+
+    repo.update(db_session, preset_id=preset.id, data=AvatarPresetUpdate(name="Preset B"))
+    preset.updated_at = updated_at
+    db_session.commit()
+
+    changed = client.get("/api/v1/avatars/presets", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.json()["items"][0]["name"] == "Preset B"
+
+
+def test_list_avatar_presets_revalidates_without_loading_presets(
+    client, db_session, captured_statements
+):
+    repo = AvatarPresetRepository()
+    repo.create(
+        db_session,
+        AvatarPresetCreate(
+            name="Preset A",
+            parameters=AvatarPresetParameters(),
+            status=AvatarPresetStatus.ACTIVE,
+        ),
+    )
+    etag = client.get("/api/v1/avatars/presets").headers["ETag"]
+
+    with captured_statements() as statements:
+        cached = client.get("/api/v1/avatars/presets", headers={"If-None-Match": etag})
+
+    assert cached.status_code == 304
+    assert not any("avatar_presets.parameters" in stmt for stmt in statements)
@@ -0,0 +1,43 @@
+from app.core.cache import CachedDetail, LRUCache, ProductDetailCache
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_lru_cache_expires_entries_after_ttl(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("app.core.cache.time.monotonic", lambda: now[0])
+    cache = LRUCache(maxsize=2, ttl=10)
+    cache.set("a", 1)
+
+    now[0] += 5
+    assert cache.get("a") == 1
+    now[0] += 10
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_product_detail_cache_drops_sets_that_raced_an_invalidate():
+    cache = ProductDetailCache(LRUCache(maxsize=4))
+    stale = cache.generation(1)
+
+    cache.invalidate(1)  # a writer committed after the reader loaded the row
+
+    assert not cache.set(1, CachedDetail('"old"', b"old"), generation=stale)
+    assert cache.get(1) is None
+    assert cache.set(1, CachedDetail('"new"', b"new"), generation=cache.generation(1))
+    assert cache.get(1).body == b"new"
+
+    before_clear = cache.generation(2)
+    cache.clear()
+    assert not cache.set(2, CachedDetail('"old"', b"old"), generation=before_clear)
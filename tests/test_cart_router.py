@@ -41,6 +41,8 @@ def test_add_item_creates_cart_and_adds_item(
     body = response.json()
     assert len(body["items"]) == 1
     assert body["items"][0]["quantity"] == 2
+    assert body["items"][0]["product"]["name"] == product.name
+    assert Decimal(body["subtotal"]) == Decimal("40.00")
 
 
 def test_update_cart_item_changes_quantity(
@@ -98,3 +100,54 @@ def test_delete_cart_item_removes_item(
 def test_cart_endpoints_require_authentication(client):
     response = client.get("/api/v1/cart")
     assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_batch_update_applies_operations_and_returns_final_cart(
+    client,
+    create_buyer,
+    create_seller,
+    auth_header_factory,
+    db_session,
+):
+    buyer = create_buyer()
+    seller = create_seller()
+    shirt = create_product(db_session, seller_id=seller.id, name="Shirt")
+    shoes = create_product(db_session, seller_id=seller.id, name="Shoes")
+    headers = auth_header_factory(buyer)
+    create_resp = client.post(
+        "/api/v1/cart/items",
+        headers=headers,
+        json={"product_id": shirt.id, "quantity": 1},
+    )
+    shirt_line = create_resp.json()["items"][0]["id"]
+
+    response = client.patch(
+        "/api/v1/cart/items:batch",
+        headers=headers,
+        json={
+            "operations": [
+                {"op": "add", "product_id": shoes.id, "variant_data": {"size": "42"}},
+                {"op": "remove", "item_id": shirt_line},
+            ]
+        },
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    items = response.json()["items"]
+    assert [(item["product_id"], item["quantity"]) for item in items] == [(shoes.id, 1)]
+
+
+def test_batch_update_validates_operation_fields(
+    client,
+    create_buyer,
+    auth_header_factory,
+):
+    headers = auth_header_factory(create_buyer())
+
+    response = client.patch(
+        "/api/v1/cart/items:batch",
+        headers=headers,
+        json={"operations": [{"op": "set", "item_id": 1}]},
+    )
+
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
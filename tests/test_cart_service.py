@@ -1,9 +1,15 @@
+from decimal import Decimal
+
 import pytest
 from fastapi import HTTPException, status
+from sqlalchemy import event
+
+from app.models.cart import variant_hash
+from app.models.product import ProductStatus
 
 from app.repositories.cart_repository import CartRepository
 from app.repositories.product_repository import ProductRepository
-from app.schemas.cart import CartItemCreate
+from app.schemas.cart import CartItemCreate, CartItemOperation
 from app.services.cart_service import CartService
 from tests.conftest import create_product
 
@@ -100,3 +106,265 @@ def test_remove_cart_item_checks_ownership(
         cart_service.remove_cart_item(db_session, other_user.id, item_id)
 
     assert exc.value.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_get_cart_returns_product_snapshots_and_subtotal_in_one_query(
+    db_session,
+    create_buyer,
+    create_seller,
+    cart_service,
+    captured_statements,
+):
+    buyer = create_buyer()
+    seller = create_seller()
+    products = [
+        create_product(
+            db_session,
+            seller_id=seller.id,
+            name=f"Product {i}",
+            price=Decimal("12.50"),
+            images=[{"url": f"https://img/{i}-a.jpg"}, {"url": f"https://img/{i}-b.jpg"}],
+        )
+        for i in range(3)
+    ]
+    for product in products:
+        cart_service.add_item_to_cart(
+            db_session,
+            buyer.id,
+            CartItemCreate(product_id=product.id, quantity=2),
+        )
+    buyer_id = buyer.id
+    db_session.expire_all()
+
+    with captured_statements() as statements:
+        cart = cart_service.get_cart_for_user(db_session, buyer_id)
+
+    assert len(statements) == 1
+    assert [item.product.name for item in cart.items] == [
+        "Product 0",
+        "Product 1",
+        "Product 2",
+    ]
+    assert cart.items[0].product.main_image_url == "https://img/0-a.jpg"
+    assert cart.items[0].line_total == Decimal("25.00")
+    assert cart.subtotal == Decimal("75.00")
+
+
+def test_get_cart_subtotal_skips_unavailable_products(
+    db_session,
+    create_buyer,
+    create_seller,
+    cart_service,
+):
+    buyer = create_buyer()
+    seller = create_seller()
+    kept = create_product(db_session, seller_id=seller.id, price=Decimal("10.00"))
+    dropped = create_product(db_session, seller_id=seller.id, price=Decimal("99.00"))
+    for product in (kept, dropped):
+        cart_service.add_item_to_cart(
+            db_session,
+            buyer.id,
+            CartItemCreate(product_id=product.id, quantity=1),
+        )
+    dropped.status = ProductStatus.DELETED
+    db_session.commit()
+
+    cart = cart_service.get_cart_for_user(db_session, buyer.id)
+
+    assert cart.items[1].product.status == ProductStatus.DELETED
+    assert cart.items[1].line_total == Decimal("0.00")
+    assert cart.subtotal == Decimal("10.00")
+
+
+def test_cart_mutations_commit_once_without_refreshes(
+    db_session,
+    create_buyer,
+    create_seller,
+    cart_service,
+    captured_statements,
+):
+    buyer = create_buyer()
+    seller = create_seller()
+    product = create_product(db_session, seller_id=seller.id)
+    buyer_id, product_id = buyer.id, product.id
+    cart_service.add_item_to_cart(
+        db_session, buyer_id, CartItemCreate(product_id=product_id, quantity=1)
+    )
+    item_id = cart_service.get_cart_for_user(db_session, buyer_id).items[0].id
+    db_session.expire_all()
+
+    commits = []
+
+    def _commit(conn):
+        commits.append(conn)
+
+    engine = db_session.get_bind()
+    event.listen(engine, "commit", _commit)
+    try:
+        with captured_statements() as add_statements:
+            cart_service.add_item_to_cart(
+                db_session, buyer_id, CartItemCreate(product_id=product_id, quantity=2)
+            )
+        add_commits = len(commits)
+        commits.clear()
+        with captured_statements() as statements:
+            cart = cart_service.update_cart_item_quantity(db_session, buyer_id, item_id, 5)
+    finally:
+        event.remove(engine, "commit", _commit)
+
+    # product, cart id, line upsert, cart view
+    assert [s.split()[0] for s in add_statements] == ["SELECT", "SELECT", "INSERT", "SELECT"]
+    assert add_commits == 1
+    # owned item, update, cart view
+    assert [s.split()[0] for s in statements] == ["SELECT", "UPDATE", "SELECT"]
+    assert len(commits) == 1
+    assert cart.items[0].quantity == 5
+
+
+def test_add_item_to_cart_merges_lines_by_canonical_variant(
+    db_session,
+    create_buyer,
+    create_seller,
+    cart_service,
+):
+    buyer = create_buyer()
+    seller = create_seller()
+    product = create_product(db_session, seller_id=seller.id)
+
+    cart_service.add_item_to_cart(
+        db_session,
+        buyer.id,
+        CartItemCreate(product_id=product.id, variant_data={"size": "M", "color": "red"}),
+    )
+    cart_service.add_item_to_cart(
+        db_session,
+        buyer.id,
+        CartItemCreate(product_id=product.id, variant_data={"color": "red", "size": "M"}),
+    )
+    cart = cart_service.add_item_to_cart(
+        db_session,
+        buyer.id,
+        CartItemCreate(product_id=product.id, variant_data={"size": "L", "color": "red"}),
+    )
+
+    assert [(item.variant_data["size"], item.quantity) for item in cart.items] == [
+        ("M", 2),
+        ("L", 1),
+    ]
+
+
+def test_variant_hash_is_canonical():
+    assert variant_hash({"a": 1, "b": [1, 2]}) == variant_hash({"b": [1, 2], "a": 1})
+    assert variant_hash(None) == variant_hash({})
+    assert variant_hash({"size": "M"}) != variant_hash({"size": "L"})
+
+
+def test_apply_cart_operations_runs_batch_in_one_transaction(
+    db_session,
+    create_buyer,
+    create_seller,
+    cart_service,
+    captured_statements,
+):
+    buyer = create_buyer()
+    seller = create_seller()
+    kept, changed, dropped, added = [
+        create_product(db_session, seller_id=seller.id, name=name, price=Decimal("10.00"))
+        for name in ("Kept", "Changed", "Dropped", "Added")
+    ]
+    for product in (kept, changed, dropped):
+        cart_service.add_item_to_cart(
+            db_session, buyer.id, CartItemCreate(product_id=product.id)
+        )
+    lines = {
+        item.product_id: item.id
+        for item in cart_service.get_cart_for_user(db_session, buyer.id).items
+    }
+    buyer_id, kept_id, added_id = buyer.id, kept.id, added.id
+    changed_line, dropped_line = lines[changed.id], lines[dropped.id]
+    db_session.expire_all()
+
+    with captured_statements() as statements:
+        cart = cart_service.apply_cart_operations(
+            db_session,
+            buyer_id,
+            [
+                CartItemOperation(op="add", product_id=kept_id, quantity=2),
+                CartItemOperation(op="add", product_id=added_id),
+                CartItemOperation(op="set", item_id=changed_line, quantity=4),
+                CartItemOperation(op="remove", item_id=dropped_line),
+            ],
+        )
+
+    assert [(item.product.name, item.quantity) for item in cart.items] == [
+        ("Kept", 3),
+        ("Changed", 4),
+        ("Added", 1),
+    ]
+    assert cart.subtotal == Decimal("80.00")
+    product_queries = [s for s in statements if s.lstrip().startswith("SELECT") and "FROM products" in s]
+    assert len(product_queries) == 1
+
+
+def test_apply_cart_operations_rejects_whole_batch_on_invalid_target(
+    db_session,
+    create_buyer,
+    create_seller,
+    cart_service,
+):
+    buyer = create_buyer()
+    seller = create_seller()
+    product = create_product(db_session, seller_id=seller.id)
+    draft = create_product(db_session, seller_id=seller.id, status=ProductStatus.DRAFT)
+
+    with pytest.raises(HTTPException) as exc:
+        cart_service.apply_cart_operations(
+            db_session,
+            buyer.id,
+            [
+                CartItemOperation(op="add", product_id=product.id),
+                CartItemOperation(op="add", product_id=draft.id),
+            ],
+        )
+
+    assert exc.value.status_code == status.HTTP_404_NOT_FOUND
+    assert cart_service.get_cart_for_user(db_session, buyer.id).items == []
+
+
+def test_apply_cart_operations_set_after_add_on_same_line_wins(
+    db_session,
+    create_buyer,
+    create_seller,
+    cart_service,
+):
+    buyer = create_buyer()
+    seller = create_seller()
+    product = create_product(db_session, seller_id=seller.id)
+    cart = cart_service.add_item_to_cart(
+        db_session, buyer.id, CartItemCreate(product_id=product.id, quantity=2)
+    )
+    line_id = cart.items[0].id
+
+    cart = cart_service.apply_cart_operations(
+        db_session,
+        buyer.id,
+        [
+            CartItemOperation(op="add", product_id=product.id, quantity=3),
+            CartItemOperation(op="set", item_id=line_id, quantity=2),
+        ],
+    )
+
+    assert [(item.id, item.quantity) for item in cart.items] == [(line_id, 2)]
+    db_session.expire_all()
+    assert cart_service.get_cart_for_user(db_session, buyer.id).items[0].quantity == 2
+
+    cart = cart_service.apply_cart_operations(
+        db_session,
+        buyer.id,
+        [
+            CartItemOperation(op="add", product_id=product.id),
+            CartItemOperation(op="remove", item_id=line_id),
+        ],
+    )
+
+    assert cart.items == []
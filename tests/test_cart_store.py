@@ -0,0 +1,346 @@
+import threading
+from collections import defaultdict
+
+import pytest
+
+from app.cart.store import CartLine, MemoryCartStore, RedisCartStore, get_cart_store
+from app.cart.write_back import CartWriteBack
+from app.core.config import settings
+from app.models.cart import CartItem
+from app.models.order import Order
+from app.repositories.cart_repository import CartRepository
+from app.repositories.cart_store_repository import StoreCartRepository
+from app.repositories.order_repository import OrderRepository
+from app.repositories.product_repository import ProductRepository
+from app.schemas.cart import CartItemCreate
+from app.services.cart_service import CartService
+from app.services.order_service import OrderService
+from tests.conftest import TestingSessionLocal, create_product
+
+
+class FakeRedis:
+    """The redis-py commands RedisCartStore uses, over dicts (decoded replies)."""
+
+    def __init__(self):
+        self.strings = {}
+        self.hashes = defaultdict(dict)
+        self.sets = defaultdict(set)
+        self.locks = defaultdict(threading.Lock)
+        self.ttls = {}
+
+    def get(self, key):
+        return self.strings.get(key)
+
+    def set(self, key, value, nx=False):
+        if nx and key in self.strings:
+            return None
+        self.strings[key] = str(value)
+        return True
+
+    def exists(self, key):
+        return int(key in self.strings or bool(self.hashes.get(key)))
+
+    def lock(self, name, timeout=None):
+        return self.locks[name]
+
+    def incr(self, key):
+        self.strings[key] = str(int(self.strings.get(key, 0)) + 1)
+        return int(self.strings[key])
+
+    def hget(self, key, field):
+        return self.hashes[key].get(str(field))
+
+    def hset(self, key, field, value):
+        self.hashes[key][str(field)] = str(value)
+        return 1
+
+    def hsetnx(self, key, field, value):
+        if str(field) in self.hashes[key]:
+            return 0
+        self.hashes[key][str(field)] = str(value)
+        return 1
+
+    def hgetall(self, key):
+        return dict(self.hashes[key])
+
+    def hexists(self, key, field):
+        return str(field) in self.hashes[key]
+
+    def hdel(self, key, field):
+        return int(self.hashes[key].pop(str(field), None) is not None)
+
+    def hincrby(self, key, field, amount):
+        value = int(self.hashes[key].get(str(field), 0)) + amount
+        self.hashes[key][str(field)] = str(value)
+        return value
+
+    def sadd(self, key, member):
+        self.sets[key].add(str(member))
+
+    def srem(self, key, member):
+        self.sets[key].discard(str(member))
+
+    def spop(self, key, count):
+        members = sorted(self.sets[key])[:count]
+        self.sets[key].difference_update(members)
+        return members
+
+    def expire(self, key, seconds):
+        if not self.exists(key):
+            return 0
+        self.ttls[key] = seconds
+        return 1
+
+    def delete(self, *keys):
+        for key in keys:
+            self.ttls.pop(key, None)
+            self.strings.pop(key, None)
+            self.hashes.pop(key, None)
+            self.sets.pop(key, None)
+
+
+@pytest.fixture(params=["memory", "redis"])
+def cart_store(request):
+    if request.param == "memory":
+        return MemoryCartStore()
+    return RedisCartStore(FakeRedis())
+
+
+@pytest.fixture()
+def write_back(cart_store):
+    # Passes are driven by the tests through flush().
+    writer = CartWriteBack(cart_store, TestingSessionLocal, interval=3600)
+    yield writer
+    writer.close()
+
+
+@pytest.fixture()
+def store_cart_repo(cart_store, write_back):
+    return StoreCartRepository(cart_store, write_back)
+
+
+def test_store_merges_lines_and_tracks_dirty_carts(cart_store):
+    cart_store.seed_line_ids(40)
+    cart_store.load_cart(7, 3, [CartLine(id=12, product_id=1, quantity=1)])
+
+    merged = cart_store.add(3, product_id=1, quantity=2, variant_data=None)
+    first = cart_store.add(3, product_id=2, quantity=1, variant_data={"size": "M", "fit": "slim"})
+    second = cart_store.add(3, product_id=2, quantity=1, variant_data={"fit": "slim", "size": "M"})
+    cart_store.add(3, product_id=2, quantity=1, variant_data={"size": "L"})
+
+    assert merged == 12
+    assert first == second == 41
+    assert cart_store.get_cart_id(7) == 3
+    assert [(line.id, line.quantity) for line in cart_store.lines(3)] == [
+        (12, 3),
+        (41, 2),
+        (42, 1),
+    ]
+    assert cart_store.take_dirty(10) == [3]
+    assert cart_store.take_dirty(10) == []
+
+    assert cart_store.set_quantity(3, 41, 5)
+    assert cart_store.remove(3, 12)
+    assert not cart_store.remove(3, 12)
+    assert [(line.id, line.quantity) for line in cart_store.lines(3)] == [(41, 5), (42, 1)]
+    assert cart_store.take_dirty(10) == [3]
+
+
+def test_memory_store_evicts_idle_carts_once_written_back():
+    store = MemoryCartStore(idle_timeout=0)
+    store.load_cart(7, 3, [])
+    store.add(3, product_id=1, quantity=1, variant_data=None)
+    with store.lock(3):
+        pass
+
+    assert store.evict_idle() == 0
+    assert store.take_dirty(10) == [3]
+    assert store.evict_idle() == 1
+
+    assert store.get_cart_id(7) is None
+    assert not store.has_cart(3)
+    assert store._cart_locks == {}
+
+
+def test_memory_store_evict_drops_cart_lock():
+    store = MemoryCartStore()
+    store.load_cart(7, 3, [])
+    with store.lock(3):
+        store.evict(7, 3)
+
+    assert store._cart_locks == {}
+
+
+def test_memory_store_is_refused_with_several_workers(monkeypatch):
+    monkeypatch.setattr(settings, "CART_STORE", "memory")
+    monkeypatch.setattr(settings, "WEB_CONCURRENCY", 4)
+    get_cart_store.cache_clear()
+    try:
+        with pytest.raises(ValueError):
+            get_cart_store()
+        monkeypatch.setattr(settings, "WEB_CONCURRENCY", 1)
+        assert isinstance(get_cart_store(), MemoryCartStore)
+    finally:
+        get_cart_store.cache_clear()
+
+
+def test_redis_store_refreshes_cart_expiry_on_every_change():
+    client = FakeRedis()
+    store = RedisCartStore(client, idle_timeout=60)
+    store.load_cart(7, 3, [])
+    line_id = store.add(3, product_id=1, quantity=1, variant_data=None)
+    client.ttls.clear()
+
+    store.set_quantity(3, line_id, 2)
+
+    assert client.ttls == {
+        "cart:user:7": 60,
+        "cart:3:user": 60,
+        "cart:3:lines": 60,
+        "cart:3:qty": 60,
+        "cart:3:index": 60,
+    }
+
+
+def test_cart_writes_stay_in_store_until_written_back(
+    db_session,
+    create_buyer,
+    create_seller,
+    store_cart_repo,
+    write_back,
+    captured_statements,
+):
+    buyer = create_buyer()
+    seller = create_seller()
+    shirt = create_product(db_session, seller_id=seller.id, name="Shirt")
+    shoes = create_product(db_session, seller_id=seller.id, name="Shoes")
+    service = CartService(store_cart_repo, ProductRepository())
+    service.get_cart_for_user(db_session, buyer.id)
+
+    with captured_statements() as statements:
+        service.add_item_to_cart(db_session, buyer.id, CartItemCreate(product_id=shirt.id))
+        cart = service.add_item_to_cart(
+            db_session, buyer.id, CartItemCreate(product_id=shoes.id, quantity=2)
+        )
+        cart = service.update_cart_item_quantity(db_session, buyer.id, cart.items[0].id, 3)
+
+    assert [(item.product.name, item.quantity) for item in cart.items] == [
+        ("Shirt", 3),
+        ("Shoes", 2),
+    ]
+    assert not [s for s in statements if not s.lstrip().startswith("SELECT")]
+    assert db_session.query(CartItem).count() == 0
+
+    assert write_back.flush() == 1
+    rows = db_session.query(CartItem).order_by(CartItem.id).all()
+    assert [(row.id, row.product_id, row.quantity) for row in rows] == [
+        (item.id, item.product_id, item.quantity) for item in cart.items
+    ]
+
+    service.remove_cart_item(db_session, buyer.id, cart.items[0].id)
+    write_back.flush()
+    db_session.expire_all()
+    assert [row.product_id for row in db_session.query(CartItem)] == [shoes.id]
+
+
+def test_existing_sql_cart_is_copied_into_store(
+    db_session,
+    create_buyer,
+    create_seller,
+    store_cart_repo,
+    cart_store,
+):
+    buyer = create_buyer()
+    seller = create_seller()
+    product = create_product(db_session, seller_id=seller.id)
+    sql_cart = CartService(CartRepository(), ProductRepository()).add_item_to_cart(
+        db_session, buyer.id, CartItemCreate(product_id=product.id, quantity=2)
+    )
+
+    cart = CartService(store_cart_repo, ProductRepository()).add_item_to_cart(
+        db_session, buyer.id, CartItemCreate(product_id=product.id)
+    )
+
+    assert cart.id == sql_cart.id
+    assert [(item.id, item.quantity) for item in cart.items] == [(sql_cart.items[0].id, 3)]
+    assert cart_store.get_cart_id(buyer.id) == sql_cart.id
+
+
+def test_checkout_flushes_store_and_evicts_cart(
+    db_session,
+    create_buyer,
+    create_seller,
+    store_cart_repo,
+    cart_store,
+):
+    buyer = create_buyer()
+    seller = create_seller()
+    product = create_product(db_session, seller_id=seller.id, stock=5)
+    CartService(store_cart_repo, ProductRepository()).add_item_to_cart(
+        db_session, buyer.id, CartItemCreate(product_id=product.id, quantity=2)
+    )
+    order_service = OrderService(store_cart_repo, OrderRepository(), ProductRepository())
+
+    order_service.create_order_from_cart(db_session, buyer.id)
+
+    order = db_session.query(Order).one()
+    assert [(item.product_id, item.quantity) for item in order.items] == [(product.id, 2)]
+    assert cart_store.get_cart_id(buyer.id) is None
+    assert db_session.query(CartItem).count() == 0
+
+
+def test_write_back_skips_cart_checked_out_after_it_was_taken(
+    db_session,
+    create_buyer,
+    create_seller,
+    store_cart_repo,
+    cart_store,
+    write_back,
+    monkeypatch,
+):
+    buyer = create_buyer()
+    seller = create_seller()
+    product = create_product(db_session, seller_id=seller.id, stock=5)
+    cart = CartService(store_cart_repo, ProductRepository()).add_item_to_cart(
+        db_session, buyer.id, CartItemCreate(product_id=product.id, quantity=2)
+    )
+    # A pass picked the cart up just before checkout ran.
+    assert cart_store.take_dirty(10) == [cart.id]
+
+    OrderService(store_cart_repo, OrderRepository(), ProductRepository()).create_order_from_cart(
+        db_session, buyer.id
+    )
+    synced = []
+    monkeypatch.setattr(write_back.repo, "sync_cart_items", lambda *args: synced.append(args))
+    db = TestingSessionLocal()
+    try:
+        assert write_back._write(db, cart.id)
+    finally:
+        db.close()
+
+    assert synced == []
+
+
+def test_write_back_waits_for_checkout_lock(
+    db_session,
+    create_buyer,
+    create_seller,
+    store_cart_repo,
+    write_back,
+):
+    buyer = create_buyer()
+    seller = create_seller()
+    product = create_product(db_session, seller_id=seller.id)
+    CartService(store_cart_repo, ProductRepository()).add_item_to_cart(
+        db_session, buyer.id, CartItemCreate(product_id=product.id)
+    )
+
+    with store_cart_repo.lock_cart(db_session, buyer.id):
+        worker = threading.Thread(target=write_back.flush)
+        worker.start()
+        worker.join(0.2)
+        assert worker.is_alive()
+        assert db_session.query(CartItem).count() == 0
+    worker.join()
+
+    assert db_session.query(CartItem).count() == 1
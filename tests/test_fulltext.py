@@ -0,0 +1,96 @@
+from decimal import Decimal
+
+from app.core.config import settings
+from app.repositories.product_repository import ProductRepository
+from app.search.fulltext import BM25Index, get_fulltext_backend, tokenize
+from app.services.product_service import ProductService
+from tests.conftest import create_product
+
+
+def _doc(name, category="", description="", colors=""):
+    return {"name": name, "category": category, "description": description, "colors": colors}
+
+
+def test_tokenize_lowercases_and_splits_on_punctuation():
+    assert tokenize("Blue-Denim JACKET, slim") == ["blue", "denim", "jacket", "slim"]
+    assert tokenize(None) == []
+
+
+def test_bm25_ranks_name_matches_above_description_matches():
+    index = BM25Index()
+    index.rebuild(
+        [
+            (1, _doc("Classic tee", description="pairs well with a denim jacket")),
+            (2, _doc("Denim jacket", category="outerwear")),
+            (3, _doc("Wool scarf")),
+        ]
+    )
+
+    assert [doc_id for doc_id, _ in index.search("denim jacket")] == [2, 1]
+    assert index.search("sandals") == []
+
+
+def test_bm25_upsert_and_remove_patch_the_index():
+    index = BM25Index()
+    index.rebuild([(1, _doc("Red dress"))])
+
+    index.upsert(1, _doc("Green dress"))
+    index.upsert(2, _doc("Red scarf"))
+    index.remove(2)
+
+    assert index.search("red") == []
+    assert [doc_id for doc_id, _ in index.search("green")] == [1]
+
+
+def test_fts5_search_ranks_name_matches_first(db_session, create_seller):
+    seller = create_seller()
+    in_description = create_product(db_session, seller_id=seller.id, name="Classic tee")
+    in_description.description = "Soft cotton tee to wear under a linen blazer"
+    in_name = create_product(db_session, seller_id=seller.id, name="Linen blazer")
+    create_product(db_session, seller_id=seller.id, name="Wool scarf")
+    db_session.commit()
+
+    results = ProductService(ProductRepository()).search_products(db_session, query="linen blazer")
+
+    assert [p.id for p in results] == [in_name.id, in_description.id]
+
+
+def test_bm25_backend_builds_from_active_products(db_session, create_seller, monkeypatch):
+    monkeypatch.setattr(settings, "SEARCH_BACKEND", "bm25")
+    seller = create_seller()
+    wanted = create_product(
+        db_session, seller_id=seller.id, name="Canvas sneakers", color_options=["white"]
+    )
+    create_product(db_session, seller_id=seller.id, name="Leather boots")
+
+    backend = get_fulltext_backend(db_session)
+
+    assert backend.search_ids(db_session, query="white sneakers", limit=5) == [wanted.id]
+
+
+def test_list_products_query_orders_by_relevance_and_pages(client, db_session, create_seller):
+    seller = create_seller()
+    weak = create_product(db_session, seller_id=seller.id, name="Cotton socks")
+    weak.description = "Thin socks, not a hoodie"
+    strong = create_product(
+        db_session, seller_id=seller.id, name="Hoodie", price=Decimal("40.00")
+    )
+    create_product(db_session, seller_id=seller.id, name="Rain jacket")
+    db_session.commit()
+
+    response = client.get("/api/v1/products", params={"query": "hoodie", "page_size": 1})
+    body = response.json()
+    assert body["total"] == 2
+    assert [item["id"] for item in body["items"]] == [strong.id]
+
+    response = client.get(
+        "/api/v1/products",
+        params={"query": "hoodie", "page_size": 1, "cursor": body["next_cursor"]},
+    )
+    body = response.json()
+    assert [item["id"] for item in body["items"]] == [weak.id]
+    assert body["next_cursor"] is None
+
+    response = client.get("/api/v1/products", params={"query": "parka"})
+    assert response.json()["items"] == []
+    assert response.json()["total"] == 0
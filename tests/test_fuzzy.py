@@ -0,0 +1,41 @@
+from app.search.fuzzy import FuzzyTokenIndex, edit_distance, max_edits
+
+
+def test_edit_distance_counts_transpositions_as_one_edit():
+    assert edit_distance("jacket", "jacket", 2) == 0
+    assert edit_distance("jaket", "jacket", 2) == 1
+    assert edit_distance("jakcet", "jacket", 2) == 1
+    assert edit_distance("dress", "jacket", 2) == 3
+
+
+def test_edit_budget_grows_with_token_length():
+    assert [max_edits(t) for t in ["ab", "abc", "abcde", "abcdef"]] == [0, 1, 1, 2]
+
+
+def test_lookup_finds_tokens_within_distance():
+    index = FuzzyTokenIndex()
+    for token in ["jacket", "jeans", "packet", "shirt"]:
+        index.add(token)
+
+    assert index.lookup("jaket", 1) == [("jacket", 1)]
+    assert index.lookup("jaket", 2) == [("jacket", 1), ("packet", 2)]
+    assert index.lookup("shrit", 0) == []
+
+
+def test_lookup_with_prefix_includes_unfinished_tokens():
+    index = FuzzyTokenIndex()
+    for token in ["jacket", "jeans", "shirt"]:
+        index.add(token)
+
+    assert index.lookup("je", 0, prefix=True) == [("jeans", 0)]
+
+
+def test_remove_drops_token_from_lookups():
+    index = FuzzyTokenIndex()
+    index.add("jacket")
+    index.add("jeans")
+    index.remove("jacket")
+
+    assert "jacket" not in index
+    assert len(index) == 1
+    assert index.lookup("jaket", 2) == []
@@ -0,0 +1,139 @@
+from decimal import Decimal
+
+from sqlalchemy.orm import Session
+
+from app.repositories.product_repository import ProductRepository
+from app.search.query_parser import parse_query
+from app.services import hybrid_search_service
+from app.services.hybrid_search_service import reciprocal_rank_fusion
+from app.services.product_service import ProductService
+from tests.conftest import create_product
+
+
+def test_parse_query_extracts_price_gender_and_color():
+    parsed = parse_query("Red summer dress for women under $50")
+
+    assert parsed.text == "summer dress for"
+    assert parsed.price_max == Decimal("50")
+    assert parsed.price_min is None
+    assert parsed.gender == "women"
+    assert parsed.color == "red"
+
+
+def test_parse_query_reads_price_ranges():
+    assert parse_query("men's jacket between 80 and 40").price_min == Decimal("40")
+    parsed = parse_query("jeans 20-60")
+    assert (parsed.price_min, parsed.price_max, parsed.text) == (
+        Decimal("20"),
+        Decimal("60"),
+        "jeans",
+    )
+    assert not parse_query("linen shirt").has_constraints
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    fused = reciprocal_rank_fusion([[1, 2, 3], [4, 2, 3]])
+
+    assert fused[0] == 2
+    assert set(fused) == {1, 2, 3, 4}
+
+
+def _catalog(db_session, seller_id):
+    return {
+        "match": create_product(
+            db_session,
+            seller_id=seller_id,
+            name="Summer dress",
+            price=Decimal("40.00"),
+            color_options=["red"],
+        ),
+        "too_expensive": create_product(
+            db_session,
+            seller_id=seller_id,
+            name="Summer dress deluxe",
+            price=Decimal("80.00"),
+            color_options=["red"],
+        ),
+        "wrong_color": create_product(
+            db_session,
+            seller_id=seller_id,
+            name="Summer dress",
+            price=Decimal("30.00"),
+            color_options=["blue"],
+        ),
+        "other": create_product(
+            db_session,
+            seller_id=seller_id,
+            name="Basic tee",
+            price=Decimal("20.00"),
+            color_options=["red"],
+        ),
+    }
+
+
+def test_hybrid_search_applies_parsed_constraints(db_session, create_seller):
+    catalog = _catalog(db_session, create_seller().id)
+    service = ProductService(ProductRepository())
+
+    results = service.hybrid_search_products(db_session, query="red summer dress under 50")
+    assert [p.id for p in results] == [catalog["match"].id]
+
+    results = service.hybrid_search_products(db_session, query="red under 25")
+    assert [p.id for p in results] == [catalog["other"].id]
+
+
+def test_list_products_q_ranks_with_hybrid_search(client, db_session, create_seller):
+    catalog = _catalog(db_session, create_seller().id)
+
+    response = client.get("/api/v1/products", params={"q": "summer dress in red"})
+
+    ids = [item["id"] for item in response.json()["items"]]
+    assert ids[:2] == [catalog["match"].id, catalog["too_expensive"].id]
+    assert catalog["wrong_color"].id not in ids
+
+
+def test_vector_search_worker_gets_no_session(db_session, create_seller, monkeypatch):
+    catalog = _catalog(db_session, create_seller().id)
+    submitted = []
+    submit = hybrid_search_service._executor.submit
+
+    def _submit(fn, *args, **kwargs):
+        submitted.append([*args, *kwargs.values()])
+        return submit(fn, *args, **kwargs)
+
+    monkeypatch.setattr(hybrid_search_service._executor, "submit", _submit)
+    results = ProductService(ProductRepository()).hybrid_search_products(
+        db_session, query="summer dress under 50"
+    )
+
+    assert catalog["match"].id in [p.id for p in results]
+    assert submitted
+    assert not any(isinstance(arg, Session) for args in submitted for arg in args)
+
+
+def test_constraints_are_checked_only_for_vector_candidates(
+    db_session, create_seller, monkeypatch
+):
+    catalog = _catalog(db_session, create_seller().id)
+    repo = ProductRepository()
+    lookups = []
+    list_filtered_ids = repo.list_filtered_ids
+
+    def _list_filtered_ids(db, **kwargs):
+        lookups.append(kwargs.get("matched_ids"))
+        return list_filtered_ids(db, **kwargs)
+
+    monkeypatch.setattr(repo, "list_filtered_ids", _list_filtered_ids)
+    results = ProductService(repo).hybrid_search_products(
+        db_session, query="red summer dress under 50"
+    )
+
+    assert [p.id for p in results] == [catalog["match"].id]
+    assert lookups
+    assert all(ids is not None and catalog["match"].id in ids for ids in lookups)
+
+
+def test_list_products_rejects_query_with_q(client):
+    response = client.get("/api/v1/products", params={"query": "dress", "q": "red dress"})
+
+    assert response.status_code == 400
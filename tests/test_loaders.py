@@ -0,0 +1,110 @@
+from app.db.loaders import Loader
+from app.models.avatar_preset import AvatarPreset, AvatarPresetStatus
+from app.repositories.avatar_preset_repository import AvatarPresetRepository
+from app.repositories.product_repository import ProductRepository
+from app.repositories.user_repository import UserRepository
+from app.services.product_service import ProductService
+from tests.conftest import TestingSessionLocal, create_product
+
+
+def test_loader_batches_unseen_keys_and_memoizes_misses():
+    calls = []
+
+    def batch_fn(keys):
+        calls.append(list(keys))
+        return {key: key * 10 for key in keys if key != 3}
+
+    loader = Loader(batch_fn)
+
+    assert loader.load_many([1, 2, 3]) == {1: 10, 2: 20}
+    assert loader.load(1) == 10
+    assert loader.load_many([2, 3, 2]) == {2: 20}
+    assert loader.load(3) is None
+    assert loader.load_many([3, 4]) == {4: 40}
+    assert calls == [[1, 2, 3], [4]]
+
+
+def test_repeated_product_lookups_in_one_session_cost_one_query(
+    db_session,
+    create_seller,
+    captured_statements,
+):
+    seller = create_seller()
+    product = create_product(db_session, seller_id=seller.id)
+    service = ProductService(ProductRepository())
+
+    db = TestingSessionLocal()
+    try:
+        with captured_statements() as statements:
+            first = service.get_product_for_context(db, product_id=product.id)
+            second = service.get_product_for_context(db, product_id=product.id)
+            repo_hit = ProductRepository().get(db, product.id)
+            assert service.get_product_for_context(db, product_id=999999) is None
+            assert service.get_product_for_context(db, product_id=999999) is None
+    finally:
+        db.close()
+
+    assert first is second is repo_hit
+    # one for the product, one for the unknown id
+    assert len(statements) == 2
+
+
+def test_get_many_memoizes_products_for_later_gets(
+    db_session,
+    create_seller,
+    captured_statements,
+):
+    seller = create_seller()
+    ids = [
+        create_product(db_session, seller_id=seller.id, name=f"Product {i}").id
+        for i in range(4)
+    ]
+    repo = ProductRepository()
+
+    db = TestingSessionLocal()
+    try:
+        with captured_statements() as statements:
+            repo.get_many(db, ids)
+            names = [repo.get(db, product_id).name for product_id in ids]
+    finally:
+        db.close()
+
+    assert names == [f"Product {i}" for i in range(4)]
+    assert len(statements) == 1
+
+
+def test_user_and_preset_lookups_are_memoized(
+    db_session,
+    create_buyer,
+    captured_statements,
+):
+    buyer = create_buyer()
+    preset = AvatarPreset(name="Studio", status=AvatarPresetStatus.ACTIVE, parameters={})
+    db_session.add(preset)
+    db_session.commit()
+    user_id, preset_id = buyer.id, preset.id
+    user_repo = UserRepository()
+    preset_repo = AvatarPresetRepository()
+
+    db = TestingSessionLocal()
+    try:
+        with captured_statements() as statements:
+            user = user_repo.get_by_id(db, user_id=user_id)
+            assert user_repo.get_by_id(db, user_id=user_id) is user
+            preset_repo.get_by_id(db, preset_id)
+            preset_repo.get_by_id(db, preset_id)
+    finally:
+        db.close()
+
+    assert len(statements) == 2
+
+
+def test_commit_drops_memoized_answers(db_session, create_seller):
+    seller = create_seller()
+    repo = ProductRepository()
+
+    assert repo.get(db_session, 1) is None
+    product = create_product(db_session, seller_id=seller.id)
+
+    assert product.id == 1
+    assert repo.get(db_session, 1) is product
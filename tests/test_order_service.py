@@ -3,6 +3,7 @@ from decimal import Decimal
 import pytest
 from fastapi import HTTPException, status
 
+from app.models.cart import variant_hash
 from app.models.order import Order
 from app.repositories.cart_repository import CartRepository
 from app.repositories.order_repository import OrderRepository
@@ -119,3 +120,25 @@ def test_get_order_detail_for_user_raises_if_not_owner(
         )
 
     assert exc.value.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_create_order_copies_variant_fingerprint_to_order_items(
+    db_session,
+    create_buyer,
+    create_seller,
+    cart_service,
+    order_service,
+):
+    buyer = create_buyer()
+    seller = create_seller()
+    product = create_product(db_session, seller_id=seller.id)
+    cart_service.add_item_to_cart(
+        db_session,
+        buyer.id,
+        CartItemCreate(product_id=product.id, variant_data={"size": "S"}),
+    )
+
+    order_service.create_order_from_cart(db_session, buyer.id)
+
+    created_order = db_session.query(Order).first()
+    assert created_order.items[0].variant_hash == variant_hash({"size": "S"})
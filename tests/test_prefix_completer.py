@@ -0,0 +1,22 @@
+from app.search.completion import PrefixCompleter
+
+
+def test_complete_returns_top_k_by_weight_for_prefix():
+    completer = PrefixCompleter(
+        {"blue shirt": 2, "blue hoodie": 3, "black tee": 5, "red dress": 9},
+        top_k=2,
+    )
+
+    assert completer.complete("bl") == [("black tee", 5), ("blue hoodie", 3)]
+    assert completer.complete("blu") == [("blue hoodie", 3), ("blue shirt", 2)]
+    assert completer.complete("x") == []
+
+
+def test_upsert_and_discard_update_cached_lists():
+    completer = PrefixCompleter({"blue shirt": 2, "blue hoodie": 3}, top_k=2)
+
+    completer.upsert("blue jeans", 7)
+    assert completer.complete("blue") == [("blue jeans", 7), ("blue hoodie", 3)]
+
+    completer.discard("blue jeans")
+    assert completer.complete("blue") == [("blue hoodie", 3)]
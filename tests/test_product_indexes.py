@@ -0,0 +1,109 @@
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import inspect
+
+from app.models.product import ProductStatus
+from app.repositories.order_repository import OrderRepository
+from app.repositories.product_repository import ProductRepository
+from app.repositories.user_repository import UserRepository
+from app.services.admin_service import AdminService
+
+
+def _capture_select_plans(db_session, captured_statements, run):
+    with captured_statements(parameters=True) as statements:
+        run()
+
+    plans = []
+    for statement, parameters in statements:
+        if not statement.lstrip().upper().startswith("SELECT"):
+            continue
+        rows = db_session.connection().exec_driver_sql(
+            f"EXPLAIN QUERY PLAN {statement}", parameters
+        )
+        plans.append(" | ".join(row[-1] for row in rows))
+    return plans
+
+
+def _assert_indexed(plans, *, sorted_by_index=True):
+    page_plan = plans[-1]
+    assert "SCAN products USING" in page_plan or "SEARCH products USING" in page_plan, page_plan
+    if sorted_by_index:
+        assert "USE TEMP B-TREE FOR ORDER BY" not in page_plan, page_plan
+
+
+@pytest.mark.parametrize(
+    "filters",
+    [
+        {},
+        {"category": "tops"},
+        {"gender": "women"},
+    ],
+)
+@pytest.mark.parametrize("sort", [None, "price_asc", "price_desc", "popularity"])
+def test_catalog_list_combinations_use_an_index_for_sorting(
+    db_session, captured_statements, filters, sort
+):
+    repo = ProductRepository()
+    plans = _capture_select_plans(
+        db_session,
+        captured_statements,
+        lambda: repo.list(db_session, sort=sort, **filters),
+    )
+    _assert_indexed(plans)
+
+
+@pytest.mark.parametrize(
+    "filters",
+    [
+        {"price_min": Decimal("10"), "price_max": Decimal("50")},
+        {"size": "M"},
+        {"color": "red"},
+    ],
+)
+@pytest.mark.parametrize("sort", [None, "price_asc", "popularity"])
+def test_catalog_list_range_and_facet_filters_use_an_index(
+    db_session, captured_statements, filters, sort
+):
+    # The planner may drive these from the range/facet index and sort the
+    # (already narrowed) matches, but must never scan the whole table.
+    repo = ProductRepository()
+    plans = _capture_select_plans(
+        db_session,
+        captured_statements,
+        lambda: repo.list(db_session, sort=sort, **filters),
+    )
+    _assert_indexed(plans, sorted_by_index=False)
+
+
+@pytest.mark.parametrize(
+    "filters",
+    [
+        {},
+        {"seller_id": 1},
+        {"status": ProductStatus.ACTIVE},
+        {"is_flagged": True},
+        {"is_hidden": False},
+    ],
+)
+def test_admin_product_list_combinations_use_an_index_for_sorting(
+    db_session, captured_statements, filters
+):
+    service = AdminService(UserRepository(), ProductRepository(), OrderRepository())
+    plans = _capture_select_plans(
+        db_session,
+        captured_statements,
+        lambda: service.list_products(db_session, **filters),
+    )
+    _assert_indexed(plans)
+
+
+def test_composite_indexes_exist(db_session):
+    names = {index["name"] for index in inspect(db_session.get_bind()).get_indexes("products")}
+    assert {
+        "ix_products_status_created_at",
+        "ix_products_status_price",
+        "ix_products_status_category_created_at",
+        "ix_products_status_gender_price",
+        "ix_products_seller_created_at",
+    } <= names
@@ -14,7 +14,7 @@ class DummySession:
 
 def test_search_tool_returns_formatted_products():
     product_service = MagicMock()
-    product_service.search_products.return_value = [
+    product_service.hybrid_search_products.return_value = [
         SimpleNamespace(
             id=1,
             name="Evening Dress",
@@ -36,21 +36,21 @@ def test_search_tool_returns_formatted_products():
             "image": "image-1",
         }
     ]
-    product_service.search_products.assert_called_once()
+    product_service.hybrid_search_products.assert_called_once()
     assert session.closed
 
 
 def test_to_langchain_tool_exposes_callable_func():
     product_service = MagicMock()
-    product_service.search_products.return_value = []
+    product_service.hybrid_search_products.return_value = []
     session = DummySession()
     tool = ProductSearchTool(product_service, lambda: session)
 
     lc_tool = tool.to_langchain_tool()
     lc_tool.func("casual look")
 
-    product_service.search_products.assert_called_once()
-    args, kwargs = product_service.search_products.call_args
+    product_service.hybrid_search_products.assert_called_once()
+    args, kwargs = product_service.hybrid_search_products.call_args
     assert args[0] is session
     assert kwargs["query"] == "casual look"
     assert kwargs["limit"] == tool.default_limit
@@ -5,8 +5,10 @@ import pytest
 from app.models.product import ProductStatus
 from app.models.user import UserRole
 from app.repositories.product_repository import ProductRepository
+from app.repositories.user_repository import UserRepository
 from app.schemas.product import ProductCreate, ProductUpdate
 from app.services.product_service import ProductService
+from app.services.user_service import UserService
 from tests.conftest import create_product
 
 
@@ -105,3 +107,170 @@ def test_soft_delete_product_changes_status(
 
     db_session.refresh(product)
     assert product.status == ProductStatus.DELETED
+
+
+def test_list_products_loads_images_in_constant_queries(
+    product_service,
+    db_session,
+    create_seller,
+    captured_statements,
+):
+    seller = create_seller()
+    for i in range(5):
+        create_product(
+            db_session,
+            seller_id=seller.id,
+            name=f"Product {i}",
+            images=[{"url": f"https://example.com/{i}.jpg"}],
+        )
+    db_session.expire_all()
+
+    with captured_statements() as statements:
+        result = product_service.list_products(db_session, page_size=5)
+
+    assert all(item.main_image_url for item in result.items)
+    # count + projected page (main image resolved inline), independent of page size
+    assert len(statements) == 2
+
+
+def test_list_products_filters_by_size_and_color_facets(
+    product_service,
+    db_session,
+    create_seller,
+):
+    seller = create_seller()
+    match = create_product(
+        db_session,
+        seller_id=seller.id,
+        size_options=["S", "M"],
+        color_options=["red"],
+    )
+    create_product(
+        db_session,
+        seller_id=seller.id,
+        size_options=["L"],
+        color_options=["red"],
+    )
+
+    result = product_service.list_products(db_session, size="M", color="red")
+
+    assert result.total == 1
+    assert result.items[0].id == match.id
+
+
+def test_update_product_keeps_size_facets_in_sync(
+    product_service,
+    db_session,
+    create_seller,
+):
+    seller = create_seller()
+    product = create_product(db_session, seller_id=seller.id, size_options=["S"])
+
+    product_service.update_seller_product(
+        db_session,
+        product_id=product.id,
+        seller=seller,
+        data=ProductUpdate(size_options=["M", "L"]),
+    )
+
+    assert product_service.list_products(db_session, size="S").total == 0
+    assert product_service.list_products(db_session, size="L").total == 1
+
+
+def test_product_edit_refreshes_cached_facet_counts(
+    product_service,
+    db_session,
+    create_seller,
+):
+    seller = create_seller()
+    product = create_product(db_session, seller_id=seller.id, size_options=["S"])
+    sizes = product_service.get_facets(db_session).size
+    assert [(facet.value, facet.count) for facet in sizes] == [("S", 1)]
+
+    product_service.update_seller_product(
+        db_session,
+        product_id=product.id,
+        seller=seller,
+        data=ProductUpdate(size_options=["M"]),
+    )
+
+    sizes = product_service.get_facets(db_session).size
+    assert [(facet.value, facet.count) for facet in sizes] == [("M", 1)]
+
+
+def test_legacy_long_options_are_cut_to_fit_facet_rows(db_session, create_seller):
+    seller = create_seller()
+    product = create_product(db_session, seller_id=seller.id, color_options=["x" * 60])
+
+    assert [row.value for row in product.colors] == ["x" * 50]
+    assert product.color_options == ["x" * 60]
+
+
+def test_get_product_detail_json_is_cached_until_product_changes(
+    product_service,
+    db_session,
+    create_seller,
+    captured_statements,
+):
+    seller = create_seller()
+    product = create_product(db_session, seller_id=seller.id, name="Linen Shirt")
+    product_service.get_product_detail_json(db_session, product_id=product.id)
+
+    with captured_statements() as statements:
+        body = product_service.get_product_detail_json(db_session, product_id=product.id)
+
+    assert statements == []
+    assert b"Linen Shirt" in body
+
+    product_service.update_seller_product(
+        db_session,
+        product_id=product.id,
+        seller=seller,
+        data=ProductUpdate(name="Silk Shirt"),
+    )
+    body = product_service.get_product_detail_json(db_session, product_id=product.id)
+    assert b"Silk Shirt" in body
+
+
+def test_seller_role_change_refreshes_cached_product_detail(
+    product_service,
+    db_session,
+    create_seller,
+):
+    seller = create_seller()
+    product = create_product(db_session, seller_id=seller.id)
+    body = product_service.get_product_detail_json(db_session, product_id=product.id)
+    assert b'"role":"seller"' in body
+
+    UserService(UserRepository()).change_role(
+        db_session, target_user_id=seller.id, new_role=UserRole.ADMIN
+    )
+
+    body = product_service.get_product_detail_json(db_session, product_id=product.id)
+    assert b'"role":"admin"' in body
+
+
+def test_get_many_reuses_identity_map_and_fetches_rest_in_one_query(
+    db_session,
+    create_seller,
+    captured_statements,
+):
+    seller = create_seller()
+    products = [
+        create_product(db_session, seller_id=seller.id, name=f"Product {i}")
+        for i in range(3)
+    ]
+    ids = [p.id for p in products]
+    db_session.expire(products[1])
+    db_session.expire(products[2])
+
+    with captured_statements() as statements:
+        found = ProductRepository().get_many(db_session, [ids[2], ids[0], ids[1], 999])
+
+    # only the two expired products are selected, in one IN query
+    assert len(statements) == 1
+    assert found == dict(zip(ids, products))
+
+    with captured_statements() as statements:
+        ProductRepository().get_many(db_session, ids)
+    assert statements == []
@@ -1,8 +1,12 @@
 from decimal import Decimal
 
 from fastapi import status
+from sqlalchemy import func, select, update
 
-from app.models.product import ProductStatus
+from app.models.product import Product, ProductStatus
+from app.repositories.product_repository import ProductRepository
+from app.schemas.product import ProductUpdate
+from app.services.product_service import ProductService
 from tests.conftest import create_product
 
 
@@ -109,3 +113,203 @@ def test_get_product_detail_returns_404_for_deleted_product(
 
     response = client.get(f"/api/v1/products/{product.id}")
     assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_list_products_cursor_pagination_walks_all_pages(client, db_session, create_seller):
+    seller = create_seller()
+    created = [
+        create_product(
+            db_session,
+            seller_id=seller.id,
+            name=f"Product {i}",
+            price=Decimal("10.00") + (i % 2),
+        )
+        for i in range(5)
+    ]
+
+    seen = []
+    params = {"sort": "price_asc", "page_size": 2}
+    response = client.get("/api/v1/products", params=params)
+    body = response.json()
+    assert body["total"] == 5
+    seen.extend(item["id"] for item in body["items"])
+
+    while body["next_cursor"]:
+        response = client.get(
+            "/api/v1/products",
+            params={**params, "cursor": body["next_cursor"]},
+        )
+        assert response.status_code == status.HTTP_200_OK
+        body = response.json()
+        assert body["total"] is None
+        seen.extend(item["id"] for item in body["items"])
+
+    expected = sorted(created, key=lambda p: (p.price, p.id))
+    assert seen == [p.id for p in expected]
+
+
+def test_list_products_cursor_walks_default_sort_across_equal_timestamps(
+    client,
+    db_session,
+    create_seller,
+):
+    seller = create_seller()
+    created = [
+        create_product(db_session, seller_id=seller.id, name=f"Product {i}") for i in range(5)
+    ]
+    # Same stored timestamp for every row, as products created in one second get.
+    db_session.execute(
+        update(Product).values(created_at=select(func.min(Product.created_at)).scalar_subquery())
+    )
+    db_session.commit()
+
+    body = client.get("/api/v1/products", params={"page_size": 2}).json()
+    seen = [item["id"] for item in body["items"]]
+    pages = 1
+    while body["next_cursor"] and pages < 10:
+        body = client.get(
+            "/api/v1/products",
+            params={"page_size": 2, "cursor": body["next_cursor"]},
+        ).json()
+        seen.extend(item["id"] for item in body["items"])
+        pages += 1
+
+    assert seen == sorted((p.id for p in created), reverse=True)
+
+
+def test_list_products_rejects_invalid_cursor(client, db_session, create_seller):
+    seller = create_seller()
+    create_product(db_session, seller_id=seller.id)
+
+    response = client.get("/api/v1/products", params={"cursor": "not-a-cursor"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_get_product_facets_counts_each_dimension(client, db_session, create_seller):
+    seller = create_seller()
+    create_product(
+        db_session,
+        seller_id=seller.id,
+        category="tops",
+        gender="women",
+        price=Decimal("20.00"),
+        size_options=["S", "M"],
+        color_options=["red"],
+    )
+    create_product(
+        db_session,
+        seller_id=seller.id,
+        category="tops",
+        gender="men",
+        price=Decimal("80.00"),
+        size_options=["M"],
+        color_options=["blue"],
+    )
+    create_product(
+        db_session,
+        seller_id=seller.id,
+        category="bottoms",
+        gender="women",
+        price=Decimal("300.00"),
+        status=ProductStatus.DRAFT,
+    )
+
+    response = client.get("/api/v1/products/facets")
+
+    assert response.status_code == status.HTTP_200_OK
+    body = response.json()
+    assert body["category"] == [{"value": "tops", "count": 2}]
+    assert {"value": "M", "count": 2} in body["size"]
+    assert {"value": "red", "count": 1} in body["color"]
+    prices = {bucket["value"]: bucket["count"] for bucket in body["price"]}
+    assert prices["0-25"] == 1
+    assert prices["50-100"] == 1
+    assert prices["200+"] == 0
+
+    filtered = client.get("/api/v1/products/facets", params={"gender": "women"}).json()
+    assert filtered["category"] == [{"value": "tops", "count": 1}]
+
+
+def test_get_product_detail_supports_conditional_get(client, db_session, create_seller):
+    seller = create_seller()
+    product = create_product(db_session, seller_id=seller.id)
+
+    first = client.get(f"/api/v1/products/{product.id}")
+    etag = first.headers["ETag"]
+
+    cached = client.get(
+        f"/api/v1/products/{product.id}",
+        headers={"If-None-Match": etag},
+    )
+    assert cached.status_code == status.HTTP_304_NOT_MODIFIED
+    assert cached.headers["ETag"] == etag
+
+
+def test_product_detail_etag_changes_when_updated_within_the_same_second(
+    client,
+    db_session,
+    create_seller,
+):
+    seller = create_seller()
+    product = create_product(db_session, seller_id=seller.id, name="Linen Shirt")
+    updated_at = product.updated_at
+    etag = client.get(f"/api/v1/products/{product.id}").headers["ETag"]
+
+    ProductService(ProductRepository()).update_seller_product(
+        db_session,
+        product_id=product.id,
+        seller=seller,
+        data=ProductUpdate(name="Silk Shirt"),
+    )
+    product.updated_at = updated_at
+    db_session.commit()
+
+    changed = client.get(
+        f"/api/v1/products/{product.id}",
+        headers={"If-None-Match": etag},
+    )
+    assert changed.status_code == status.HTTP_200_OK
+    assert changed.json()["name"] == "Silk Shirt"
+    assert changed.headers["ETag"] != etag
+
+
+def test_list_products_etag_changes_with_results(client, db_session, create_seller):
+    seller = create_seller()
+    create_product(db_session, seller_id=seller.id, name="First")
+
+    first = client.get("/api/v1/products")
+    etag = first.headers["ETag"]
+    cached = client.get("/api/v1/products", headers={"If-None-Match": etag})
+    assert cached.status_code == status.HTTP_304_NOT_MODIFIED
+
+    create_product(db_session, seller_id=seller.id, name="Second")
+    changed = client.get("/api/v1/products", headers={"If-None-Match": etag})
+    assert changed.status_code == status.HTTP_200_OK
+    assert changed.json()["total"] == 2
+
+
+def test_get_products_batch_returns_cards_in_request_order(client, db_session, create_seller):
+    seller = create_seller()
+    first = create_product(
+        db_session,
+        seller_id=seller.id,
+        name="First",
+        images=[{"url": "https://example.com/first.jpg"}],
+    )
+    second = create_product(db_session, seller_id=seller.id, name="Second")
+    hidden = create_product(
+        db_session, seller_id=seller.id, name="Gone", status=ProductStatus.DELETED
+    )
+
+    response = client.post(
+        "/api/v1/products/batch",
+        json={"ids": [second.id, hidden.id, first.id, 999]},
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    items = response.json()["items"]
+    assert [item["id"] for item in items] == [second.id, first.id]
+    assert items[1]["main_image_url"] == "https://example.com/first.jpg"
+
+    response = client.post("/api/v1/products/batch", json={"ids": list(range(1, 102))})
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
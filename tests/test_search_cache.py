@@ -0,0 +1,94 @@
+from app.core.cache import TinyLFUCache, search_result_cache, suggest_cache
+from app.repositories.product_repository import ProductRepository
+from app.repositories.search_repository import SearchRepository
+from app.schemas.product import ProductUpdate
+from app.services.product_service import ProductService
+from app.services.search_service import SearchService
+from tests.conftest import create_product
+
+
+def test_tinylfu_admits_only_more_popular_entries():
+    cache = TinyLFUCache(maxsize=2)
+    for key in ["a", "b"]:
+        cache.get(key)
+        cache.set(key, key.upper())
+    for _ in range(3):
+        assert cache.get("a") == "A"
+
+    # a one-off key cannot displace the recently used entries
+    cache.get("c")
+    assert cache.set("c", "C") is False
+    # a repeatedly requested key displaces the least recently used one
+    for _ in range(5):
+        cache.get("d")
+    assert cache.set("d", "D") is True
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "A"
+    stats = cache.stats()
+    assert stats["rejections"] == 1
+    assert stats["evictions"] == 1
+    assert stats["size"] == 2
+
+
+def test_tinylfu_expires_entries_after_ttl(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("app.core.cache.time.monotonic", lambda: now[0])
+    cache = TinyLFUCache(maxsize=4, ttl=10)
+    cache.set("a", 1)
+
+    assert cache.get("a") == 1
+    now[0] += 11
+    assert cache.get("a") is None
+    assert cache.stats()["hit_rate"] == 0.5
+
+
+def test_search_products_caches_ranking_until_catalog_changes(
+    db_session,
+    create_seller,
+    captured_statements,
+):
+    seller = create_seller()
+    product = create_product(db_session, seller_id=seller.id, name="Linen blazer")
+    service = ProductService(ProductRepository())
+    service.search_products(db_session, query="Linen")
+
+    with captured_statements() as statements:
+        results = service.search_products(db_session, query=" linen ")
+    assert [p.id for p in results] == [product.id]
+    assert not any("products_fts" in s for s in statements)
+    assert search_result_cache.stats()["hits"] == 1
+
+    ProductRepository().update(
+        db_session, product=product, data=ProductUpdate(name="Wool blazer")
+    )
+    assert service.search_products(db_session, query="linen") == []
+
+
+def test_suggest_keywords_are_served_from_cache(db_session):
+    repo = SearchRepository()
+    service = SearchService(repo, ProductRepository())
+    repo.create_history_item(db_session, user_id=None, keyword="Boots", destination="/")
+    service.suggest_keywords(db_session, query="bo")
+    service.suggest_keywords(db_session, query="BO")
+    assert suggest_cache.stats()["hits"] == 1
+
+    repo.create_history_item(db_session, user_id=None, keyword="Bomber", destination="/")
+    keywords = [s["keyword"] for s in service.suggest_keywords(db_session, query="bo")]
+    assert "bomber" in keywords
+
+
+def test_admin_cache_stats_reports_hit_rates(
+    client, db_session, create_admin, create_buyer, auth_header_factory
+):
+    admin = create_admin()
+    buyer = create_buyer()
+
+    resp = client.get("/api/v1/admin/cache-stats", headers=auth_header_factory(buyer))
+    assert resp.status_code == 403
+
+    resp = client.get("/api/v1/admin/cache-stats", headers=auth_header_factory(admin))
+    assert resp.status_code == 200
+    body = resp.json()
+    assert set(body["caches"]) == {"search_results", "suggest"}
+    assert body["caches"]["suggest"]["hit_rate"] == 0.0
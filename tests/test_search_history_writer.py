@@ -0,0 +1,52 @@
+from app.models.search_keyword import SearchKeyword, SearchKeywordStat
+from app.search.history_writer import SearchHistoryWriter
+from tests.conftest import TestingSessionLocal
+
+
+def test_flush_writes_queued_entries_with_one_insert(db_session, captured_statements):
+    writer = SearchHistoryWriter(TestingSessionLocal, batch_size=10, flush_interval=60)
+    for keyword in ["Blue hoodie", "blue hoodie", "Red dress"]:
+        assert writer.enqueue(user_id=None, keyword=keyword, destination="/products")
+    assert db_session.query(SearchKeyword).count() == 0
+
+    with captured_statements() as statements:
+        writer.flush()
+
+    inserts = [s for s in statements if s.startswith("INSERT INTO search_keywords ")]
+    assert len(inserts) == 1
+    assert len(writer) == 0
+    assert sorted(k for (k,) in db_session.query(SearchKeyword.keyword)) == [
+        "Blue hoodie",
+        "Red dress",
+        "blue hoodie",
+    ]
+    stat = db_session.query(SearchKeywordStat).filter_by(keyword="blue hoodie").one()
+    assert stat.search_count == 2
+    writer.close()
+
+
+def test_full_batch_is_written_by_the_worker(db_session):
+    writer = SearchHistoryWriter(TestingSessionLocal, batch_size=2, flush_interval=60)
+    writer.enqueue(user_id=None, keyword="scarf", destination="/products")
+    writer.enqueue(user_id=None, keyword="boots", destination="/products")
+
+    writer.close()
+
+    assert db_session.query(SearchKeyword).count() == 2
+
+
+def test_enqueue_drops_entries_beyond_max_pending(db_session, monkeypatch):
+    writer = SearchHistoryWriter(TestingSessionLocal, flush_interval=0.01, max_pending=2)
+    # no worker, so nothing drains the buffer
+    monkeypatch.setattr(writer, "_start_worker", lambda: None)
+
+    results = [
+        writer.enqueue(user_id=None, keyword=f"item {i}", destination="/products")
+        for i in range(3)
+    ]
+
+    assert results == [True, True, False]
+    assert writer.dropped == 1
+    writer.close()
+    assert db_session.query(SearchKeyword).count() == 2
+    assert writer.enqueue(user_id=None, keyword="late", destination="/products") is False
@@ -1,5 +1,7 @@
+from app.core.config import settings
 from app.models.search_keyword import SearchKeyword
 from app.repositories.search_repository import SearchRepository
+from app.search.history_writer import search_history_writer
 from app.services.search_service import SearchService
 
 
@@ -57,3 +59,35 @@ def test_suggest_keywords_returns_suggestions_for_query(client, db_session, crea
     keywords = [item["keyword"] for item in data["items"]]
     assert "green jacket" in keywords
     assert "green shirt" in keywords
+
+
+def test_record_search_history_is_accepted_and_written_in_background(client, db_session):
+    resp = client.post(
+        "/api/v1/search/history",
+        json={"keyword": "linen shirt", "destination": "/products?query=linen"},
+    )
+    assert resp.status_code == 202
+
+    search_history_writer.flush()
+    item = db_session.query(SearchKeyword).one()
+    assert item.keyword == "linen shirt"
+    assert item.user_id is None
+
+
+def test_admin_prune_search_history_applies_retention(
+    client, db_session, create_admin, create_buyer, auth_header_factory, monkeypatch
+):
+    monkeypatch.setattr(settings, "SEARCH_HISTORY_KEEP_PER_USER", 1)
+    admin = create_admin()
+    buyer = create_buyer()
+    for keyword in ["old", "new"]:
+        db_session.add(SearchKeyword(user_id=None, keyword=keyword, destination="/products"))
+        db_session.commit()
+
+    resp = client.post("/api/v1/admin/search-history/prune", headers=auth_header_factory(buyer))
+    assert resp.status_code == 403
+
+    resp = client.post("/api/v1/admin/search-history/prune", headers=auth_header_factory(admin))
+    assert resp.status_code == 200
+    assert resp.json() == {"deleted": 1}
+    assert [k for (k,) in db_session.query(SearchKeyword.keyword)] == ["new"]
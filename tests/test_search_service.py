@@ -1,8 +1,17 @@
-from app.repositories.search_repository import SearchRepository
+import math
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.repositories.search_repository import (
+    SearchRepository,
+    keyword_log_weight,
+    log_add,
+)
 from app.repositories.product_repository import ProductRepository
 from app.services.search_service import SearchService
 from tests.conftest import create_product
-from app.models.search_keyword import SearchKeyword
+from app.models.search_keyword import SearchKeyword, SearchKeywordStat
 
 
 def _service() -> SearchService:
@@ -41,3 +50,152 @@ def test_suggest_keywords_limits_results(db_session):
 
     suggestions = service.suggest_keywords(db_session, query="item", limit=10)
     assert len(suggestions) == 10
+
+
+def test_suggest_keywords_answers_from_memory_after_first_build(
+    db_session,
+    create_seller,
+    captured_statements,
+):
+    seller = create_seller()
+    create_product(db_session, seller_id=seller.id, name="Wool Coat")
+    service = _service()
+    service.suggest_keywords(db_session, query="wool", limit=5)
+
+    SearchRepository().create_history_item(
+        db_session, user_id=None, keyword="Wool scarf", destination="/products?query=wool"
+    )
+
+    with captured_statements() as statements:
+        suggestions = service.suggest_keywords(db_session, query="wool", limit=5)
+
+    assert statements == []
+    assert [s["keyword"] for s in suggestions] == ["wool scarf", "wool coat"]
+
+
+def test_create_history_item_rolls_up_keyword_stats(db_session):
+    repo = SearchRepository()
+    for keyword in ["Blue Hoodie", "blue hoodie ", "red dress"]:
+        repo.create_history_item(
+            db_session, user_id=None, keyword=keyword, destination="/products"
+        )
+
+    stats = {
+        stat.keyword: stat.search_count
+        for stat in db_session.query(SearchKeywordStat).all()
+    }
+    assert stats == {"blue hoodie": 2, "red dress": 1}
+    assert repo.fetch_search_keywords_from_table(db_session) == ["blue hoodie", "red dress"]
+
+
+def test_keyword_stats_prefer_recent_searches():
+    now = datetime(2025, 6, 1)
+    # three searches a month ago weigh less than two today
+    month_ago = keyword_log_weight(now - timedelta(days=30))
+    today = keyword_log_weight(now)
+    old = log_add(log_add(month_ago, month_ago), month_ago)
+    assert old < log_add(today, today)
+
+
+def test_keyword_scores_stay_finite_far_in_the_future(db_session):
+    repo = SearchRepository()
+    far = datetime(2100, 1, 1)
+    repo.create_history_items(
+        db_session,
+        [
+            {"user_id": None, "keyword": "coat", "destination": "/p", "created_at": far},
+            {"user_id": None, "keyword": "coat", "destination": "/p", "created_at": far},
+        ],
+    )
+    repo.create_history_items(
+        db_session,
+        [{"user_id": None, "keyword": "coat", "destination": "/p", "created_at": far}],
+    )
+
+    stat = db_session.query(SearchKeywordStat).one()
+    assert stat.search_count == 3
+    assert stat.score == pytest.approx(keyword_log_weight(far) + math.log2(3))
+
+
+def test_compactor_rebuilds_stats_from_history(db_session, captured_statements):
+    db_session.add_all(
+        [
+            SearchKeyword(user_id=None, keyword="Linen shirt", destination="/products"),
+            SearchKeyword(user_id=None, keyword="linen shirt", destination="/products"),
+            SearchKeyword(user_id=None, keyword="Sandals", destination="/products"),
+        ]
+    )
+    db_session.commit()
+
+    assert _service().compact_keyword_stats(db_session) == 2
+    stat = db_session.query(SearchKeywordStat).filter_by(keyword="linen shirt").one()
+    assert stat.search_count == 2
+
+    with captured_statements() as statements:
+        keywords = SearchRepository().fetch_search_keywords_from_table(db_session, limit=1)
+
+    assert keywords == ["linen shirt"]
+    assert len(statements) == 1
+    assert "search_keywords " not in statements[0]
+
+
+def _seed_history(db_session, user_id, count, start):
+    items = [
+        SearchKeyword(
+            user_id=user_id,
+            keyword=f"kw {user_id} {i}",
+            destination="/products",
+            created_at=start + timedelta(minutes=i),
+        )
+        for i in range(count)
+    ]
+    db_session.add_all(items)
+    db_session.commit()
+    return items
+
+
+def test_prune_history_keeps_newest_entries_per_bucket(db_session, create_buyer):
+    user = create_buyer()
+    start = datetime(2025, 1, 1)
+    kept = _seed_history(db_session, user.id, 5, start)[-2:]
+    kept += _seed_history(db_session, None, 4, start)[-2:]
+    db_session.add(SearchKeywordStat(keyword="kw", search_count=9, last_seen=start, score=1.0))
+    db_session.commit()
+
+    deleted = SearchRepository().prune_history(db_session, keep_per_user=2, batch_size=2)
+
+    assert deleted == 5
+    remaining = {item.id for item in db_session.query(SearchKeyword).all()}
+    assert remaining == {item.id for item in kept}
+    assert db_session.query(SearchKeywordStat).count() == 1
+
+
+def test_prune_history_breaks_timestamp_ties_by_id(db_session, create_buyer):
+    user = create_buyer()
+    start = datetime(2025, 1, 1)
+    items = [
+        SearchKeyword(user_id=user.id, keyword=f"kw {i}", destination="/products", created_at=start)
+        for i in range(4)
+    ]
+    db_session.add_all(items)
+    db_session.commit()
+
+    deleted = SearchRepository().prune_history(db_session, keep_per_user=2, batch_size=1)
+
+    assert deleted == 2
+    remaining = {item.id for item in db_session.query(SearchKeyword).all()}
+    assert remaining == {items[2].id, items[3].id}
+
+
+def test_prune_history_drops_entries_older_than_cutoff(db_session, create_buyer):
+    user = create_buyer()
+    start = datetime(2025, 1, 1)
+    items = _seed_history(db_session, user.id, 3, start)
+
+    deleted = SearchRepository().prune_history(
+        db_session, keep_per_user=10, older_than=start + timedelta(minutes=1)
+    )
+
+    assert deleted == 1
+    remaining = {item.id for item in db_session.query(SearchKeyword).all()}
+    assert remaining == {items[1].id, items[2].id}
@@ -38,6 +38,28 @@ def test_seller_can_create_product(
     assert body["seller"]["id"] == seller.id
 
 
+def test_create_product_rejects_options_longer_than_facet_values(
+    client,
+    create_seller,
+    auth_header_factory,
+):
+    seller = create_seller()
+    payload = {
+        "name": "Jacket",
+        "price": "120.00",
+        "stock": 5,
+        "color_options": ["x" * 51],
+    }
+
+    response = client.post(
+        "/api/v1/seller/products",
+        json=payload,
+        headers=auth_header_factory(seller),
+    )
+
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
 def test_non_seller_cannot_create_product(
     client,
     create_buyer,
@@ -0,0 +1,57 @@
+from app.search.suggest_index import SuggestIndex
+
+
+def _index() -> SuggestIndex:
+    index = SuggestIndex()
+    index.rebuild(
+        keywords=["Blue hoodie", "blue hoodie", "red dress"],
+        product_names=["Blue Shirt", "Blue Shirt", "Green Jacket"],
+    )
+    return index
+
+
+def test_search_ranks_keywords_and_prefix_matches_first():
+    results = _index().search("blu", limit=5)
+
+    assert [term for term, _ in results] == ["blue hoodie", "blue shirt"]
+    scores = dict(results)
+    # keyword weight beats two products sharing a name
+    assert scores["blue hoodie"] > scores["blue shirt"]
+
+
+def test_search_only_returns_terms_sharing_a_gram():
+    assert _index().search("zz") == []
+    assert [term for term, _ in _index().search("j")] == ["green jacket"]
+
+
+def test_incremental_updates_patch_the_built_index():
+    index = _index()
+
+    index.add_keyword("Blue jeans")
+    index.remove_product_name("Green Jacket")
+
+    assert "blue jeans" in dict(index.search("blue jeans"))
+    assert index.search("jacket") == []
+
+
+def test_incremental_updates_are_ignored_until_built():
+    index = SuggestIndex()
+    index.add_keyword("blue jeans")
+
+    assert not index.is_built
+    assert index.search("blue") == []
+
+
+def test_search_tolerates_typos():
+    index = _index()
+
+    assert [term for term, _ in index.search("jaket", limit=1)] == ["green jacket"]
+    assert [term for term, _ in index.search("gren jack", limit=1)] == ["green jacket"]
+
+
+def test_typo_matches_follow_incremental_updates():
+    index = _index()
+    index.add_product_name("Denim Jacket")
+    index.remove_product_name("Green Jacket")
+
+    assert [term for term, _ in index.search("jaket", limit=2)] == ["denim jacket"]
@@ -0,0 +1,120 @@
+import math
+import time
+
+import pytest
+
+from app.repositories.product_repository import ProductRepository
+from app.schemas.product import ProductUpdate
+from app.search.vector_index import HashingEmbedder, VectorIndex, product_vector_index
+from app.services.product_service import ProductService
+from tests.conftest import create_product
+
+
+@pytest.fixture(params=["python", "numpy"])
+def use_numpy(request):
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    return request.param == "numpy"
+
+
+def _index(use_numpy: bool) -> VectorIndex:
+    index = VectorIndex(use_numpy=use_numpy)
+    index.rebuild(
+        [
+            (1, "Silk evening dress, black, for parties and formal events"),
+            (2, "Rain jacket, waterproof shell for hiking"),
+            (3, "Cotton t-shirt, white, everyday basics"),
+        ]
+    )
+    return index
+
+
+def test_hashing_embedder_is_deterministic_and_normalized():
+    embedder = HashingEmbedder(dimension=64)
+    first, second = embedder.embed(["Evening dresses", "Evening dresses"])
+
+    assert first == second
+    assert len(first) == 64
+    assert math.isclose(sum(v * v for v in first), 1.0, rel_tol=1e-6)
+    assert embedder.embed(["I would want something"])[0] == [0.0] * 64
+
+
+def test_search_ranks_natural_language_queries(use_numpy):
+    index = _index(use_numpy)
+
+    results = index.search("I need something for a formal party, maybe a dress")
+
+    assert results[0][0] == 1
+    assert index.search("waterproof jackets", limit=1)[0][0] == 2
+
+
+def test_upsert_and_remove_patch_the_index(use_numpy):
+    index = _index(use_numpy)
+    index.upsert(4, "Leather hiking boots")
+    index.upsert(2, "Denim jacket")
+    index.remove(1)
+
+    assert len(index) == 3
+    assert index.search("hiking", limit=1)[0][0] == 4
+    assert all(item_id != 1 for item_id, _ in index.search("evening dress"))
+
+
+def test_search_honours_allowed_ids_and_grows_past_initial_capacity(use_numpy):
+    index = _index(use_numpy)
+    for item_id in range(10, 110):
+        index.upsert(item_id, f"Plain tee number {item_id}")
+
+    assert len(index) == 103
+    assert all(item_id in {2, 3} for item_id, _ in index.search("dress", allowed_ids={2, 3}))
+    assert index.search("evening dress", limit=1)[0][0] == 1
+
+
+def test_index_goes_stale_after_refresh_interval(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("app.search.vector_index.time.monotonic", lambda: now[0])
+    index = VectorIndex(refresh_interval=60)
+    assert index.is_stale()
+
+    index.rebuild([(1, "Silk dress")])
+    assert not index.is_stale()
+    now[0] += 60
+    assert index.is_stale()
+    assert index.claim_refresh()
+    assert not index.claim_refresh()
+
+
+def test_semantic_search_follows_product_writes(db_session, create_seller):
+    seller = create_seller()
+    dress = create_product(db_session, seller_id=seller.id, name="Red summer dress")
+    create_product(db_session, seller_id=seller.id, name="Wool winter coat")
+    service = ProductService(ProductRepository())
+
+    results = service.semantic_search_products(db_session, query="a dress for summer")
+    assert results[0].id == dress.id
+
+    ProductRepository().update(
+        db_session, product=dress, data=ProductUpdate(name="Linen trousers")
+    )
+    results = service.semantic_search_products(db_session, query="linen trousers")
+    assert results[0].id == dress.id
+    assert results[0].name == "Linen trousers"
+
+
+def test_stale_vector_index_is_rebuilt_in_the_background(
+    db_session,
+    create_seller,
+    monkeypatch,
+):
+    seller = create_seller()
+    repo = ProductRepository()
+    repo.ensure_vector_index(db_session)
+    # Written behind the index's back, so only a rebuild can pick it up.
+    coat = create_product(db_session, seller_id=seller.id, name="Wool winter coat")
+    monkeypatch.setattr(product_vector_index, "refresh_interval", 0)
+
+    repo.ensure_vector_index(db_session)
+
+    deadline = time.monotonic() + 5
+    while not product_vector_index.search("winter coat") and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert product_vector_index.search("winter coat")[0][0] == coat.id